@@ -22,17 +22,17 @@ class IsAdminUser(permissions.BasePermission):
 
 class AdminUserViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminUser]
-    queryset = AdminUser.objects.all()
+    queryset = AdminUser.objects.select_related('user__profile')
     serializer_class = AdminUserSerializer
 
 class AdminActionLogListView(generics.ListAPIView):
     permission_classes = [IsAdminUser]
-    queryset = AdminActionLog.objects.all().order_by('-created_at')
+    queryset = AdminActionLog.objects.select_related('admin').order_by('-created_at')
     serializer_class = AdminActionLogSerializer
 
 class AppSettingsViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminUser]
-    queryset = AppSettings.objects.all()
+    queryset = AppSettings.objects.select_related('updated_by')
     serializer_class = AppSettingsSerializer
 
     def perform_create(self, serializer):
@@ -8,9 +8,10 @@ import base64
 import logging
 import time
 
-from openai import OpenAI
 from django.conf import settings
 
+from besmart_backend.perf import track_external
+
 logger = logging.getLogger(__name__)
 
 IMAGE_ANALYSIS_PROMPT = """Analyze this image and describe what product the user is looking for. 
@@ -43,26 +44,29 @@ def analyze_image(image_bytes: bytes, content_type: str = 'image/jpeg') -> str:
         logger.error('OPENAI_API_KEY not configured')
         return 'product search'
 
+    from openai import OpenAI  # deferred: ~0.7s of worker boot (profile_startup LAZY_MODULES)
+
     b64 = base64.b64encode(image_bytes).decode('utf-8')
     data_url = f'data:{content_type};base64,{b64}'
 
     for attempt in range(1, MAX_RETRIES + 1):
         try:
             client = OpenAI(api_key=api_key)
-            response = client.chat.completions.create(
-                model='gpt-4o-mini',
-                messages=[
-                    {
-                        'role': 'user',
-                        'content': [
-                            {'type': 'text', 'text': IMAGE_ANALYSIS_PROMPT},
-                            {'type': 'image_url', 'image_url': {'url': data_url}},
-                        ],
-                    }
-                ],
-                max_tokens=100,
-                temperature=0.3,
-            )
+            with track_external('openai', 'chat.completions'):
+                response = client.chat.completions.create(
+                    model='gpt-4o-mini',
+                    messages=[
+                        {
+                            'role': 'user',
+                            'content': [
+                                {'type': 'text', 'text': IMAGE_ANALYSIS_PROMPT},
+                                {'type': 'image_url', 'image_url': {'url': data_url}},
+                            ],
+                        }
+                    ],
+                    max_tokens=100,
+                    temperature=0.3,
+                )
             description = response.choices[0].message.content.strip()
             logger.info('Image analysis result: %s', description)
             return description
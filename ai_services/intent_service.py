@@ -5,9 +5,10 @@ Uses OpenAI GPT-4o-mini for intent classification with keyword fallback.
 import json
 import logging
 
-from openai import OpenAI
 from django.conf import settings
 
+from besmart_backend.perf import track_external
+
 logger = logging.getLogger(__name__)
 
 INTENT_TYPES = [
@@ -63,16 +64,19 @@ def _recognize_with_ai(message: str) -> dict:
     if not api_key:
         raise ValueError('OPENAI_API_KEY not configured')
 
+    from openai import OpenAI  # deferred: ~0.7s of worker boot (profile_startup LAZY_MODULES)
+
     client = OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
-        model='gpt-4o-mini',
-        messages=[
-            {'role': 'system', 'content': SYSTEM_PROMPT},
-            {'role': 'user', 'content': f'Classify this message: {message}'},
-        ],
-        temperature=0.1,
-        max_tokens=100,
-    )
+    with track_external('openai', 'chat.completions'):
+        response = client.chat.completions.create(
+            model='gpt-4o-mini',
+            messages=[
+                {'role': 'system', 'content': SYSTEM_PROMPT},
+                {'role': 'user', 'content': f'Classify this message: {message}'},
+            ],
+            temperature=0.1,
+            max_tokens=100,
+        )
 
     content = response.choices[0].message.content.strip()
     result = json.loads(content)
@@ -117,7 +117,8 @@ def semantic_search(query: str, limit: int = 10, threshold: float = 0.3) -> list
     """
     try:
         # Generate embedding via OpenAI
-        from openai import OpenAI
+        from openai import OpenAI  # deferred: ~0.7s of worker boot (profile_startup LAZY_MODULES)
+        from besmart_backend.perf import track_external
         from django.conf import settings
 
         api_key = settings.OPENAI_API_KEY
@@ -125,10 +126,11 @@ def semantic_search(query: str, limit: int = 10, threshold: float = 0.3) -> list
             return enhanced_keyword_search(query, limit=limit)
 
         client = OpenAI(api_key=api_key)
-        embedding_response = client.embeddings.create(
-            model='text-embedding-3-small',
-            input=query,
-        )
+        with track_external('openai', 'embeddings'):
+            embedding_response = client.embeddings.create(
+                model='text-embedding-3-small',
+                input=query,
+            )
         query_embedding = embedding_response.data[0].embedding
 
         # Call the match_products RPC
@@ -265,13 +267,12 @@ def enrich_products(products: list[dict]) -> list[dict]:
     try:
         with connection.cursor() as c:
             # Product highlights
-            placeholders = ','.join(['%s'] * len(product_ids))
-            c.execute(f"""
+            c.execute("""
                 SELECT product_id, label, icon_url, sort_order
                 FROM product_highlights
-                WHERE product_id::text IN ({placeholders})
+                WHERE product_id = ANY(%s::uuid[])
                 ORDER BY sort_order
-            """, product_ids)
+            """, [product_ids])
             for row in c.fetchall():
                 pid = str(row[0])
                 highlights_map.setdefault(pid, []).append({
@@ -279,12 +280,12 @@ def enrich_products(products: list[dict]) -> list[dict]:
                 })
 
             # Product specifications
-            c.execute(f"""
+            c.execute("""
                 SELECT product_id, group_name, spec_name, spec_value, sort_order
                 FROM product_specifications
-                WHERE product_id::text IN ({placeholders})
+                WHERE product_id = ANY(%s::uuid[])
                 ORDER BY sort_order
-            """, product_ids)
+            """, [product_ids])
             for row in c.fetchall():
                 pid = str(row[0])
                 specs_map.setdefault(pid, []).append({
@@ -7,9 +7,10 @@ then calls OpenAI GPT-4o-mini. Static responses for greeting / order / support i
 """
 import logging
 
-from openai import OpenAI
 from django.conf import settings
 
+from besmart_backend.perf import track_external
+
 logger = logging.getLogger(__name__)
 
 
@@ -112,16 +113,19 @@ def _generate_ai_response(
         user_message, intent, products, conversation_context, faqs, product_specs,
     )
 
+    from openai import OpenAI  # deferred: ~0.7s of worker boot (profile_startup LAZY_MODULES)
+
     client = OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
-        model='gpt-4o-mini',
-        messages=[
-            {'role': 'system', 'content': system_prompt},
-            {'role': 'user', 'content': user_prompt},
-        ],
-        max_tokens=300,
-        temperature=0.7,
-    )
+    with track_external('openai', 'chat.completions'):
+        response = client.chat.completions.create(
+            model='gpt-4o-mini',
+            messages=[
+                {'role': 'system', 'content': system_prompt},
+                {'role': 'user', 'content': user_prompt},
+            ],
+            max_tokens=300,
+            temperature=0.7,
+        )
 
     ai_text = response.choices[0].message.content.strip()
     suggestions = _generate_suggestions(intent, products)
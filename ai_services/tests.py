@@ -0,0 +1,5 @@
+from besmart_backend.query_budgets import QueryBudgetTestCase
+
+
+class AIQueryBudgetTests(QueryBudgetTestCase):
+    app = 'ai_services'
@@ -0,0 +1,329 @@
+"""
+Tiered cache shared by the apps.
+
+``TieredCache(namespace)`` puts a small in-process LRU in front of the shared
+Django cache (Redis when REDIS_URL is set, see settings.CACHES) and adds:
+
+- namespaced keys:        "<namespace>:v<version>:<key>"
+- versioned invalidation: ``invalidate()`` bumps the namespace version, so
+                          every key written under the old version is dead at
+                          once in every worker without a key scan
+- stampede protection:    ``get_or_set()`` lets a single caller recompute a
+                          missing value (per-process lock + shared cache.add
+                          lock); concurrent callers wait for its result
+- hit/miss counters:      ``get_cache_stats()``
+
+Views adopt it with ``@cached_view('<namespace>')`` on their ``get`` method
+(which also answers If-None-Match with 304), and apps drop stale entries
+with ``invalidate_on_save(Model, '<namespace>')`` in ``AppConfig.ready()``.
+"""
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+_MISSING = object()
+
+
+class LocalLRU:
+    """Thread-safe LRU of key -> (value, expires_at)."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def _count(namespace, counter):
+    with _stats_lock:
+        ns = _stats.setdefault(namespace, {
+            'local_hits': 0, 'shared_hits': 0, 'misses': 0,
+            'recomputes': 0, 'waits': 0, 'invalidations': 0,
+        })
+        ns[counter] += 1
+
+
+def get_cache_stats() -> dict:
+    """Per-namespace hit/miss counters for this process."""
+    with _stats_lock:
+        return {ns: dict(c) for ns, c in _stats.items()}
+
+
+class TieredCache:
+    def __init__(self, namespace, timeout=None, local_size=None, local_ttl=None):
+        self.namespace = namespace
+        self.timeout = timeout if timeout is not None else settings.CACHE_DEFAULT_TIMEOUT
+        self.local_ttl = local_ttl if local_ttl is not None else settings.CACHE_LOCAL_TTL
+        self._local = LocalLRU(local_size or settings.CACHE_LOCAL_MAXSIZE)
+        self._version = None
+        self._version_checked_at = 0.0
+        self._flight_locks = {}
+        self._flight_guard = threading.Lock()
+
+    # -- versions ----------------------------------------------------------
+    @property
+    def _version_key(self):
+        return f'{self.namespace}:version'
+
+    def version(self) -> int:
+        """Current namespace version, re-read from the shared tier at most
+        once per CACHE_VERSION_CHECK_INTERVAL seconds."""
+        now = time.time()
+        if self._version is not None and now - self._version_checked_at < settings.CACHE_VERSION_CHECK_INTERVAL:
+            return self._version
+        version = shared_cache.get(self._version_key)
+        if version is None:
+            # Seed from the clock so a flushed cache never reuses old versions.
+            shared_cache.add(self._version_key, int(now * 1000), None)
+            version = shared_cache.get(self._version_key) or int(now * 1000)
+        self._version, self._version_checked_at = version, now
+        return version
+
+    def invalidate(self):
+        """Drop every key in the namespace, in every worker."""
+        try:
+            self._version = shared_cache.incr(self._version_key)
+        except ValueError:
+            self._version = int(time.time() * 1000)
+            shared_cache.set(self._version_key, self._version, None)
+        self._version_checked_at = time.time()
+        self._local.clear()
+        _count(self.namespace, 'invalidations')
+
+    def make_key(self, key) -> str:
+        return f'{self.namespace}:v{self.version()}:{key}'
+
+    # -- reads / writes ----------------------------------------------------
+    def get(self, key, default=None):
+        return self._get(key, default, count_miss=True)
+
+    def _get(self, key, default, count_miss):
+        full_key = self.make_key(key)
+        value = self._local.get(full_key, _MISSING)
+        if value is not _MISSING:
+            _count(self.namespace, 'local_hits')
+            return value
+        value = shared_cache.get(full_key, _MISSING)
+        if value is not _MISSING:
+            _count(self.namespace, 'shared_hits')
+            self._local.set(full_key, value, time.time() + self.local_ttl)
+            return value
+        if count_miss:
+            _count(self.namespace, 'misses')
+        return default
+
+    def set(self, key, value, timeout=None):
+        full_key = self.make_key(key)
+        timeout = self.timeout if timeout is None else timeout
+        shared_cache.set(full_key, value, timeout)
+        self._local.set(full_key, value, time.time() + min(self.local_ttl, timeout))
+
+    def delete(self, key):
+        full_key = self.make_key(key)
+        shared_cache.delete(full_key)
+        self._local.delete(full_key)
+
+    def get_or_set(self, key, producer, timeout=None):
+        """Return the cached value, computing it with ``producer()`` on a miss.
+
+        Only one caller per key recomputes; the others wait up to
+        CACHE_STAMPEDE_WAIT seconds for its result before computing anyway.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        # One in-process lock per key, dropped when its last waiter leaves so
+        # a late caller never gets a second lock while others still queue.
+        with self._flight_guard:
+            flight = self._flight_locks.setdefault(key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                return self._compute(key, producer, timeout)
+        finally:
+            with self._flight_guard:
+                flight[1] -= 1
+                if not flight[1]:
+                    self._flight_locks.pop(key, None)
+
+    def _compute(self, key, producer, timeout):
+        value = self._get(key, _MISSING, count_miss=False)
+        if value is not _MISSING:
+            _count(self.namespace, 'waits')
+            return value
+
+        lock_key = f'{self.make_key(key)}:lock'
+        wait = settings.CACHE_STAMPEDE_WAIT
+        acquired = shared_cache.add(lock_key, 1, max(1, int(wait)))
+        if not acquired:
+            deadline = time.time() + wait
+            while time.time() < deadline:
+                time.sleep(0.05)
+                value = self._get(key, _MISSING, count_miss=False)
+                if value is not _MISSING:
+                    _count(self.namespace, 'waits')
+                    return value
+        try:
+            _count(self.namespace, 'recomputes')
+            value = producer()
+            self.set(key, value, timeout)
+            return value
+        finally:
+            # Only the worker that took the lock may release it.
+            if acquired:
+                shared_cache.delete(lock_key)
+
+
+_namespaces = {}
+_namespaces_lock = threading.Lock()
+
+
+def get_namespace(namespace, **kwargs) -> TieredCache:
+    """Process-wide TieredCache for ``namespace``."""
+    with _namespaces_lock:
+        if namespace not in _namespaces:
+            _namespaces[namespace] = TieredCache(namespace, **kwargs)
+        return _namespaces[namespace]
+
+
+def clear_local_caches():
+    """Forget every in-process entry and memoised version (tests, benchmarks)."""
+    with _namespaces_lock:
+        for tier in _namespaces.values():
+            tier._local.clear()
+            tier._version = None
+
+
+def invalidate(*namespaces):
+    for namespace in namespaces:
+        get_namespace(namespace).invalidate()
+
+
+def invalidate_on_save(model, *namespaces):
+    """Invalidate ``namespaces`` once a save or delete of a ``model`` row commits.
+
+    Bumping inside the writer's transaction would let a concurrent read
+    repopulate the new generation from the old, still visible rows.
+    """
+    def _handler(sender, using=None, **kwargs):
+        transaction.on_commit(lambda: invalidate(*namespaces), using=using)
+
+    uid = f'invalidate:{model._meta.label}:{",".join(namespaces)}'
+    post_save.connect(_handler, sender=model, weak=False, dispatch_uid=uid + ':save')
+    post_delete.connect(_handler, sender=model, weak=False, dispatch_uid=uid + ':delete')
+
+
+def request_cache_key(request) -> str:
+    """Stable key for a GET: scheme, host, path and sorted query string.
+
+    The host and scheme are part of the key because cached bodies carry
+    absolute URLs built from them (pagination ``next`` / ``previous``).
+    """
+    query = '&'.join(f'{k}={v}' for k, v in sorted(request.GET.lists()))
+    raw = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _etag_matches(request, etag) -> bool:
+    """Whether If-None-Match names ``etag`` (weak comparison, RFC 9110)."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(tag.removeprefix('W/') == etag for tag in parse_etags(header))
+
+
+def cached_view(namespace, timeout=None, max_age=None):
+    """Cache a DRF ``get`` handler's 200 response data in ``namespace`` and
+    answer conditional GETs.
+
+    Cached responses carry a strong ETag made of the namespace version and a
+    digest of the data, taken once when the entry is computed.  A request
+    whose If-None-Match names it gets a bodiless 304 after a single cache
+    lookup: no view code, no queries, no rendering.  ``Cache-Control: public,
+    max-age=<max_age>`` (default CACHE_CLIENT_MAX_AGE) tells clients how long
+    they may skip the request altogether.
+
+    Only use on responses that do not depend on the requesting user.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            tier = get_namespace(namespace)
+            # Entries are (data, etag) pairs; the prefix keeps them apart from
+            # bare-data entries written before ETags existed.
+            key = 'etag:' + request_cache_key(request)
+
+            def produce():
+                response = method(self, request, *args, **kwargs)
+                produce.response = response
+                if response.status_code != 200:
+                    raise _Uncacheable
+                digest = hashlib.sha1(JSONRenderer().render(response.data)).hexdigest()[:20]
+                return response.data, f'"{tier.version()}-{digest}"'
+
+            produce.response = None
+            try:
+                data, etag = tier.get_or_set(key, produce, timeout)
+            except _Uncacheable:
+                return produce.response
+
+            if _etag_matches(request, etag):
+                response = Response(status=304)
+            else:
+                response = produce.response or Response(data)
+            response['ETag'] = etag
+            patch_cache_control(
+                response, public=True,
+                max_age=settings.CACHE_CLIENT_MAX_AGE if max_age is None else max_age,
+            )
+            return response
+        return wrapper
+    return decorator
+
+
+class _Uncacheable(Exception):
+    pass
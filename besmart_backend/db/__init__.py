@@ -0,0 +1,48 @@
+"""
+PostgreSQL backend with connection-pool instrumentation.
+
+Used as ``DATABASES['default']['ENGINE'] = 'besmart_backend.db'``.  It is the
+stock Django psycopg backend; when ``OPTIONS['pool']`` is set (see the
+``DB_POOL_*`` settings) every pool checkout is timed so pool starvation shows
+up as wait time instead of as unexplained request latency.
+
+``get_pool_stats()`` returns, per database alias, the psycopg_pool counters
+(size, available, waiting, requests_wait_ms, ...) merged with this
+process's checkout wait-time figures.
+"""
+import threading
+
+_lock = threading.Lock()
+_wait_stats = {}
+
+
+def record_checkout(alias, wait_ms, timed_out=False):
+    with _lock:
+        s = _wait_stats.setdefault(alias, {
+            'checkouts': 0, 'timeouts': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0,
+        })
+        s['checkouts'] += 1
+        s['wait_ms_total'] += wait_ms
+        s['wait_ms_max'] = max(s['wait_ms_max'], wait_ms)
+        if timed_out:
+            s['timeouts'] += 1
+
+
+def get_pool_stats() -> dict:
+    """Pool counters and checkout wait times for this process, keyed by alias."""
+    from django.db import connections
+
+    stats = {}
+    for alias in connections:
+        conn = connections[alias]
+        pool = getattr(conn, 'pool', None)
+        if pool is None:
+            continue
+        entry = dict(pool.get_stats())
+        with _lock:
+            waits = dict(_wait_stats.get(alias, {}))
+        if waits.get('checkouts'):
+            waits['wait_ms_avg'] = round(waits['wait_ms_total'] / waits['checkouts'], 3)
+        entry.update(waits)
+        stats[alias] = entry
+    return stats
@@ -0,0 +1,24 @@
+import time
+
+from django.db.backends.postgresql import base
+from psycopg_pool import PoolTimeout
+
+from . import record_checkout
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Stock psycopg backend that times connection-pool checkouts."""
+
+    def get_new_connection(self, conn_params):
+        if not self.settings_dict['OPTIONS'].get('pool'):
+            return super().get_new_connection(conn_params)
+
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super().get_new_connection(conn_params)
+        except PoolTimeout:
+            timed_out = True
+            raise
+        finally:
+            record_checkout(self.alias, (time.perf_counter() - start) * 1000, timed_out)
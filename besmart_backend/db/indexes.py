@@ -0,0 +1,26 @@
+"""
+Helpers for migrations that build indexes CONCURRENTLY (non-atomic).
+
+A failed or interrupted ``CREATE INDEX CONCURRENTLY`` leaves an INVALID
+index behind, which the planner never uses.  ``IF NOT EXISTS`` matches it
+by name, so re-running the migration would skip the build and "succeed"
+without a usable index; ``create_index_concurrently`` drops it first.
+"""
+
+INVALID_INDEX_SQL = """
+    SELECT 1 FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace
+      AND NOT i.indisvalid
+"""
+
+
+def create_index_concurrently(schema_editor, name, definition):
+    """``CREATE INDEX CONCURRENTLY IF NOT EXISTS <name> <definition>``,
+    replacing an INVALID index of the same name."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(INVALID_INDEX_SQL, [name])
+        invalid = cursor.fetchone() is not None
+    if invalid:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    schema_editor.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}')
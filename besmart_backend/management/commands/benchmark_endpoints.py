@@ -0,0 +1,251 @@
+import json
+import math
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from besmart_backend.cache import clear_local_caches
+from orders.models import Cart, ShippingAddress
+from products.models import Product
+from support.models import ChatConversation
+
+from .seed_catalog import SEED_EMAIL_DOMAIN
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark hot API endpoints in-process against the current database '
+        '(seed it first with seed_catalog). Reports p50/p95/p99 latency, '
+        'throughput and SQL query counts per endpoint; --save writes a JSON '
+        'baseline and --compare reports regressions against one. By default '
+        'the caches are cleared before every request (--cache cold) so the '
+        'endpoints themselves are measured; --cache warm measures cache hits.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--only', nargs='*', help='Scenario names to run')
+        parser.add_argument('--save', help='Write results to this JSON file')
+        parser.add_argument('--compare', help='Baseline JSON file to compare against')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='Percent p95 slowdown (or query increase) counted as a regression')
+        parser.add_argument('--cache', choices=('cold', 'warm'), default='cold',
+                            help='cold: clear the caches before every request; warm: keep them')
+        parser.add_argument('--live-external', action='store_true',
+                            help='Keep OpenAI configured (otherwise AI calls use the keyword fallback)')
+
+    def handle(self, *args, **options):
+        fixtures = self._fixtures()
+        scenarios = self._scenarios(fixtures, options['live_external'])
+        if options['only']:
+            unknown = set(options['only']) - set(scenarios)
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            scenarios = {k: v for k, v in scenarios.items() if k in options['only']}
+
+        overrides = {'ALLOWED_HOSTS': ['*'], 'PERF_INSTRUMENTATION_ENABLED': False}
+        if not options['live_external']:
+            overrides['OPENAI_API_KEY'] = ''
+
+        self.stdout.write(f'Cache: {options["cache"]}')
+        results = {}
+        with override_settings(**overrides):
+            for name, scenario in scenarios.items():
+                results[name] = self._run(name, scenario, fixtures['user'], options)
+                self._print_row(name, results[name])
+
+        report = {'meta': self._meta(options), 'results': results}
+        if options['save']:
+            with open(options['save'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {options["save"]}'))
+        if options['compare']:
+            if self._compare(options['compare'], results, options['threshold'], options['cache']):
+                raise CommandError('Performance regressions against the baseline.')
+
+    # -- setup -------------------------------------------------------------
+    def _fixtures(self):
+        user = (
+            User.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}', cart__items__isnull=False)
+            .distinct().first()
+        )
+        if user is None:
+            raise CommandError('No seeded user with a cart found; run seed_catalog first.')
+        products = list(
+            Product.objects.filter(status='active', approval_status='approved')
+            .order_by('-reviews').values_list('id', 'category_id')[:20]
+        )
+        if not products:
+            raise CommandError('No active products found; run seed_catalog first.')
+        address = ShippingAddress.objects.filter(user=user).first()
+        conversation = ChatConversation.objects.filter(user=user).first()
+        if conversation is None:
+            conversation = ChatConversation.objects.create(user=user, title='Benchmark')
+        Cart.objects.get_or_create(user=user)
+        return {
+            'user': user,
+            'product_id': str(products[0][0]),
+            'category_id': str(products[0][1]),
+            'product_ids': [str(p[0]) for p in products],
+            'address_id': str(address.id) if address else None,
+            'conversation_id': str(conversation.id),
+        }
+
+    def _scenarios(self, f, live_external):
+        """name -> (method, path, body, authenticated)"""
+        order_items = [{'product_id': pid, 'quantity': 1} for pid in f['product_ids'][:3]]
+        scenarios = {
+            'products.list': ('get', '/api/products/', None, False),
+            'products.list.category': ('get', f'/api/products/?category_id={f["category_id"]}', None, False),
+            'products.search': ('get', '/api/products/?search=wireless', None, False),
+            'products.featured': ('get', '/api/products/featured/', None, False),
+            'products.detail': ('get', f'/api/products/{f["product_id"]}/', None, False),
+            'products.reviews': ('get', f'/api/products/{f["product_id"]}/reviews/', None, False),
+            'categories.list': ('get', '/api/categories/', None, False),
+            'cart.detail': ('get', '/api/cart/', None, True),
+            'orders.list': ('get', '/api/orders/', None, True),
+            'orders.create': ('post', '/api/orders/', {
+                'address_id': f['address_id'], 'items': order_items,
+            }, True),
+            # Order-inquiry intent is answered without OpenAI, so this measures
+            # the conversation/context/product-search work on our side.
+            'chat.send': ('post', '/api/support/chat/send/', {
+                'message': 'Where is my order?', 'conversation_id': f['conversation_id'],
+            }, True),
+        }
+        if live_external:
+            scenarios['chat.send.search'] = ('post', '/api/support/chat/send/', {
+                'message': 'Show me wireless headphones', 'conversation_id': f['conversation_id'],
+            }, True)
+        return scenarios
+
+    # -- running -----------------------------------------------------------
+    def _request(self, scenario, user, cold=False):
+        method, path, body, authenticated = scenario
+        if cold:
+            cache.clear()
+            clear_local_caches()
+        client = APIClient(raise_request_exception=False)
+        if authenticated:
+            client.force_authenticate(user=user)
+        status_code = None
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            if method == 'get':
+                status_code = client.get(path).status_code
+            else:
+                # Writes are rolled back so every run sees the same data.
+                try:
+                    with transaction.atomic():
+                        status_code = getattr(client, method)(path, body, format='json').status_code
+                        raise _Rollback
+                except _Rollback:
+                    pass
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        connection.close_if_unusable_or_obsolete()
+        return elapsed_ms, len(queries), status_code
+
+    def _run(self, name, scenario, user, options):
+        cold = options['cache'] == 'cold'
+        for _ in range(options['warmup']):
+            self._request(scenario, user, cold)
+
+        iterations = options['iterations']
+        started = time.perf_counter()
+        if options['concurrency'] > 1:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                samples = list(pool.map(lambda _: self._request(scenario, user, cold), range(iterations)))
+        else:
+            samples = [self._request(scenario, user, cold) for _ in range(iterations)]
+        wall = time.perf_counter() - started
+
+        latencies = sorted(s[0] for s in samples)
+        queries = [s[1] for s in samples]
+        errors = sum(1 for s in samples if s[2] is None or s[2] >= 400)
+        return {
+            'iterations': iterations,
+            'concurrency': options['concurrency'],
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'throughput_rps': round(iterations / wall, 2) if wall else 0.0,
+            'queries_avg': round(sum(queries) / len(queries), 1),
+            'queries_max': max(queries),
+            'errors': errors,
+            'status': samples[-1][2],
+        }
+
+    # -- reporting ---------------------------------------------------------
+    def _print_row(self, name, r):
+        line = (
+            f'{name:<26} p50 {r["p50_ms"]:>8.1f}ms  p95 {r["p95_ms"]:>8.1f}ms  '
+            f'p99 {r["p99_ms"]:>8.1f}ms  {r["throughput_rps"]:>7.1f} rps  '
+            f'queries {r["queries_avg"]:>6.1f} (max {r["queries_max"]})  status {r["status"]}'
+        )
+        self.stdout.write(self.style.ERROR(line) if r['errors'] else line)
+
+    def _meta(self, options):
+        try:
+            commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                    text=True, timeout=5).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            commit = ''
+        return {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'commit': commit,
+            'iterations': options['iterations'],
+            'concurrency': options['concurrency'],
+            'cache': options['cache'],
+            'database': connection.vendor,
+            'products': Product.objects.count(),
+            'pid': os.getpid(),
+        }
+
+    def _compare(self, path, results, threshold, mode):
+        with open(path) as fh:
+            data = json.load(fh)
+        baseline = data['results']
+        self.stdout.write(f'\nCompared with {path} (threshold {threshold:.0f}%):')
+        base_mode = data['meta'].get('cache', 'warm')
+        if base_mode != mode:
+            self.stdout.write(self.style.WARNING(f'  baseline measured with --cache {base_mode}, this run with {mode}'))
+        regressed = False
+        for name, r in results.items():
+            base = baseline.get(name)
+            if base is None:
+                self.stdout.write(f'  {name:<26} (no baseline)')
+                continue
+            p95_delta = (r['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 if base['p95_ms'] else 0.0
+            q_delta = r['queries_avg'] - base['queries_avg']
+            bad = p95_delta > threshold or (base['queries_avg'] and q_delta / base['queries_avg'] * 100 > threshold)
+            regressed |= bool(bad)
+            line = (f'  {name:<26} p95 {base["p95_ms"]:>8.1f} -> {r["p95_ms"]:>8.1f}ms ({p95_delta:+.0f}%)  '
+                    f'queries {base["queries_avg"]:.1f} -> {r["queries_avg"]:.1f}')
+            self.stdout.write(self.style.ERROR(line) if bad else self.style.SUCCESS(line))
+        return regressed
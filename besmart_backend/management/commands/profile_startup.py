@@ -0,0 +1,136 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# SDKs that should only be imported on first use, never while a worker boots.
+LAZY_MODULES = ('supabase', 'openai', 'boto3', 'botocore')
+
+# Runs in a fresh interpreter under ``-X importtime`` and does what a gunicorn
+# worker does before serving: set up Django, build the WSGI app and load the
+# URLconf (which imports every app's views).
+_BOOT_SCRIPT = r'''
+import json, os, sys, time
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as fh:
+            for line in fh:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+rss_start = rss_kb()
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+setup_ms = (time.perf_counter() - start) * 1000
+from django.urls import get_resolver
+get_resolver().url_patterns
+boot_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({
+    'setup_ms': setup_ms,
+    'boot_ms': boot_ms,
+    'rss_start_kb': rss_start,
+    'rss_kb': rss_kb(),
+    'modules': len(sys.modules),
+    'lazy_loaded': sorted(m for m in json.loads(os.environ['PROFILE_LAZY_MODULES']) if m in sys.modules),
+}))
+'''
+
+
+def parse_importtime(stderr):
+    """
+    Parse ``-X importtime`` output into (module, self_us, cumulative_us)
+    tuples, in import order.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            rows.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Profile worker startup in a fresh interpreter: total boot time, '
+        'resident memory, and the slowest imports by package and module. '
+        'Use --strict to fail when an SDK in LAZY_MODULES is imported at boot.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='Rows to show per table')
+        parser.add_argument('--runs', type=int, default=3,
+                            help='Boot this many times and report the fastest (imports are cached by the OS after the first)')
+        parser.add_argument('--json', dest='json_path', help='Write the full report to this JSON file')
+        parser.add_argument('--strict', action='store_true',
+                            help='Exit non-zero if any LAZY_MODULES package is imported during boot')
+
+    def handle(self, *args, **options):
+        runs = [self._boot() for _ in range(max(1, options['runs']))]
+        summary, rows = min(runs, key=lambda r: r[0]['boot_ms'])
+
+        by_package = defaultdict(int)
+        for name, self_us, _ in rows:
+            by_package[name.split('.', 1)[0]] += self_us
+        packages = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)
+        modules = sorted(rows, key=lambda r: r[2], reverse=True)
+
+        top = options['top']
+        self.stdout.write(
+            f'Boot {summary["boot_ms"]:.0f}ms (django.setup + WSGI app {summary["setup_ms"]:.0f}ms), '
+            f'RSS {summary["rss_kb"] / 1024:.1f}MB '
+            f'(+{(summary["rss_kb"] - summary["rss_start_kb"]) / 1024:.1f}MB over a bare interpreter), '
+            f'{summary["modules"]} modules'
+        )
+        self.stdout.write('\nSlowest packages (self time of all their modules):')
+        for name, us in packages[:top]:
+            self.stdout.write(f'  {us / 1000:>8.1f}ms  {name}')
+        self.stdout.write('\nSlowest modules (cumulative, including what they import):')
+        for name, _, cumulative_us in modules[:top]:
+            self.stdout.write(f'  {cumulative_us / 1000:>8.1f}ms  {name}')
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump({
+                    **summary,
+                    'packages': [{'package': n, 'self_ms': us / 1000} for n, us in packages],
+                    'imports': [{'module': n, 'self_ms': s / 1000, 'cumulative_ms': c / 1000}
+                                for n, s, c in rows],
+                }, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\nReport written to {options["json_path"]}'))
+
+        eager = summary['lazy_loaded']
+        if eager:
+            message = f'Imported at boot but expected to be lazy: {", ".join(eager)}'
+            if options['strict']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+
+    def _boot(self):
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE),
+            'PROFILE_LAZY_MODULES': json.dumps(LAZY_MODULES),
+        }
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _BOOT_SCRIPT],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        if proc.returncode != 0:
+            tail = [l for l in proc.stderr.splitlines() if not l.startswith('import time:')][-15:]
+            raise CommandError('Boot failed:\n' + '\n'.join(tail))
+        return json.loads(proc.stdout.strip().splitlines()[-1]), parse_importtime(proc.stderr)
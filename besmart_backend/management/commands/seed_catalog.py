@@ -0,0 +1,313 @@
+import random
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from categories.models import Category, Subcategory
+from orders.models import Cart, CartItem, Order, OrderItem, ShippingAddress
+from products.models import Product, ProductReview
+from support.models import ChatConversation, ChatMessage
+from vendors.models import Vendor
+
+User = get_user_model()
+
+SEED_EMAIL_DOMAIN = 'seed.besmart.test'
+SEED_SKU_PREFIX = 'SEED-'
+
+CATEGORY_NAMES = [
+    'Fashion', 'Electronics', 'Home & Kitchen', 'Beauty', 'Sports',
+    'Books', 'Toys', 'Grocery', 'Automotive', 'Health',
+]
+ADJECTIVES = ['Classic', 'Premium', 'Smart', 'Slim', 'Wireless', 'Organic', 'Vintage',
+              'Portable', 'Deluxe', 'Eco', 'Ultra', 'Compact', 'Modern', 'Rugged']
+NOUNS = ['Sneakers', 'Headphones', 'Blender', 'Jacket', 'Watch', 'Backpack', 'Lamp',
+         'Serum', 'Dress', 'Speaker', 'Kettle', 'Yoga Mat', 'Phone Case', 'Sunglasses',
+         'Novel', 'Drone', 'Toolkit', 'Perfume', 'Sandals', 'Keyboard']
+BRANDS = ['Adire', 'Lagos Lux', 'Naija Tech', 'Eko', 'Kano Craft', 'Ankara & Co',
+          'Zuma', 'Obi', 'Niger Delta', 'Abuja Basics', 'Sahel', 'Jollof Home']
+SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+COLORS = ['black', 'white', 'red', 'blue', 'green', 'beige']
+CHAT_LINES = [
+    'I need running shoes under 20000', 'Show me wireless headphones',
+    'Where is my order?', 'Do you have this jacket in XL?', 'Any deals on kettles today?',
+    'Recommend a gift for my sister', 'What is your return policy?',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed the database with a synthetic catalog (products, vendors, reviews, '
+        'orders, carts and chat history) for benchmarking. Seeded rows are tagged '
+        f'(SKU prefix {SEED_SKU_PREFIX!r}, emails @{SEED_EMAIL_DOMAIN}) and can be '
+        'removed with --flush. --seed fixes the generated values and relationships; '
+        'row ids, the per-run tag and the spread dates are random.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100000)
+        parser.add_argument('--vendors', type=int, default=500)
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--reviews', type=int, default=300000, help='Total product reviews')
+        parser.add_argument('--orders', type=int, default=50000)
+        parser.add_argument('--conversations', type=int, default=5000)
+        parser.add_argument('--messages-per-conversation', type=int, default=10)
+        parser.add_argument('--cart-users', type=int, default=200, help='Users that get a filled cart')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Random seed for names, prices, ratings and relationships')
+        parser.add_argument('--flush', action='store_true', help='Delete previously seeded rows and exit')
+        parser.add_argument('--allow-remote', action='store_true',
+                            help='Allow seeding a non-local database host')
+
+    def handle(self, *args, **options):
+        self._guard_database(options['allow_remote'])
+        self.batch_size = options['batch_size']
+        self.rng = random.Random(options['seed'])
+        # Tags the unique columns (SKUs, vendor emails, order numbers) so a
+        # second run without --flush adds rows instead of colliding.
+        self.run = uuid.uuid4().hex[:6]
+
+        if options['flush']:
+            self._flush()
+            return
+
+        with transaction.atomic():
+            categories = self._seed_categories()
+            users = self._seed_users(options['users'])
+            vendors = self._seed_vendors(options['vendors'])
+            products = self._seed_products(options['products'], categories, vendors)
+            self._seed_reviews(options['reviews'], products, users)
+            addresses = self._seed_addresses(users)
+            self._seed_orders(options['orders'], products, users, addresses)
+            self._seed_carts(options['cart_users'], products, users)
+            self._seed_chat(options['conversations'], options['messages_per_conversation'], users)
+            self._spread_dates()
+
+        with connection.cursor() as c:
+            for table in ('products', 'product_reviews', 'orders', 'order_items', 'chat_messages'):
+                c.execute(f'ANALYZE {table}')
+
+        self.stdout.write(self.style.SUCCESS('Seeding complete.'))
+
+    # -- guards / cleanup --------------------------------------------------
+    def _guard_database(self, allow_remote):
+        db = settings.DATABASES['default']
+        if db['ENGINE'].endswith('sqlite3'):
+            raise CommandError('seed_catalog needs PostgreSQL (array and JSON columns).')
+        host = db.get('HOST') or 'localhost'
+        local = host in ('localhost', '127.0.0.1', '::1', 'db', 'postgres') or host.startswith('/')  # Unix socket
+        if not local and not allow_remote:
+            raise CommandError(f'Refusing to seed remote database host {host!r}; pass --allow-remote.')
+
+    def _flush(self):
+        with transaction.atomic():
+            users = User.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}')
+            products = Product.objects.filter(sku__startswith=SEED_SKU_PREFIX)
+            ChatConversation.objects.filter(user__in=users).delete()
+            CartItem.objects.filter(cart__user__in=users).delete()
+            OrderItem.objects.filter(order__user__in=users).delete()
+            Order.objects.filter(user__in=users).delete()
+            ProductReview.objects.filter(product__in=products).delete()
+            deleted, _ = products.delete()
+            Vendor.objects.filter(business_email__endswith=f'@{SEED_EMAIL_DOMAIN}').delete()
+            users.delete()
+        self.stdout.write(self.style.SUCCESS(f'Removed seeded data ({deleted} products).'))
+
+    # -- seeders -----------------------------------------------------------
+    def _bulk(self, model, objs):
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.stdout.write(f'  {model._meta.db_table}: {len(objs)}')
+        return objs
+
+    def _seed_categories(self):
+        categories = []
+        for name in CATEGORY_NAMES:
+            category, _ = Category.objects.get_or_create(name=name, defaults={'is_active': True})
+            for i in range(1, 6):
+                Subcategory.objects.get_or_create(name=f'{name} {i}', category=category)
+            categories.append((category.id, list(category.subcategories.values_list('id', flat=True))))
+        return categories
+
+    def _seed_users(self, count):
+        self.stdout.write('Seeding users...')
+        existing = User.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}').count()
+        users = [
+            User(email=f'user{i}@{SEED_EMAIL_DOMAIN}', username=f'user{i}@{SEED_EMAIL_DOMAIN}')
+            for i in range(existing, count)
+        ]
+        self._bulk(User, users)
+        return list(User.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}').values_list('id', flat=True))
+
+    def _seed_vendors(self, count):
+        self.stdout.write('Seeding vendors...')
+        rng = self.rng
+        vendors = [
+            Vendor(
+                business_name=f'{rng.choice(BRANDS)} Store {i}',
+                business_email=f'vendor{i}-{self.run}@{SEED_EMAIL_DOMAIN}',
+                status='approved',
+                verification_status='verified',
+                is_featured=rng.random() < 0.05,
+                average_rating=Decimal(rng.randint(300, 500)) / 100,
+                total_reviews=rng.randint(0, 2000),
+            )
+            for i in range(count)
+        ]
+        return [v.id for v in self._bulk(Vendor, vendors)]
+
+    def _seed_products(self, count, categories, vendors):
+        self.stdout.write('Seeding products...')
+        rng = self.rng
+        products = []
+        for i in range(count):
+            category_id, subcategory_ids = rng.choice(categories)
+            price = Decimal(rng.randint(500, 500000)) / 100
+            on_sale = rng.random() < 0.15
+            discount = Decimal(rng.choice([5, 10, 15, 20, 30, 50])) if on_sale else None
+            name = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}'
+            products.append(Product(
+                name=name,
+                description=f'{name} by {rng.choice(BRANDS)}. ' + ' '.join(rng.sample(ADJECTIVES, 5)).lower(),
+                price=price,
+                images=f'https://picsum.photos/seed/{i}/600/600',
+                sizes=rng.sample(SIZES, rng.randint(0, 4)),
+                colors={c: f'#{rng.randrange(0xFFFFFF):06x}' for c in rng.sample(COLORS, 2)},
+                rating=Decimal(rng.randint(0, 500)) / 100,
+                reviews=0,
+                in_stock=rng.random() > 0.05,
+                category_id=category_id,
+                subcategory_id=rng.choice(subcategory_ids) if subcategory_ids else None,
+                brand=rng.choice(BRANDS),
+                discount_percentage=discount,
+                is_on_sale=on_sale,
+                sale_price=(price * (100 - discount) / 100).quantize(Decimal('0.01')) if on_sale else None,
+                is_featured=rng.random() < 0.02,
+                is_new_arrival=rng.random() < 0.05,
+                vendor_id=rng.choice(vendors) if vendors else None,
+                approval_status='approved' if rng.random() > 0.03 else 'pending',
+                status='active' if rng.random() > 0.02 else 'inactive',
+                sku=f'{SEED_SKU_PREFIX}{self.run}-{i:07d}',
+                stock_quantity=rng.randint(0, 500),
+            ))
+        return [p.id for p in self._bulk(Product, products)]
+
+    def _seed_reviews(self, count, products, users):
+        self.stdout.write('Seeding reviews...')
+        rng = self.rng
+        # Skewed towards a popular head of the catalog, like real traffic.
+        head = products[:max(1, len(products) // 10)]
+        reviews = []
+        for _ in range(count):
+            product_id = rng.choice(head) if rng.random() < 0.7 else rng.choice(products)
+            reviews.append(ProductReview(
+                product_id=product_id,
+                user_id=rng.choice(users),
+                rating=rng.choices([1, 2, 3, 4, 5], weights=[5, 5, 15, 35, 40])[0],
+                title=rng.choice(['Great', 'Okay', 'Love it', 'Not bad', 'Disappointed']),
+                content=' '.join(rng.sample(ADJECTIVES, 6)).lower(),
+                images=[f'https://picsum.photos/seed/r{rng.randint(0, 10**6)}/300'] if rng.random() < 0.1 else [],
+                verified_purchase=rng.random() < 0.6,
+                helpful_count=rng.randint(0, 50),
+            ))
+            if len(reviews) >= self.batch_size:
+                ProductReview.objects.bulk_create(reviews)
+                reviews = []
+        # products.rating/reviews and product_reviews_summary follow via
+        # the review triggers (migration products 0010).
+        ProductReview.objects.bulk_create(reviews)
+        self.stdout.write(f'  product_reviews: {count}')
+
+    def _seed_addresses(self, users):
+        self.stdout.write('Seeding shipping addresses...')
+        have = set(ShippingAddress.objects.filter(user_id__in=users).values_list('user_id', flat=True))
+        addresses = [
+            ShippingAddress(user_id=u, name='Seed User', phone='+2348000000000',
+                            address_line1='1 Marina Road', city='Lagos', state='Lagos',
+                            zip='100001', country='Nigeria', is_default=True)
+            for u in users if u not in have
+        ]
+        self._bulk(ShippingAddress, addresses)
+        return dict(ShippingAddress.objects.filter(user_id__in=users, is_default=True).values_list('user_id', 'id'))
+
+    def _seed_orders(self, count, products, users, addresses):
+        self.stdout.write('Seeding orders...')
+        rng = self.rng
+        statuses = ['pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled']
+        prices = dict(Product.objects.filter(id__in=products[:20000]).values_list('id', 'price'))
+        priced = list(prices)
+        orders, items = [], []
+        for i in range(count):
+            user_id = rng.choice(users)
+            lines = [(rng.choice(priced), rng.randint(1, 3)) for _ in range(rng.randint(1, 4))]
+            subtotal = sum(prices[p] * q for p, q in lines)
+            order = Order(
+                user_id=user_id, address_id=addresses.get(user_id),
+                subtotal=subtotal, shipping_fee=Decimal('0'), total=subtotal,
+                status=rng.choice(statuses), order_number=f'SEED{self.run}{i:09d}',
+                payment_status=rng.choice(['pending', 'paid']),
+                shipping_method='cash_on_delivery',
+            )
+            orders.append(order)
+            items.extend(
+                OrderItem(order=order, product_id=p, quantity=q, price=prices[p],
+                          selected_size=rng.choice(SIZES), selected_color=rng.choice(COLORS))
+                for p, q in lines
+            )
+        self._bulk(Order, orders)
+        self._bulk(OrderItem, items)
+
+    def _seed_carts(self, count, products, users):
+        self.stdout.write('Seeding carts...')
+        rng = self.rng
+        carts = []
+        for user_id in users[:count]:
+            cart, _ = Cart.objects.get_or_create(user_id=user_id)
+            carts.append(cart)
+        CartItem.objects.filter(cart__in=carts).delete()
+        items = [
+            CartItem(cart=cart, product_id=rng.choice(products), quantity=rng.randint(1, 3),
+                     selected_size=rng.choice(SIZES), selected_color=rng.choice(COLORS))
+            for cart in carts for _ in range(rng.randint(3, 12))
+        ]
+        self._bulk(CartItem, items)
+
+    def _seed_chat(self, conversations, per_conversation, users):
+        self.stdout.write('Seeding chat history...')
+        rng = self.rng
+        convs = [
+            ChatConversation(user_id=rng.choice(users), title=rng.choice(CHAT_LINES)[:50])
+            for _ in range(conversations)
+        ]
+        self._bulk(ChatConversation, convs)
+        messages = []
+        for conv in convs:
+            for j in range(per_conversation):
+                bot = j % 2 == 1
+                messages.append(ChatMessage(
+                    conversation=conv,
+                    sender_type='bot' if bot else 'user',
+                    message_text='Here are some options for you.' if bot else rng.choice(CHAT_LINES),
+                    message_type='text',
+                    metadata={'intent_type': 'product_search'} if bot else None,
+                ))
+        self._bulk(ChatMessage, messages)
+
+    def _spread_dates(self):
+        """bulk_create stamps every row with now(); spread them over a year."""
+        with connection.cursor() as c:
+            c.execute("""
+                UPDATE products SET added_date = now() - random() * interval '365 days'
+                WHERE sku LIKE %s
+            """, [f'{SEED_SKU_PREFIX}%'])
+            c.execute("""
+                UPDATE orders SET created_at = now() - random() * interval '365 days'
+                WHERE order_number LIKE 'SEED%%'
+            """)
+            c.execute("""
+                UPDATE product_reviews r SET created_at = now() - random() * interval '365 days'
+                FROM products p WHERE p.id = r.product_id AND p.sku LIKE %s
+            """, [f'{SEED_SKU_PREFIX}%'])
@@ -0,0 +1,99 @@
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from . import perf
+
+logger = logging.getLogger('besmart.perf')
+
+
+class PerformanceMiddleware:
+    """
+    Records wall time, SQL query count/time, repeated-query fingerprints
+    (N+1 detection) and outbound Supabase / OpenAI / Squad calls for a
+    sample of requests (PERF_SAMPLE_RATE).
+
+    Each sampled request produces one JSON log line on the ``besmart.perf``
+    logger; requests whose queries repeat PERF_NPLUSONE_THRESHOLD or more
+    times are logged at WARNING.  With PERF_SERVER_TIMING the numbers are
+    also returned in a ``Server-Timing`` header for browser dev tools.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PERF_INSTRUMENTATION_ENABLED or random.random() >= settings.PERF_SAMPLE_RATE:
+            return self.get_response(request)
+
+        stats, token = perf.start_request()
+        wrapper = _QueryTimer(stats)
+        try:
+            with connections['default'].execute_wrapper(wrapper):
+                response = self.get_response(request)
+        finally:
+            perf.end_request(token)
+
+        total_ms = stats.elapsed_ms()
+        if settings.PERF_SERVER_TIMING:
+            response['Server-Timing'] = _server_timing(stats, total_ms)
+        self._log(request, response, stats, total_ms)
+        return response
+
+    def _log(self, request, response, stats, total_ms):
+        duplicates = stats.duplicates(settings.PERF_NPLUSONE_THRESHOLD)
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 1),
+            'db_queries': stats.db_queries,
+            'db_ms': round(stats.db_ms, 1),
+            'external': {
+                service: {
+                    'calls': s['calls'],
+                    'errors': s['errors'],
+                    'ms': round(s['ms'], 1),
+                    'endpoints': s['endpoints'],
+                }
+                for service, s in stats.external.items()
+            },
+        }
+        if duplicates:
+            record['n_plus_one'] = [
+                {'count': n, 'ms': round(ms, 1), 'sql': fp[:300]}
+                for n, ms, fp in duplicates[:3]
+            ]
+            logger.warning(json.dumps(record))
+        elif total_ms >= settings.PERF_SLOW_REQUEST_MS:
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+
+
+class _QueryTimer:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.stats.add_query(sql, (time.perf_counter() - start) * 1000)
+
+
+def _server_timing(stats, total_ms):
+    parts = [
+        f'total;dur={total_ms:.1f}',
+        f'db;dur={stats.db_ms:.1f};desc="{stats.db_queries} queries"',
+    ]
+    for service, s in stats.external.items():
+        parts.append(f'{service};dur={s["ms"]:.1f};desc="{s["calls"]} calls"')
+    return ', '.join(parts)
@@ -0,0 +1,206 @@
+"""
+Keyset (seek) pagination.
+
+DRF's CursorPagination seeks on the first ordering field only and skips
+ties with an OFFSET, which degrades on low-cardinality keys like price or
+rating.  ``KeysetPagination`` always orders by ``(<key>, <tiebreaker>)``
+and seeks with ``key < v OR (key = v AND id < id)`` so every page is an
+index range scan, however deep the client scrolls.
+
+Cursors are opaque (base64 JSON holding the key values of the boundary row,
+``null`` for a NULL key, and the direction) and bound to the sort key they were issued for.  The
+response carries ``next``/``previous`` links and ``results`` only; there is
+no COUNT(*).
+
+When a search filter annotated a relevance score (``relevance_key``) and
+the client did not ask for an ordering, pages are keyed on that score.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    # Sort key used when the request does not pick one; '-' for descending.
+    ordering = '-added_date'
+    # Fields a client may sort by through the view's OrderingFilter.
+    keyset_fields = ('added_date',)
+    tiebreaker = 'id'
+    # Annotation (e.g. ts_rank from a search filter) to page by, descending,
+    # when the client did not pass an ordering.
+    relevance_key = 'search_rank'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.key, self.descending = self.get_sort_key(request, queryset, view)
+        cursor = self.decode_cursor(request, queryset)
+        reverse = bool(cursor and cursor['reverse'])
+
+        # Walking backwards flips the order; the page is flipped back below.
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.key}', f'{prefix}{self.tiebreaker}')
+        tail = None
+        if cursor:
+            queryset, tail = self.seek(queryset, *cursor['values'], descending)
+
+        rows = list(queryset[:self.page_size + 1])
+        if tail is not None and len(rows) <= self.page_size:
+            rows += tail[:self.page_size + 1 - len(rows)]
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def seek(self, queryset, value, tie, descending):
+        """
+        Split the rows after ``(value, tie)`` into ``(head, tail)`` querysets,
+        each an index range in page order; ``tail`` (or None) follows ``head``.
+
+        Postgres sorts NULL keys after every value, so they trail an ascending
+        walk and lead a descending one.  Keeping them in their own range
+        instead of OR-ing ``key IS NULL`` into the seek keeps the common case
+        a single range scan; the tail is only read once the head runs out.
+        """
+        key, op = self.key, 'lt' if descending else 'gt'
+        nulls = queryset.filter(**{f'{key}__isnull': True})
+        if value is None:
+            head = nulls.filter(**{f'{self.tiebreaker}__{op}': tie})
+            return head, queryset.filter(**{f'{key}__isnull': False}) if descending else None
+        # The redundant ``key <= value`` bound is what starts the index
+        # scan at the cursor; Postgres only applies the OR as a filter.
+        head = queryset.filter(
+            Q(**{f'{key}__{op}e': value}),
+            Q(**{f'{key}__{op}': value}) | Q(**{key: value, f'{self.tiebreaker}__{op}': tie}),
+        )
+        return head, None if descending else nulls
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_sort_key(self, request, queryset, view):
+        """Return (field, descending) for the requested ordering, or the default."""
+        ordering = None
+        for backend in getattr(view, 'filter_backends', None) or ():
+            if issubclass(backend, OrderingFilter):
+                if backend.ordering_param not in request.query_params and \
+                        self.relevance_key in queryset.query.annotations:
+                    return self.relevance_key, True
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        else:
+            if self.relevance_key in queryset.query.annotations:
+                return self.relevance_key, True
+        term = ordering[0] if ordering and len(ordering) == 1 else self.ordering
+        field = term.lstrip('-')
+        if field not in self.keyset_fields:
+            term = self.ordering
+            field = term.lstrip('-')
+        return field, term.startswith('-')
+
+    # -- cursors -----------------------------------------------------------
+    def encode_cursor(self, row, reverse):
+        value = getattr(row, self.key)
+        payload = {
+            'k': self.key,
+            'v': [None if value is None else str(value), str(getattr(row, self.tiebreaker))],
+            'r': int(reverse),
+        }
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        token = base64.urlsafe_b64encode(raw).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def key_field(self, queryset, name):
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+    def decode_cursor(self, request, queryset):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            if payload['k'] != self.key:
+                raise ValueError('cursor issued for another ordering')
+            value, tie = payload['v']
+            values = (
+                None if value is None else self.key_field(queryset, self.key).to_python(value),
+                self.key_field(queryset, self.tiebreaker).to_python(tie),
+            )
+            return {'values': values, 'reverse': bool(payload.get('r'))}
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor from a previous next/previous link.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Results per page (max {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+        ]
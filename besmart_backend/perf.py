@@ -0,0 +1,97 @@
+"""
+Per-request performance recorder.
+
+PerformanceMiddleware opens a ``RequestStats`` for each sampled request and
+stores it in a context variable; code that talks to other services reports
+into it with ``track_external()`` (or ``record_external()`` when the timing
+is already known).  Outside a sampled request both are no-ops, so service
+code can call them unconditionally.
+"""
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('besmart_perf_request', default=None)
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql: str) -> str:
+    """Collapse literals, IN-lists and whitespace so repeats of one query
+    with different parameters compare equal."""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERAL.sub('?', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.fingerprints = {}
+        self.external = {}
+
+    def add_query(self, sql, elapsed_ms):
+        self.db_queries += 1
+        self.db_ms += elapsed_ms
+        fp = fingerprint(sql)
+        entry = self.fingerprints.get(fp)
+        if entry is None:
+            self.fingerprints[fp] = [1, elapsed_ms]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed_ms
+
+    def add_external(self, service, name, elapsed_ms, failed):
+        s = self.external.setdefault(service, {'calls': 0, 'errors': 0, 'ms': 0.0, 'endpoints': {}})
+        s['calls'] += 1
+        s['ms'] += elapsed_ms
+        s['endpoints'][name] = s['endpoints'].get(name, 0) + 1
+        if failed:
+            s['errors'] += 1
+
+    def duplicates(self, threshold):
+        """[(count, total_ms, fingerprint)] for queries repeated >= threshold times."""
+        dupes = [(n, ms, fp) for fp, (n, ms) in self.fingerprints.items() if n >= threshold]
+        return sorted(dupes, reverse=True)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def start_request() -> tuple:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def record_external(service, name, elapsed_ms, failed=False):
+    stats = _current.get()
+    if stats is not None:
+        stats.add_external(service, name, elapsed_ms, failed)
+
+
+@contextmanager
+def track_external(service, name):
+    """Time an outbound call, e.g. ``with track_external('squad', 'transaction.verify'):``."""
+    if _current.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        record_external(service, name, (time.perf_counter() - start) * 1000, failed)
@@ -0,0 +1,503 @@
+"""
+Declarative SQL query budgets for the API.
+
+``BUDGETS`` maps each app to the GET endpoints it serves and the most SQL
+queries a single request may run against the standard fixture below
+(``FIXTURE_SIZES``: 20 cart items, 50 orders of 3 items, ...).  Because the
+fixture is large, a serializer that starts querying per row (N+1) blows its
+budget instead of slipping through.
+
+Every GET route of an app must appear either in ``BUDGETS`` or in
+``UNBUDGETED`` with a reason, so new endpoints cannot skip review.
+
+Each app's ``tests.py`` runs its own slice via ``QueryBudgetTestCase``:
+
+    class OrderQueryBudgetTests(QueryBudgetTestCase):
+        app = 'orders'
+"""
+from decimal import Decimal
+from typing import NamedTuple
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.test import APIClient
+
+from .cache import clear_local_caches
+from .perf import fingerprint
+
+
+class Budget(NamedTuple):
+    url_name: str
+    max_queries: int
+    kwargs: str = ''        # fixture attribute holding the URL kwargs
+    auth: bool = False
+    query: str = ''
+    status: int = 200
+
+
+FIXTURE_SIZES = {
+    'products': 60,
+    'cart_items': 20,
+    'orders': 50,
+    'items_per_order': 3,
+    'wishlist': 20,
+    'reviews': 30,
+    'questions': 10,
+    'page_rows': 5,         # offers/highlights/posters/specs/recommendations per product
+    'followers': 30,
+    'vendor_reviews': 10,
+    'conversations': 3,
+    'chat_messages': 40,
+    'payment_methods': 5,
+    'payments': 20,
+    'admin_users': 5,
+    'admin_logs': 30,
+    'app_settings': 10,
+}
+
+BUDGETS = {
+    'products': [
+        Budget('product-list', 1),
+        Budget('product-list', 1, query='?category_id={category_id}'),
+        Budget('product-list', 1, query='?search=budget'),
+        Budget('product-featured', 1),
+        Budget('product-home-feed', 4),
+        Budget('product-new-arrivals', 1),
+        Budget('product-on-sale', 2),
+        Budget('product-search', 2, query='?search=budget'),
+        # pg_trgm check (once per process), then one UNION ALL query; with
+        # pg_trgm also set_config and its savepoint.
+        Budget('product-typeahead', 5, query='?q=ite'),
+        Budget('product-detail', 1, kwargs='product'),
+        Budget('product-full', 3, kwargs='product'),
+        Budget('product-full', 3, kwargs='product', query='?include=product,offers'),
+        Budget('product-delivery-info', 3, kwargs='product'),
+        Budget('product-warranty-info', 3, kwargs='product'),
+        Budget('product-offers', 3, kwargs='product'),
+        Budget('product-highlights', 3, kwargs='product'),
+        Budget('product-feature-posters', 3, kwargs='product'),
+        Budget('product-specifications', 3, kwargs='product'),
+        Budget('product-recommendations', 3, kwargs='product'),
+        Budget('product-reviews-summary', 2, kwargs='product'),
+        Budget('product-reviews', 3, kwargs='product'),
+        Budget('product-reviews', 3, kwargs='product', query='?sort_by=rating&has_media=true'),
+        Budget('product-qa', 5, kwargs='product'),
+        Budget('product-can-review', 3, kwargs='product', auth=True),
+    ],
+    'orders': [
+        Budget('shipping-address-list', 2, auth=True),
+        Budget('shipping-address-detail', 1, kwargs='address', auth=True),
+        Budget('cart-detail', 2, auth=True),
+        Budget('cart-summary', 2, auth=True),
+        Budget('wishlist-list', 2, auth=True),
+        Budget('order-list', 3, auth=True),
+        Budget('order-detail', 2, kwargs='order', auth=True),
+        Budget('order-track', 1, kwargs='order', auth=True),
+        Budget('order-invoice', 3, kwargs='order', auth=True),
+    ],
+    'vendors': [
+        Budget('vendor-list', 2),
+        Budget('vendor-featured', 1),
+        Budget('vendor-search', 2, query='?q=Store'),
+        Budget('vendor-following', 2, auth=True),
+        Budget('vendor-detail', 2, kwargs='vendor'),
+        Budget('vendor-products', 3, kwargs='vendor'),
+        Budget('vendor-reviews', 4, kwargs='vendor'),
+        Budget('vendor-my-review', 2, kwargs='vendor', auth=True),
+        Budget('vendor-follow', 2, kwargs='vendor', auth=True),
+        Budget('vendor-followers', 3, kwargs='vendor'),
+        Budget('subscription-plans', 1),
+    ],
+    'categories': [
+        Budget('category-list', 2),
+        Budget('category-detail', 2, kwargs='category'),
+        Budget('category-subcategories', 3, kwargs='category'),
+        Budget('category-products', 3, kwargs='category'),
+        Budget('category-size-chart', 2, kwargs='category', status=404),
+        Budget('category-has-size-chart', 2, kwargs='category'),
+        Budget('subcategory-list', 2),
+    ],
+    'content': [
+        Budget('content-hero-section', 1),
+        Budget('content-contact-info', 1),
+        Budget('content-support-info', 1),
+        Budget('content-banners', 1),
+        Budget('content-faqs', 1),
+    ],
+    'loyalty': [
+        # First read creates the loyalty_points row.
+        Budget('loyalty-points', 4, auth=True),
+        Budget('loyalty-transactions', 1, auth=True),
+        Budget('loyalty-rewards', 1, auth=True),
+        Budget('loyalty-vouchers', 1, auth=True),
+        Budget('loyalty-badges', 1, auth=True),
+        Budget('loyalty-user-badges', 4, auth=True),
+        Budget('loyalty-badge-progress', 3, auth=True),
+        Budget('loyalty-tier-info', 2, auth=True),
+    ],
+    'support': [
+        Budget('support-chat-list', 4, auth=True),
+        Budget('support-chat-detail', 3, kwargs='conversation', auth=True),
+        Budget('support-chat-messages', 3, kwargs='conversation', auth=True),
+        Budget('support-chat-unread-count', 1, auth=True),
+        Budget('support-chat-search-messages', 2, auth=True, query='?q=hello'),
+        Budget('support-chat-analytics', 1, auth=True),
+        Budget('support-branches', 1),
+    ],
+    'users': [
+        Budget('user_profile', 1, auth=True),
+        Budget('user_profile_alias', 1, auth=True),
+        Budget('account-deletion-eligibility', 1, auth=True),
+    ],
+    'currency': [
+        Budget('currency-rates', 1),
+        Budget('currency-exchange-rate', 1, query='?from=USD&to=NGN'),
+        # No direct EUR -> NGN rate: crossed via USD.
+        Budget('currency-exchange-rate', 3, query='?from=EUR&to=NGN'),
+        # First read creates the preference row.
+        Budget('currency-preference', 4, auth=True),
+        Budget('currency-rates-manage-list', 2, auth=True),
+        Budget('currency-rates-manage-detail', 1, kwargs='currency_rate', auth=True),
+    ],
+    'payments': [
+        Budget('payment-methods', 2, auth=True),
+        Budget('payment-method-detail', 1, kwargs='payment_method', auth=True),
+        Budget('payment-list', 2, auth=True),
+        Budget('payment-detail', 1, kwargs='payment', auth=True),
+    ],
+    'admin_api': [
+        Budget('admin-logs', 2, auth=True),
+        Budget('admin-stats', 4, auth=True),
+        Budget('admin-users-list', 2, auth=True),
+        Budget('admin-users-detail', 1, kwargs='admin_user', auth=True),
+        Budget('app-settings-list', 2, auth=True),
+        Budget('app-settings-detail', 1, kwargs='app_setting', auth=True),
+    ],
+    'search': [],
+    'ai_services': [],
+}
+
+UNBUDGETED = {
+    'products': {
+        'product-size-chart': 'raw SQL on product_size_chart_assignments, a Supabase-only table',
+    },
+    'orders': {},
+    'vendors': {
+        'vendor-profile': 'vendor dashboard, needs a vendor-owned account',
+        'vendor-dashboard-stats': 'vendor dashboard, needs a vendor-owned account',
+        'vendor-payouts': 'vendor dashboard, needs a vendor-owned account',
+        'vendor-subscription-current': 'vendor dashboard, needs a vendor-owned account',
+        'vendor-review-detail': 'single-row lookup by review id',
+        'vendor-bank-account-list': 'vendor dashboard, needs a vendor-owned account',
+        'vendor-bank-account-detail': 'vendor dashboard, needs a vendor-owned account',
+        'vendor-size-chart-list': 'vendor dashboard, needs a vendor-owned account',
+        'vendor-size-chart-detail': 'vendor dashboard, needs a vendor-owned account',
+    },
+    'categories': {},
+    'content': {
+        'content-banners-manage-list': 'admin management endpoint',
+        'content-banners-manage-detail': 'admin management endpoint',
+        'content-support-manage-list': 'admin management endpoint',
+        'content-support-manage-detail': 'admin management endpoint',
+    },
+    'loyalty': {},
+    'support': {
+        'support-tickets-list': 'vendor support desk, needs a vendor-owned account',
+        'support-tickets-detail': 'vendor support desk, needs a vendor-owned account',
+    },
+    'users': {},
+    'currency': {},
+    'payments': {
+        'verify-payment': 'calls the Squad API before touching the database',
+    },
+    'admin_api': {
+        'admin-manage-user': 'route takes an int pk but user ids are UUIDs, so it cannot resolve a user',
+    },
+    'search': {
+        'search-analytics': 'raw SQL on search_analytics, a Supabase-only table',
+    },
+    # Only POST routes (chat, image search); listed so new GETs get a budget.
+    'ai_services': {},
+}
+
+def get_routes(app):
+    """Names of the api/ GET routes whose views live in ``app``."""
+    names = set()
+
+    def walk(resolver, prefix):
+        for pattern in resolver.url_patterns:
+            route = prefix + str(pattern.pattern)
+            if isinstance(pattern, URLResolver):
+                walk(pattern, route)
+            elif route.startswith('api/') and pattern.name and _view_app(pattern) == app and _accepts_get(pattern):
+                names.add(pattern.name)
+
+    walk(get_resolver(), '')
+    return names
+
+
+def _view_class(pattern):
+    callback = pattern.callback
+    return getattr(callback, 'cls', None) or getattr(callback, 'view_class', None) or callback
+
+
+def _view_app(pattern):
+    view = _view_class(pattern)
+    return view.__module__.split('.', 1)[0]
+
+
+def _accepts_get(pattern):
+    actions = getattr(pattern.callback, 'actions', None)
+    if actions is not None:
+        return 'get' in actions
+    view = _view_class(pattern)
+    if isinstance(view, type):
+        return hasattr(view, 'get')
+    return 'GET' in getattr(view, 'http_method_names', ['GET'])
+
+
+def build_fixture():
+    """Create the data every budget is measured against."""
+    from admin_api.models import AdminActionLog, AdminUser, AppSettings
+    from categories.models import Category, Subcategory
+    from content.models import ContactInfo, HeroSection, PromotionalBanner, SupportInfo
+    from currency.models import CurrencyRate
+    from orders.models import Cart, CartItem, Order, OrderItem, ShippingAddress, Wishlist
+    from payments.models import Payment, PaymentMethod
+    from products.models import Product, ProductQuestion, ProductReview
+    from support.models import ChatConversation, ChatMessage
+    from users.models import Profile, User
+    from vendors.models import Vendor, VendorFollow, VendorReview
+
+    sizes = FIXTURE_SIZES
+    user = User.objects.create(email='budget@example.com', username='budget@example.com')
+    others = User.objects.bulk_create(
+        User(email=f'budget{i}@example.com', username=f'budget{i}@example.com')
+        for i in range(sizes['followers'])
+    )
+    Profile.objects.bulk_create(Profile(id_id=u.pk, full_name=u.email) for u in [user, *others])
+    category = Category.objects.create(name='Budget category')
+    Subcategory.objects.bulk_create(Subcategory(name=f'Sub {i}', category=category) for i in range(5))
+    vendor = Vendor.objects.create(
+        business_name='Budget Store', business_email='store@example.com',
+        status='approved', is_featured=True,
+    )
+    products = Product.objects.bulk_create(
+        Product(
+            name=f'Item {i}', description='Budget item', price=Decimal('10.00') + i,
+            category_id=category.id, vendor_id=vendor.id, brand='Brand',
+            is_featured=i % 2 == 0, is_new_arrival=i % 3 == 0, is_on_sale=i % 4 == 0,
+            sku=f'BUDGET-{i}', sizes=['M', 'L'], colors={'black': '#000000'},
+        )
+        for i in range(sizes['products'])
+    )
+    product = products[0]
+    ProductReview.objects.bulk_create(
+        ProductReview(product=product, user=u, rating=4, title='ok', content='fine')
+        for u in others[:sizes['reviews']]
+    )
+    ProductQuestion.objects.bulk_create(
+        ProductQuestion(product=product, user=u, question='Does it fit?')
+        for u in others[:sizes['questions']]
+    )
+
+    address = ShippingAddress.objects.create(
+        user=user, name='Budget', phone='1', address_line1='1 Road',
+        city='Lagos', state='Lagos', zip='100001', is_default=True,
+    )
+    cart = Cart.objects.create(user=user)
+    CartItem.objects.bulk_create(
+        CartItem(cart=cart, product=p, quantity=1, selected_size='M', selected_color='black')
+        for p in products[:sizes['cart_items']]
+    )
+    Wishlist.objects.bulk_create(Wishlist(user=user, product=p) for p in products[:sizes['wishlist']])
+    orders = Order.objects.bulk_create(
+        Order(user=user, address_id=address.id, subtotal=Decimal('30.00'), shipping_fee=0,
+              total=Decimal('30.00'), order_number=f'BUDGET{i}')
+        for i in range(sizes['orders'])
+    )
+    OrderItem.objects.bulk_create(
+        OrderItem(order=o, product=products[j], quantity=1, price=Decimal('10.00'),
+                  selected_size='M', selected_color='black')
+        for o in orders for j in range(sizes['items_per_order'])
+    )
+
+    VendorFollow.objects.bulk_create(VendorFollow(user=u, vendor=vendor) for u in others)
+    VendorFollow.objects.create(user=user, vendor=vendor)
+    VendorReview.objects.bulk_create(
+        VendorReview(vendor=vendor, user=u, rating=5, review_text='great')
+        for u in others[:sizes['vendor_reviews']]
+    )
+
+    conversations = ChatConversation.objects.bulk_create(
+        ChatConversation(user=user, title=f'Budget chat {i}') for i in range(sizes['conversations'])
+    )
+    conversation = conversations[0]
+    ChatMessage.objects.bulk_create(
+        ChatMessage(conversation=c, sender_type='user' if i % 2 else 'bot', message_text=f'hello {i}')
+        for c in conversations for i in range(sizes['chat_messages'])
+    )
+    payment_methods = PaymentMethod.objects.bulk_create(
+        PaymentMethod(user=user, card_holder_name='Budget', card_number=f'4111{i:012d}', card_type='visa',
+                      expiry_month='12', expiry_year='2030', is_default=i == 0)
+        for i in range(sizes['payment_methods'])
+    )
+    payments = Payment.objects.bulk_create(
+        Payment(order=o, user=user, transaction_ref=f'BUDGET-REF-{i}', amount=o.total)
+        for i, o in enumerate(orders[:sizes['payments']])
+    )
+    rates = CurrencyRate.objects.bulk_create(
+        CurrencyRate(from_currency=a, to_currency=b, rate=Decimal(r))
+        for a, b, r in [('USD', 'NGN', '1500'), ('NGN', 'USD', '0.000667'), ('EUR', 'USD', '1.08'),
+                        ('USD', 'EUR', '0.92'), ('GBP', 'USD', '1.27'), ('USD', 'GBP', '0.79')]
+    )
+    admins = AdminUser.objects.bulk_create(
+        AdminUser(user=u, email=u.email, full_name=f'Admin {i}', role='admin')
+        for i, u in enumerate(others[:sizes['admin_users']])
+    )
+    AdminActionLog.objects.bulk_create(
+        AdminActionLog(admin=admins[i % len(admins)], action='update', resource_type='product')
+        for i in range(sizes['admin_logs'])
+    )
+    app_settings = AppSettings.objects.bulk_create(
+        AppSettings(setting_key=f'budget.{i}', setting_value={'enabled': True}, updated_by=others[i])
+        for i in range(sizes['app_settings'])
+    )
+    HeroSection.objects.create(headline='Shop smart')
+    ContactInfo.objects.create(contact={'email': 'help@example.com'})
+    PromotionalBanner.objects.create(title='Sale', image_url='https://example.com/b.png', is_active=True)
+    SupportInfo.objects.create(title='Returns', type='faq', icon='help')
+    _build_product_page(product.id, [p.id for p in products[1:1 + sizes['page_rows']]])
+
+    return {
+        'user': user,
+        'category_id': str(category.id),
+        'product': {'id': product.id},
+        'address': {'pk': address.id},
+        'order': {'id': orders[0].id},
+        'vendor': {'id': vendor.id},
+        'category': {'id': category.id},
+        'conversation': {'pk': conversation.id, 'conversation_id': conversation.id},
+        'payment_method': {'pk': payment_methods[0].id},
+        'payment': {'pk': payments[0].id},
+        'currency_rate': {'pk': rates[0].id},
+        'admin_user': {'pk': admins[0].id},
+        'app_setting': {'pk': app_settings[0].id},
+    }
+
+
+def _build_product_page(product_id, related_ids):
+    """Rows in the Supabase-only product page tables (products migration 0007)."""
+    with connection.cursor() as c:
+        c.execute(
+            "INSERT INTO delivery_info (product_id, delivery_notes) VALUES (%s, 'Ships in 2 days')",
+            [product_id],
+        )
+        c.execute(
+            "INSERT INTO warranty_info (product_id, type, duration, coverage_details) "
+            "VALUES (%s, 'brand', '1 year', ARRAY['parts'])",
+            [product_id],
+        )
+        c.execute(
+            "INSERT INTO product_recommendations (product_id, similar_products, from_seller_products) "
+            "VALUES (%s, %s::uuid[], %s::uuid[])",
+            [product_id, related_ids, related_ids[::-1]],
+        )
+        for i in range(FIXTURE_SIZES['page_rows']):
+            c.execute(
+                "INSERT INTO product_offers (product_id, type, code, description, sort_order) "
+                "VALUES (%s, 'coupon', %s, '10%% off', %s)",
+                [product_id, f'SAVE{i}', i],
+            )
+            c.execute(
+                "INSERT INTO product_highlights (product_id, label, sort_order) VALUES (%s, %s, %s)",
+                [product_id, f'Highlight {i}', i],
+            )
+            c.execute(
+                "INSERT INTO feature_posters (product_id, title, subtitle, media_url, sort_order) "
+                "VALUES (%s, %s, 'sub', 'https://example.com/p.png', %s)",
+                [product_id, f'Poster {i}', i],
+            )
+            c.execute(
+                "INSERT INTO product_specifications (product_id, group_name, spec_name, spec_value, sort_order) "
+                "VALUES (%s, %s, %s, 'yes', %s)",
+                [product_id, 'General' if i % 2 else 'Build', f'Spec {i}', i],
+            )
+
+
+@skipUnless(connection.vendor == 'postgresql', 'query budgets need the PostgreSQL schema')
+@override_settings(PERF_INSTRUMENTATION_ENABLED=False)
+class QueryBudgetTestCase(TestCase):
+    """Runs ``BUDGETS[app]``; subclasses only set ``app``."""
+
+    app = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixture = build_fixture()
+
+    def setUp(self):
+        # Budgets are for cold requests; cached responses would hide queries.
+        cache.clear()
+        clear_local_caches()
+
+    def _url(self, budget):
+        kwargs = self.fixture[budget.kwargs] if budget.kwargs else {}
+        resolver_kwargs = {
+            k: v for k, v in kwargs.items()
+            if k in _route_kwargs(budget.url_name)
+        }
+        return reverse(budget.url_name, kwargs=resolver_kwargs) + budget.query.format(**self.fixture)
+
+    def test_query_budgets(self):
+        if self.app is None:
+            self.skipTest('abstract')
+        for budget in BUDGETS[self.app]:
+            with self.subTest(url=budget.url_name, query=budget.query):
+                client = APIClient()
+                if budget.auth:
+                    client.force_authenticate(user=self.fixture['user'])
+                url = self._url(budget)
+                with CaptureQueriesContext(connection) as ctx:
+                    response = client.get(url)
+                self.assertEqual(response.status_code, budget.status, f'GET {url}')
+                if len(ctx) > budget.max_queries:
+                    self.fail(_explain(url, budget, ctx.captured_queries))
+
+    def test_every_get_route_is_budgeted(self):
+        if self.app is None:
+            self.skipTest('abstract')
+        covered = {b.url_name for b in BUDGETS[self.app]} | set(UNBUDGETED[self.app])
+        missing = get_routes(self.app) - covered
+        self.assertFalse(
+            missing,
+            f'GET routes without a query budget (add them to BUDGETS or UNBUDGETED '
+            f'in besmart_backend/query_budgets.py): {sorted(missing)}',
+        )
+
+
+def _route_kwargs(url_name):
+    kwargs = set()
+    for possibility in get_resolver().reverse_dict.getlist(url_name):
+        for _, params in possibility[0]:
+            kwargs.update(params)
+    return kwargs
+
+
+def _explain(url, budget, queries):
+    counts = {}
+    for q in queries:
+        fp = fingerprint(q['sql'])
+        counts[fp] = counts.get(fp, 0) + 1
+    repeated = sorted(((n, fp) for fp, n in counts.items() if n > 1), reverse=True)
+    lines = [f'GET {url} ran {len(queries)} queries, budget is {budget.max_queries}.']
+    if repeated:
+        lines.append('Repeated queries (likely N+1):')
+        lines.extend(f'  {n}x {fp[:200]}' for n, fp in repeated[:5])
+    else:
+        lines.extend(f'  {q["sql"][:200]}' for q in queries)
+    return '\n'.join(lines)
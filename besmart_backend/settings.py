@@ -61,11 +61,13 @@ INSTALLED_APPS = [
     'content',
     'search',
     'ai_services',
+    'besmart_backend',  # project-wide management commands
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # CORS first
     'django.middleware.security.SecurityMiddleware',
+    'besmart_backend.middleware.PerformanceMiddleware',  # after the HTTPS redirect
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -102,17 +104,46 @@ DB_PASSWORD = os.getenv('DB_PASSWORD')
 DB_HOST = os.getenv('DB_HOST')
 DB_PORT = os.getenv('DB_PORT')
 
+# Connection reuse. With DB_POOL_ENABLED each worker keeps a psycopg_pool of
+# DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections; otherwise connections are
+# kept open for DB_CONN_MAX_AGE seconds. Both health-check on reuse.
+DB_POOL_ENABLED = os.getenv('DB_POOL_ENABLED', 'True') == 'True'
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', '300'))
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+# Set when DB_HOST points at PgBouncer / Supavisor in transaction mode
+# (port 6543 on Supabase): no server-side cursors or prepared statements.
+DB_PGBOUNCER_TRANSACTION_MODE = os.getenv('DB_PGBOUNCER_TRANSACTION_MODE', 'False') == 'True'
+
 if DB_NAME and DB_USER and DB_PASSWORD and DB_HOST:
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql',
+            'ENGINE': 'besmart_backend.db',
             'NAME': DB_NAME,
             'USER': DB_USER,
             'PASSWORD': DB_PASSWORD,
             'HOST': DB_HOST,
             'PORT': DB_PORT or '5432',
+            'CONN_MAX_AGE': 0 if DB_POOL_ENABLED else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+            'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER_TRANSACTION_MODE,
+            'OPTIONS': {},
         }
     }
+    if DB_POOL_ENABLED:
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+            'max_idle': DB_POOL_MAX_IDLE,
+            'max_lifetime': DB_POOL_MAX_LIFETIME,
+        }
+    if DB_PGBOUNCER_TRANSACTION_MODE:
+        DATABASES['default']['OPTIONS']['prepare_threshold'] = None
 else:
     # Fallback to sqlite for development if env not set
     DATABASES = {
@@ -164,6 +195,29 @@ SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET')
 
+# 'local' verifies access tokens in-process with SUPABASE_JWT_SECRET;
+# 'remote' calls supabase.auth.get_user on every request.
+SUPABASE_AUTH_VERIFY_MODE = os.getenv(
+    'SUPABASE_AUTH_VERIFY_MODE', 'local' if SUPABASE_JWT_SECRET else 'remote'
+)
+SUPABASE_JWT_ALGORITHMS = os.getenv('SUPABASE_JWT_ALGORITHMS', 'HS256').split(',')
+SUPABASE_JWT_AUDIENCE = os.getenv('SUPABASE_JWT_AUDIENCE', 'authenticated')
+SUPABASE_JWT_ISSUER = os.getenv(
+    'SUPABASE_JWT_ISSUER', f"{SUPABASE_URL.rstrip('/')}/auth/v1" if SUPABASE_URL else None
+)
+SUPABASE_JWT_LEEWAY = int(os.getenv('SUPABASE_JWT_LEEWAY', '10'))
+
+# Pooled Supabase HTTP client (users.supabase_client)
+SUPABASE_HTTP_TIMEOUT = float(os.getenv('SUPABASE_HTTP_TIMEOUT', '10'))
+SUPABASE_HTTP_CONNECT_TIMEOUT = float(os.getenv('SUPABASE_HTTP_CONNECT_TIMEOUT', '5'))
+SUPABASE_HTTP_POOL_SIZE = int(os.getenv('SUPABASE_HTTP_POOL_SIZE', '20'))
+SUPABASE_HTTP_KEEPALIVE_EXPIRY = float(os.getenv('SUPABASE_HTTP_KEEPALIVE_EXPIRY', '30'))
+
+# Verified-principal cache (users.token_cache)
+AUTH_PRINCIPAL_CACHE_SIZE = int(os.getenv('AUTH_PRINCIPAL_CACHE_SIZE', '10000'))
+AUTH_PRINCIPAL_CACHE_TTL = int(os.getenv('AUTH_PRINCIPAL_CACHE_TTL', '300'))
+AUTH_PRINCIPAL_REVOCATION_TTL = int(os.getenv('AUTH_PRINCIPAL_REVOCATION_TTL', '3600'))
+
 # Bucket Names
 BUCKET_PRODUCTS = os.getenv('BUCKET_PRODUCTS', 'products')
 BUCKET_PRODUCT_VIDEOS = os.getenv('BUCKET_PRODUCT_VIDEOS', 'product-videos')
@@ -259,6 +313,97 @@ else:
         }
     }
 
+# Cache (besmart_backend.cache)
+# Shared tier is Redis when configured so every worker sees the same entries
+# and invalidations; falls back to per-process memory for local development.
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', os.getenv('REDIS_URL', ''))
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'besmart'),
+            'TIMEOUT': int(os.getenv('CACHE_DEFAULT_TIMEOUT', '300')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'besmart-default',
+            'TIMEOUT': int(os.getenv('CACHE_DEFAULT_TIMEOUT', '300')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', '300'))
+CACHE_LOCAL_MAXSIZE = int(os.getenv('CACHE_LOCAL_MAXSIZE', '2000'))
+CACHE_LOCAL_TTL = float(os.getenv('CACHE_LOCAL_TTL', '5'))
+CACHE_VERSION_CHECK_INTERVAL = float(os.getenv('CACHE_VERSION_CHECK_INTERVAL', '1'))
+CACHE_STAMPEDE_WAIT = float(os.getenv('CACHE_STAMPEDE_WAIT', '5'))
+# Cache-Control max-age on @cached_view responses; after it clients
+# revalidate with If-None-Match and usually get a bodiless 304.
+CACHE_CLIENT_MAX_AGE = int(os.getenv('CACHE_CLIENT_MAX_AGE', '60'))
+
+# Search typeahead (/api/products/typeahead/)
+TYPEAHEAD_MIN_LENGTH = int(os.getenv('TYPEAHEAD_MIN_LENGTH', '2'))
+TYPEAHEAD_SIMILARITY_THRESHOLD = float(os.getenv('TYPEAHEAD_SIMILARITY_THRESHOLD', '0.3'))
+TYPEAHEAD_CACHE_TTL = int(os.getenv('TYPEAHEAD_CACHE_TTL', '60'))
+
+# Product page payloads are keyed by the product's content version, so
+# side-table writes (review summaries and recommendations included) and
+# product saves show up within CACHE_VERSION_CHECK_INTERVAL.  Cards of other
+# products embedded in the /full/ page may lag by up to PRODUCT_PAGE_CACHE_TTL.
+PRODUCT_PAGE_CACHE_TTL = int(os.getenv('PRODUCT_PAGE_CACHE_TTL', '300'))
+PRODUCT_CONTENT_CACHE_TTL = int(os.getenv('PRODUCT_CONTENT_CACHE_TTL', '3600'))
+# Product list pages are dropped on every Product/Category/Vendor save; stock
+# and rating changes made in SQL show up after at most this many seconds.
+PRODUCT_LIST_CACHE_TTL = int(os.getenv('PRODUCT_LIST_CACHE_TTL', '60'))
+
+# Facet counts on /api/products/?facets=true (products.facets).  Price bucket
+# boundaries are in the catalog currency; facets of unfiltered (search-only)
+# listings are cached for PRODUCT_FACET_CACHE_TTL seconds.
+PRODUCT_FACET_PRICE_BUCKETS = [
+    int(v) for v in os.getenv('PRODUCT_FACET_PRICE_BUCKETS', '1000,5000,10000,50000,100000').split(',') if v.strip()
+]
+PRODUCT_FACET_LIMIT = int(os.getenv('PRODUCT_FACET_LIMIT', '20'))
+PRODUCT_FACET_CACHE_TTL = int(os.getenv('PRODUCT_FACET_CACHE_TTL', '300'))
+
+# Home feed snapshot (products.home_feed): rebuilt when shelf flags change
+# and at most every HOME_FEED_REFRESH_INTERVAL seconds otherwise.
+HOME_FEED_SHELF_SIZE = int(os.getenv('HOME_FEED_SHELF_SIZE', '20'))
+HOME_FEED_CATEGORY_COUNT = int(os.getenv('HOME_FEED_CATEGORY_COUNT', '8'))
+HOME_FEED_REFRESH_INTERVAL = float(os.getenv('HOME_FEED_REFRESH_INTERVAL', '60'))
+HOME_FEED_SNAPSHOT_TTL = int(os.getenv('HOME_FEED_SNAPSHOT_TTL', '3600'))
+
+# Product view ingestion (products.view_tracking)
+VIEW_TRACKING_BUFFER_SIZE = int(os.getenv('VIEW_TRACKING_BUFFER_SIZE', '10000'))
+VIEW_TRACKING_BATCH_SIZE = int(os.getenv('VIEW_TRACKING_BATCH_SIZE', '500'))
+VIEW_TRACKING_FLUSH_INTERVAL = float(os.getenv('VIEW_TRACKING_FLUSH_INTERVAL', '2'))
+VIEW_TRACKING_ID_REFRESH = float(os.getenv('VIEW_TRACKING_ID_REFRESH', '300'))
+
+# Request instrumentation (besmart_backend.middleware.PerformanceMiddleware)
+PERF_INSTRUMENTATION_ENABLED = os.getenv('PERF_INSTRUMENTATION_ENABLED', 'True') == 'True'
+PERF_SAMPLE_RATE = float(os.getenv('PERF_SAMPLE_RATE', '1.0' if DEBUG else '0.05'))
+PERF_NPLUSONE_THRESHOLD = int(os.getenv('PERF_NPLUSONE_THRESHOLD', '5'))
+PERF_SLOW_REQUEST_MS = float(os.getenv('PERF_SLOW_REQUEST_MS', '1000'))
+# Server-Timing exposes query counts to clients; keep it off in production
+PERF_SERVER_TIMING = os.getenv('PERF_SERVER_TIMING', str(DEBUG)) == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'besmart.perf': {
+            'handlers': ['console'],
+            'level': os.getenv('PERF_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # OpenAI
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
@@ -0,0 +1,269 @@
+import json
+import threading
+import time
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.backends.postgresql import base as postgresql
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from psycopg_pool import PoolTimeout
+
+from . import db, perf
+from .cache import LocalLRU, TieredCache, request_cache_key
+from .db.base import DatabaseWrapper
+from .db.indexes import create_index_concurrently
+from .middleware import PerformanceMiddleware
+
+
+class PoolCheckoutTests(SimpleTestCase):
+    alias = 'checkout-test'
+
+    def setUp(self):
+        self.addCleanup(db._wait_stats.pop, self.alias, None)
+
+    def _wrapper(self, pool):
+        options = {'pool': {'min_size': 1}} if pool else {}
+        return DatabaseWrapper({**connection.settings_dict, 'OPTIONS': options}, alias=self.alias)
+
+    def test_checkouts_and_timeouts_are_recorded(self):
+        wrapper = self._wrapper(pool=True)
+        outcomes = [object(), PoolTimeout('pool exhausted'), ValueError('bad params')]
+
+        def checkout(self, conn_params):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        with mock.patch.object(postgresql.DatabaseWrapper, 'get_new_connection', checkout):
+            wrapper.get_new_connection({})
+            with self.assertRaises(PoolTimeout):
+                wrapper.get_new_connection({})
+            with self.assertRaises(ValueError):
+                wrapper.get_new_connection({})
+
+        stats = db._wait_stats[self.alias]
+        self.assertEqual((stats['checkouts'], stats['timeouts']), (3, 1))
+        self.assertGreaterEqual(stats['wait_ms_total'], stats['wait_ms_max'])
+
+    def test_unpooled_connections_are_not_timed(self):
+        wrapper = self._wrapper(pool=False)
+        with mock.patch.object(postgresql.DatabaseWrapper, 'get_new_connection', return_value=object()):
+            wrapper.get_new_connection({})
+        self.assertNotIn(self.alias, db._wait_stats)
+
+    def test_pool_stats_merge_wait_times(self):
+        db.record_checkout(self.alias, 4.0)
+        db.record_checkout(self.alias, 2.0)
+        pool = mock.Mock()
+        pool.get_stats.return_value = {'pool_size': 2, 'requests_waiting': 0}
+        with mock.patch('django.db.connections') as connections:
+            connections.__iter__.return_value = [self.alias]
+            connections.__getitem__.return_value = mock.Mock(pool=pool)
+            stats = db.get_pool_stats()[self.alias]
+        self.assertEqual(stats['pool_size'], 2)
+        self.assertEqual((stats['checkouts'], stats['wait_ms_max'], stats['wait_ms_avg']), (2, 4.0, 3.0))
+
+
+class LocalLRUTests(SimpleTestCase):
+    def test_least_recently_used_entries_are_evicted(self):
+        lru = LocalLRU(2)
+        expires_at = time.time() + 60
+        lru.set('a', 1, expires_at)
+        lru.set('b', 2, expires_at)
+        lru.get('a')
+        lru.set('c', 3, expires_at)
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (1, None, 3))
+
+    def test_expired_entries_are_dropped(self):
+        lru = LocalLRU(2)
+        now = time.time()
+        lru.set('a', 1, now + 5)
+        with mock.patch('time.time', return_value=now + 6):
+            self.assertIsNone(lru.get('a'))
+        self.assertNotIn('a', lru._data)
+
+
+@override_settings(CACHE_VERSION_CHECK_INTERVAL=0, CACHE_STAMPEDE_WAIT=0.2)
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidate_retires_keys_in_every_worker(self):
+        tier, other = TieredCache('test-ns'), TieredCache('test-ns')
+        tier.set('k', 'old')
+        self.assertEqual(other.get('k'), 'old')
+        version = tier.version()
+        tier.invalidate()
+        self.assertGreater(tier.version(), version)
+        self.assertIsNone(tier.get('k'))
+        self.assertIsNone(other.get('k'))
+
+    def test_single_flight_under_threads(self):
+        tier = TieredCache('test-ns')
+        calls = []
+        release = threading.Event()
+
+        def producer():
+            calls.append(1)
+            release.wait(5)
+            return 'value'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(tier.get_or_set('k', producer)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 8)
+        self.assertEqual(tier._flight_locks, {})
+        self.assertIsNone(cache.get(f'{tier.make_key("k")}:lock'))
+
+    def test_a_timed_out_waiter_keeps_the_other_workers_lock(self):
+        tier = TieredCache('test-ns')
+        lock_key = f'{tier.make_key("k")}:lock'
+        cache.add(lock_key, 1, 60)
+        self.assertEqual(tier.get_or_set('k', lambda: 'value'), 'value')
+        self.assertEqual(cache.get(lock_key), 1)
+
+
+@override_settings(ALLOWED_HOSTS=['api.example.com', 'internal.example.com'])
+class RequestCacheKeyTests(SimpleTestCase):
+    def _key(self, url, secure=False, host='api.example.com'):
+        return request_cache_key(RequestFactory().get(url, secure=secure, headers={'Host': host}))
+
+    def test_query_order_does_not_matter(self):
+        self.assertEqual(self._key('/api/products/?a=1&b=2'), self._key('/api/products/?b=2&a=1'))
+        self.assertNotEqual(self._key('/api/products/?a=1'), self._key('/api/products/?a=2'))
+
+    def test_host_and_scheme_are_part_of_the_key(self):
+        key = self._key('/api/products/')
+        self.assertNotEqual(key, self._key('/api/products/', host='internal.example.com'))
+        self.assertNotEqual(key, self._key('/api/products/', secure=True))
+
+
+class PerfTests(SimpleTestCase):
+    def test_fingerprint_groups_repeats_of_one_query(self):
+        self.assertEqual(
+            perf.fingerprint("SELECT * FROM products WHERE id = 12 AND name = 'a''b'"),
+            perf.fingerprint("SELECT *  FROM products\nWHERE id = 7 AND name = 'c'"),
+        )
+        self.assertEqual(
+            perf.fingerprint('SELECT * FROM reviews WHERE product_id IN (%s, %s, %s)'),
+            'SELECT * FROM reviews WHERE product_id IN (...)',
+        )
+        self.assertNotEqual(perf.fingerprint('SELECT 1 FROM products'), perf.fingerprint('SELECT 1 FROM orders'))
+
+    def test_duplicates_report_queries_at_the_threshold(self):
+        stats = perf.RequestStats()
+        for product_id in range(5):
+            stats.add_query(f'SELECT * FROM reviews WHERE product_id = {product_id}', 1.0)
+        stats.add_query('SELECT * FROM products', 2.0)
+        self.assertEqual(stats.duplicates(5), [(5, 5.0, 'SELECT * FROM reviews WHERE product_id = ?')])
+        self.assertEqual(stats.duplicates(6), [])
+
+    def test_track_external_records_calls_and_failures(self):
+        with perf.track_external('squad', 'transaction.verify'):
+            pass  # no sampled request: a no-op
+
+        stats, token = perf.start_request()
+        self.addCleanup(perf.end_request, token)
+        with perf.track_external('squad', 'transaction.verify'):
+            pass
+        with self.assertRaises(RuntimeError), perf.track_external('openai', 'embeddings'):
+            raise RuntimeError
+        self.assertEqual(stats.external['squad']['calls'], 1)
+        self.assertEqual(stats.external['squad']['errors'], 0)
+        self.assertEqual(stats.external['openai']['errors'], 1)
+        self.assertEqual(stats.external['openai']['endpoints'], {'embeddings': 1})
+
+
+@override_settings(PERF_INSTRUMENTATION_ENABLED=True, PERF_SAMPLE_RATE=1.0, PERF_SERVER_TIMING=True,
+                   PERF_NPLUSONE_THRESHOLD=3, PERF_SLOW_REQUEST_MS=60000)
+class PerformanceMiddlewareTests(TestCase):
+    def _view(self, request):
+        with connection.cursor() as cursor:
+            for n in range(3):
+                cursor.execute('SELECT %s', [n])
+        perf.record_external('supabase', 'auth.user', 4.0)
+        return HttpResponse('ok')
+
+    def _call(self):
+        return PerformanceMiddleware(self._view)(RequestFactory().get('/api/products/'))
+
+    def test_sampled_requests_are_timed_and_logged(self):
+        with self.assertLogs('besmart.perf', 'WARNING') as logs:
+            response = self._call()
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="3 queries", '
+                                                     r'supabase;dur=4\.0;desc="1 calls"$')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['path'], record['status'], record['db_queries']), ('/api/products/', 200, 3))
+        self.assertEqual(record['n_plus_one'][0]['count'], 3)
+        self.assertEqual(record['external']['supabase']['calls'], 1)
+        self.assertIsNone(perf.current())
+
+    def test_unsampled_requests_are_left_alone(self):
+        with override_settings(PERF_SAMPLE_RATE=0.0), self.assertNoLogs('besmart.perf'):
+            response = self._call()
+        self.assertNotIn('Server-Timing', response)
+
+    def test_server_timing_is_optional(self):
+        with override_settings(PERF_SERVER_TIMING=False), self.assertLogs('besmart.perf', 'WARNING'):
+            response = self._call()
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(SECURE_SSL_REDIRECT=True, ALLOWED_HOSTS=['testserver'])
+    def test_https_redirects_are_not_recorded(self):
+        with self.assertNoLogs('besmart.perf'):
+            response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 301)
+        self.assertNotIn('Server-Timing', response)
+
+
+class StartupImportTests(SimpleTestCase):
+    def test_heavy_sdks_are_not_imported_at_boot(self):
+        # Raises CommandError naming the package if supabase/openai/boto3
+        # is imported while a worker boots.
+        call_command('profile_startup', '--strict', '--runs', '1', stdout=StringIO())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'CREATE INDEX CONCURRENTLY is PostgreSQL only')
+class ConcurrentIndexTests(TransactionTestCase):
+    available_apps = ['besmart_backend']
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE index_probe (v integer)')
+            cursor.execute('INSERT INTO index_probe VALUES (1), (1)')
+        self.addCleanup(self._drop)
+
+    def _drop(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS index_probe')
+
+    def _valid(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = 'index_probe_idx'"
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_an_invalid_index_left_by_a_failed_build_is_rebuilt(self):
+        # The duplicate rows make the unique build fail halfway, leaving an INVALID index.
+        with self.assertRaises(DatabaseError), connection.cursor() as cursor:
+            cursor.execute('CREATE UNIQUE INDEX CONCURRENTLY index_probe_idx ON index_probe (v)')
+        self.assertEqual(self._valid(), [False])
+
+        with connection.schema_editor(atomic=False) as editor:
+            create_index_concurrently(editor, 'index_probe_idx', 'ON index_probe (v)')
+            create_index_concurrently(editor, 'index_probe_idx', 'ON index_probe (v)')
+        self.assertEqual(self._valid(), [True])
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class CategoriesConfig(AppConfig):
     name = 'categories'
+
+    def ready(self):
+        from besmart_backend.cache import invalidate_on_save
+        from .models import Category, Subcategory
+
+        invalidate_on_save(Category, 'categories', 'product_lists')
+        invalidate_on_save(Subcategory, 'categories')
@@ -1,3 +1,70 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from besmart_backend.cache import clear_local_caches
+from besmart_backend.query_budgets import QueryBudgetTestCase
+
+from .models import Category, Subcategory
+
+
+class CategoryQueryBudgetTests(QueryBudgetTestCase):
+    app = 'categories'
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False, CACHE_CLIENT_MAX_AGE=30)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Audio')
+        Subcategory.objects.create(name='Headphones', category=cls.category)
+
+    def setUp(self):
+        cache.clear()
+        clear_local_caches()
+
+    def test_matching_etag_gets_304_without_queries(self):
+        first = self.client.get('/api/categories/')
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+        self.assertRegex(etag, r'^"\d+-[0-9a-f]{20}"$')
+        self.assertEqual(first['Cache-Control'], 'public, max-age=30')
+
+        for header in (etag, f'"other", W/{etag}', '*'):
+            with self.subTest(header=header), self.assertNumQueries(0):
+                response = self.client.get('/api/categories/', headers={'If-None-Match': header})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+            self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get('/api/categories/', headers={'If-None-Match': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), first.json())
+
+    def test_saves_change_the_etag(self):
+        categories = self.client.get('/api/categories/')['ETag']
+        subcategories = self.client.get('/api/subcategories/')['ETag']
+        self.assertNotEqual(categories, subcategories)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Subcategory.objects.create(name='Speakers', category=self.category)
+        for url, etag in (('/api/categories/', categories), ('/api/subcategories/', subcategories)):
+            response = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(self.client.get('/api/subcategories/').json()['results']), 2)
+
+    def test_saves_invalidate_once_committed(self):
+        etag = self.client.get('/api/subcategories/')['ETag']
+        with self.captureOnCommitCallbacks() as callbacks:
+            Subcategory.objects.create(name='Speakers', category=self.category)
+        self.assertEqual(self.client.get('/api/subcategories/')['ETag'], etag)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(self.client.get('/api/subcategories/')['ETag'], etag)
+
+    def test_errors_carry_no_etag(self):
+        self.category.is_active = False
+        self.category.save()
+        response = self.client.get(f'/api/categories/{self.category.id}/products/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
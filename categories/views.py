@@ -2,12 +2,14 @@ import uuid as uuid_module
 from rest_framework import generics, permissions, filters, views, status
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.conf import settings
 from django.db import connection
 from .models import Category, Subcategory
 from .serializers import CategorySerializer, SubcategorySerializer
 from products.models import Product
 from products.serializers import ProductListSerializer
 from drf_spectacular.utils import extend_schema
+from besmart_backend.cache import cached_view
 
 class SubcategoryListView(generics.ListAPIView):
     """GET /api/subcategories/ — all active subcategories (Flutter fetches all at once
@@ -20,6 +22,10 @@ class SubcategoryListView(generics.ListAPIView):
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
 
+    @cached_view('categories')
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
 
 class CategorySubcategoriesView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
@@ -27,7 +33,7 @@ class CategorySubcategoriesView(generics.ListAPIView):
 
     def get_queryset(self):
         category = get_object_or_404(Category, id=self.kwargs['id'], is_active=True)
-        return Subcategory.objects.filter(category=category, is_active=True).order_by('name')
+        return Subcategory.objects.filter(category=category, is_active=True).select_related('category').order_by('name')
 
     @extend_schema(summary="List category subcategories")
     def get(self, request, *args, **kwargs):
@@ -39,9 +45,12 @@ class CategoryProductsView(generics.ListAPIView):
 
     def get_queryset(self):
         get_object_or_404(Category, id=self.kwargs['id'], is_active=True)
-        return Product.objects.filter(category_id=self.kwargs['id'], status='active', approval_status='approved')
+        return ProductListSerializer.rows(
+            Product.objects.filter(category_id=self.kwargs['id'], status='active', approval_status='approved')
+        )
 
     @extend_schema(summary="List products in category")
+    @cached_view('product_lists', timeout=settings.PRODUCT_LIST_CACHE_TTL)
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
@@ -59,6 +68,7 @@ class CategoryListView(generics.ListAPIView):
         summary="List all categories",
         description="Get a list of active categories"
     )
+    @cached_view('categories')
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class ContentConfig(AppConfig):
     name = 'content'
+
+    def ready(self):
+        from besmart_backend.cache import invalidate_on_save
+        from .models import HeroSection, PromotionalBanner
+
+        invalidate_on_save(PromotionalBanner, 'banners')
+        invalidate_on_save(HeroSection, 'hero')
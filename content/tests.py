@@ -1,3 +1,5 @@
-from django.test import TestCase
+from besmart_backend.query_budgets import QueryBudgetTestCase
 
-# Create your tests here.
+
+class ContentQueryBudgetTests(QueryBudgetTestCase):
+    app = 'content'
@@ -6,12 +6,14 @@ from .serializers import (
     HeroSectionSerializer, ContactInfoSerializer
 )
 from drf_spectacular.utils import extend_schema, OpenApiParameter
+from besmart_backend.cache import cached_view
 
 class HeroSectionView(generics.GenericAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = HeroSectionSerializer
 
     @extend_schema(summary="Get hero section (homepage)")
+    @cached_view('hero')
     def get(self, request):
         obj = HeroSection.objects.filter(is_active=True).first()
         if not obj:
@@ -55,6 +57,10 @@ class PromotionalBannerListView(generics.ListAPIView):
     def get_queryset(self):
         return PromotionalBanner.objects.filter(is_active=True).order_by('priority', '-created_at')
 
+    @cached_view('banners')
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
 class SupportInfoListView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = SupportInfoSerializer
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class CurrencyConfig(AppConfig):
     name = 'currency'
+
+    def ready(self):
+        from besmart_backend.cache import invalidate_on_save
+        from .models import CurrencyRate
+
+        invalidate_on_save(CurrencyRate, 'currency')
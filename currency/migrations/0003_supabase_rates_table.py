@@ -0,0 +1,52 @@
+"""
+Give fresh databases the Supabase layout of ``currency_rates``.
+
+Migration 0001 created an older single-currency table (currency_code,
+exchange_rate, ...); 0002 only realigned the model state with the pair
+table that exists in Supabase, so on a fresh database every currency
+endpoint failed on the missing from_currency column.  Where the old layout
+is found it is renamed to currency_rates_legacy (keeping any rows) and the
+Supabase table is created; on Supabase this is a no-op.
+"""
+from django.db import migrations
+
+
+FORWARD_SQL = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'currency_rates'
+          AND column_name = 'currency_code'
+    ) THEN
+        ALTER TABLE currency_rates RENAME TO currency_rates_legacy;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS currency_rates (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    from_currency text NOT NULL,
+    to_currency text NOT NULL,
+    rate numeric(20, 6) NOT NULL,
+    source text NOT NULL DEFAULT 'manual',
+    updated_at timestamp with time zone NOT NULL DEFAULT now(),
+    created_at timestamp with time zone NOT NULL DEFAULT now()
+);
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currency', '0002_align_with_existing_schema'),
+    ]
+
+    operations = [
+        # Not reversed: the old layout matches no model state after 0002.
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -10,6 +10,8 @@ from drf_spectacular.utils import extend_schema
 from decimal import Decimal
 from collections import defaultdict
 
+from besmart_backend.cache import cached_view
+
 CURRENCY_META = {
     'NGN': {'symbol': '₦', 'name': 'Nigerian Naira'},
     'USD': {'symbol': '$', 'name': 'US Dollar'},
@@ -28,6 +30,7 @@ class CurrencyRateListView(views.APIView):
     permission_classes = [permissions.AllowAny]
 
     @extend_schema(responses={200: {'type': 'object'}})
+    @cached_view('currency')
     def get(self, request):
         rows = CurrencyRate.objects.all()
 
@@ -2,8 +2,10 @@ from rest_framework import generics, permissions, status, views
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db import models, transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from .models import Cart, CartItem, Order, OrderItem, Wishlist, ShippingAddress
 from products.models import Product
+from products.serializers import ProductListSerializer
 from .serializers import (
     CartSerializer, CartItemSerializer, 
     OrderSerializer, CreateOrderSerializer,
@@ -12,6 +14,14 @@ from .serializers import (
 from drf_spectacular.utils import extend_schema
 
 
+def _items_with_products(item_model):
+    """Prefetch ``items`` with their products' list columns in one extra query."""
+    return Prefetch(
+        'items',
+        queryset=item_model.objects.select_related('product').defer(*ProductListSerializer.unlisted('product')),
+    )
+
+
 # ──────────────────────────────────────────────
 # Shipping Addresses
 # ──────────────────────────────────────────────
@@ -118,6 +128,7 @@ class CartView(generics.RetrieveAPIView):
         if getattr(self, 'swagger_fake_view', False):
             return None
         cart, created = Cart.objects.get_or_create(user=self.request.user)
+        prefetch_related_objects([cart], _items_with_products(CartItem))
         return cart
 
 class CartItemCreateView(generics.CreateAPIView):
@@ -189,7 +200,10 @@ class WishlistView(generics.ListCreateAPIView):
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return Wishlist.objects.none()
-        return Wishlist.objects.filter(user=self.request.user)
+        return (
+            Wishlist.objects.filter(user=self.request.user)
+            .select_related('product').defer(*ProductListSerializer.unlisted('product'))
+        )
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -251,7 +265,7 @@ class OrderListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return Order.objects.none()
-        return Order.objects.filter(user=self.request.user)
+        return Order.objects.filter(user=self.request.user).prefetch_related(_items_with_products(OrderItem))
 
     @transaction.atomic
     def create(self, request, *args, **kwargs):
@@ -359,7 +373,7 @@ class OrderDetailView(generics.RetrieveAPIView):
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return Order.objects.none()
-        return Order.objects.filter(user=self.request.user)
+        return Order.objects.filter(user=self.request.user).prefetch_related(_items_with_products(OrderItem))
 
 
 class OrderCancelView(views.APIView):
@@ -6,6 +6,16 @@ from decimal import Decimal
 from django.conf import settings
 from typing import Dict, Optional
 
+from besmart_backend.perf import track_external
+
+
+def _send(method: str, url: str, **kwargs) -> requests.Response:
+    """requests.request(), reported to the per-request perf recorder."""
+    path = url.split('://', 1)[-1].split('/', 1)[-1]
+    name = '.'.join(path.split('/')[:2])
+    with track_external('squad', name):
+        return requests.request(method, url, **kwargs)
+
 
 class SquadPaymentService:
     """Service class to interact with Squad API"""
@@ -64,7 +74,7 @@ class SquadPaymentService:
             payload['metadata'] = metadata
         
         try:
-            response = requests.post(url, json=payload, headers=self._get_headers())
+            response = _send('POST', url, json=payload, headers=self._get_headers())
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -83,7 +93,7 @@ class SquadPaymentService:
         url = f"{self.base_url}/transaction/verify/{transaction_ref}"
         
         try:
-            response = requests.get(url, headers=self._get_headers())
+            response = _send('GET', url, headers=self._get_headers())
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -144,7 +154,7 @@ class SquadTransferService:
         }
         
         try:
-            response = requests.post(url, json=payload, headers=self._get_headers())
+            response = _send('POST', url, json=payload, headers=self._get_headers())
             response.raise_for_status()
             data = response.json()
             
@@ -206,7 +216,7 @@ class SquadTransferService:
         }
         
         try:
-            response = requests.post(url, json=payload, headers=self._get_headers())
+            response = _send('POST', url, json=payload, headers=self._get_headers())
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -227,7 +237,7 @@ class SquadTransferService:
         payload = {'transaction_reference': transaction_ref}
         
         try:
-            response = requests.post(url, json=payload, headers=self._get_headers())
+            response = _send('POST', url, json=payload, headers=self._get_headers())
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
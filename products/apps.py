@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class ProductsConfig(AppConfig):
     name = 'products'
+
+    def ready(self):
+        from besmart_backend.cache import invalidate_on_save
+        from . import home_feed, product_page
+        from .models import Product
+
+        invalidate_on_save(Product, 'product_lists', 'product_facets')
+        product_page.connect_signals()
+        home_feed.connect_signals()
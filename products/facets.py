@@ -0,0 +1,102 @@
+"""
+Facet counts for product listings (``GET /api/products/?facets=true``).
+
+Every facet comes out of one GROUPING SETS aggregate over the listing's
+filtered queryset (same filterset and search as the page itself):
+
+    GROUP BY GROUPING SETS ((brand), (category_id), (bucket), (is_on_sale), (in_stock), ())
+
+``GROUPING(...)`` tells the rows of each set apart; ``()`` is the total.
+Counts are conjunctive: a facet's counts respect every active filter,
+its own included.  Price buckets come from PRODUCT_FACET_PRICE_BUCKETS
+(``width_bucket`` over the boundaries).
+
+Requests without filters (at most ``search``) are the popular ones; their
+facets are cached per search text in the 'product_facets' namespace,
+independently of the cursor and ordering, so paging does not recompute them.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db import connection
+
+from besmart_backend.cache import get_namespace
+
+# GROUPING(brand, category_id, bucket, is_on_sale, in_stock) of each set (a 1
+# bit for every column aggregated away) -> facet name, index of its column.
+SETS = {
+    0b01111: ('brand', 0),
+    0b10111: ('category', 1),
+    0b11011: ('price', 2),
+    0b11101: ('on_sale', 3),
+    0b11110: ('in_stock', 4),
+}
+TOTAL = 0b11111
+
+FACET_SQL = """
+    SELECT GROUPING(brand, category_id, bucket, is_on_sale, in_stock),
+           brand, category_id, bucket, is_on_sale, in_stock, count(*)
+    FROM (
+        SELECT q.brand, q.category_id, width_bucket(q.price, %s::numeric[]) AS bucket, q.is_on_sale, q.in_stock
+        FROM ({inner}) q
+    ) m
+    GROUP BY GROUPING SETS ((brand), (category_id), (bucket), (is_on_sale), (in_stock), ())
+"""
+
+# Query parameters that do not change which products match.
+PAGING_PARAMS = {'cursor', 'page_size', 'ordering', 'facets'}
+
+
+def _top(counts, limit):
+    ranked = sorted(
+        ((value, n) for value, n in counts.items() if value is not None),
+        key=lambda item: (-item[1], str(item[0])),
+    )
+    return [{'value': str(value), 'count': n} for value, n in ranked[:limit]]
+
+
+def _flags(counts):
+    return {'true': counts.get(True, 0), 'false': counts.get(False, 0)}
+
+
+def compute(queryset) -> dict:
+    """Facet counts for the products in (filtered) ``queryset``."""
+    bounds = list(settings.PRODUCT_FACET_PRICE_BUCKETS)
+    inner, params = (
+        queryset.order_by().values('brand', 'category_id', 'price', 'is_on_sale', 'in_stock')
+        .query.sql_with_params()
+    )
+    with connection.cursor() as c:
+        c.execute(FACET_SQL.format(inner=inner), [bounds, *params])
+        rows = c.fetchall()
+
+    counts = {name: {} for name, _ in SETS.values()}
+    total = 0
+    for grouping, *values, count in rows:
+        if grouping == TOTAL:
+            total = count
+        else:
+            name, column = SETS[grouping]
+            counts[name][values[column]] = count
+
+    edges = [None, *bounds, None]
+    return {
+        'total': total,
+        'brand': _top(counts['brand'], settings.PRODUCT_FACET_LIMIT),
+        'category': _top(counts['category'], settings.PRODUCT_FACET_LIMIT),
+        'price': [
+            {'min': edges[i], 'max': edges[i + 1], 'count': counts['price'].get(i, 0)}
+            for i in range(len(bounds) + 1)
+        ],
+        'on_sale': _flags(counts['on_sale']),
+        'in_stock': _flags(counts['in_stock']),
+    }
+
+
+def for_request(request, queryset) -> dict:
+    """``compute(queryset)``, cached when the request has no filters besides ``search``."""
+    if set(request.query_params) - PAGING_PARAMS - {'search'}:
+        return compute(queryset)
+    search = ' '.join(request.query_params.get('search', '').split())
+    tier = get_namespace('product_facets', timeout=settings.PRODUCT_FACET_CACHE_TTL)
+    return tier.get_or_set(hashlib.sha1(search.encode()).hexdigest(), lambda: compute(queryset))
@@ -0,0 +1,79 @@
+import operator
+import re
+from functools import reduce
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db.models import FloatField, Func, IntegerField, Q
+from django.db.models.functions import Cast
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+SEARCH_CONFIG = 'english'
+
+# ``products.search_vector`` is maintained by the database, not the model
+# (Django would write it back on every save), so it is referenced directly.
+SEARCH_DOCUMENT = RawSQL('"products"."search_vector"', [], output_field=SearchVectorField())
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def prefix_query(text):
+    """
+    'wireless head' -> to_tsquery('english', 'wireless:* & head:*'), so the
+    last (possibly half-typed) word and every other word match as prefixes.
+    Returns None when the text has no searchable words.
+    """
+    terms = _TERM.findall(text or '')[:10]
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f'{t}:*' for t in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for SearchFilter that matches ``?search=`` against
+    the GIN-indexed ``products.search_vector`` instead of ILIKE over
+    ``search_fields``, and annotates ``search_rank`` (ts_rank).
+
+    An exact SKU still matches.  Text made only of stopwords ('a', 'what is')
+    compiles to an empty tsquery that matches nothing, so those searches
+    fall back to the ILIKE match over ``search_fields``; the check is
+    constant-folded by PostgreSQL, so other searches keep the index scan
+    and a single query.  Results are ordered by rank unless the
+    view applies its own ordering afterwards; ProductCursorPagination pages
+    by rank when the client did not ask for another ordering.
+    """
+    rank_annotation = 'search_rank'
+
+    def filter_queryset(self, request, queryset, view):
+        text = ' '.join(self.get_search_terms(request))
+        query = prefix_query(text)
+        if query is None:
+            return queryset
+        return (
+            queryset
+            .alias(search_document=SEARCH_DOCUMENT)
+            # ts_rank is real; as double precision it survives the trip
+            # through a pagination cursor exactly.
+            .annotate(**{self.rank_annotation: Cast(SearchRank(SEARCH_DOCUMENT, query), FloatField())})
+            .alias(search_nodes=Func(query, function='numnode', output_field=IntegerField()))
+            .filter(
+                Q(search_document=query) | Q(sku=text.strip())
+                | Q(search_nodes=0) & self._contains_all_terms(request, queryset, view)
+            )
+            .order_by(f'-{self.rank_annotation}', '-id')
+        )
+
+    def _contains_all_terms(self, request, queryset, view):
+        """SearchFilter's own match: every term in some search field."""
+        lookups = [self.construct_search(str(field), queryset) for field in self.get_search_fields(view, request)]
+        return reduce(operator.and_, (
+            reduce(operator.or_, (Q(**{lookup: term}) for lookup in lookups))
+            for term in self.get_search_terms(request)
+        ))
+
+    def get_schema_operation_parameters(self, view):
+        params = super().get_schema_operation_parameters(view)
+        for param in params:
+            param['description'] = 'Full-text search on name, brand and description (prefix matching).'
+        return params
@@ -0,0 +1,142 @@
+"""
+Home screen snapshot behind GET /api/products/home-feed/.
+
+The featured, new-arrival and on-sale shelves (the newest
+HOME_FEED_SHELF_SIZE live products of each list endpoint, in the order
+those endpoints use: -added_date, -id) and the categories with the most live products are
+built together by ``build()`` and stored as one entry in the shared cache.
+A request costs one cache read:
+
+- the snapshot is rebuilt after a transaction that changed a product's
+  shelf flags (is_featured, is_new_arrival, is_on_sale, status,
+  approval_status) commits;
+- a snapshot older than HOME_FEED_REFRESH_INTERVAL is rebuilt by the first
+  request that sees it (other requests keep serving it meanwhile), which
+  picks up price and stock edits and flag changes made in SQL;
+  ``manage.py refresh_home_feed`` does the same from a scheduler;
+- on a cold cache the request builds the snapshot itself.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import Product
+from .serializers import ProductListSerializer
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'home_feed:snapshot'
+LOCK_KEY = 'home_feed:lock'
+SHELVES = {
+    'featured': {'is_featured': True},
+    'new_arrivals': {'is_new_arrival': True},
+    'on_sale': {'is_on_sale': True},
+}
+
+TOP_CATEGORIES_SQL = """
+    SELECT c.id::text, c.name, c.image_url, count(*) AS product_count
+    FROM categories c
+    JOIN products p ON p.category_id = c.id
+    WHERE c.is_active AND p.status = 'active' AND p.approval_status = 'approved'
+    GROUP BY c.id
+    ORDER BY product_count DESC, c.name
+    LIMIT %s
+"""
+
+
+def build() -> dict:
+    size = settings.HOME_FEED_SHELF_SIZE
+    live = Product.objects.filter(status='active', approval_status='approved')
+    serializer = ProductListSerializer(many=True)
+    data = {
+        name: serializer.to_representation(
+            ProductListSerializer.rows(live.filter(**flags).order_by('-added_date', '-id')[:size])
+        )
+        for name, flags in SHELVES.items()
+    }
+    with connection.cursor() as c:
+        c.execute(TOP_CATEGORIES_SQL, [settings.HOME_FEED_CATEGORY_COUNT])
+        data['top_categories'] = [
+            {'id': id_, 'name': name, 'image_url': image_url, 'product_count': count}
+            for id_, name, image_url, count in c.fetchall()
+        ]
+    data['generated_at'] = timezone.now().isoformat()
+    return data
+
+
+def refresh(wait=True):
+    """
+    Rebuild and store the snapshot; return it.  When another process is
+    already rebuilding, return None at once unless ``wait`` is set, in which
+    case its snapshot is awaited (up to CACHE_STAMPEDE_WAIT seconds).
+    """
+    timeout = max(1, int(settings.CACHE_STAMPEDE_WAIT))
+    acquired = cache.add(LOCK_KEY, 1, timeout)
+    if not acquired:
+        if not wait:
+            return None
+        deadline = time.time() + settings.CACHE_STAMPEDE_WAIT
+        while time.time() < deadline:
+            time.sleep(0.05)
+            if not cache.get(LOCK_KEY):
+                break
+        snapshot = cache.get(SNAPSHOT_KEY)
+        if snapshot is not None:
+            return snapshot
+    try:
+        snapshot = {'built_at': time.time(), 'data': build()}
+        cache.set(SNAPSHOT_KEY, snapshot, settings.HOME_FEED_SNAPSHOT_TTL)
+        return snapshot
+    finally:
+        # A waiter that timed out rebuilds without the lock; the lock is
+        # still the other process's to release.
+        if acquired:
+            cache.delete(LOCK_KEY)
+
+
+def snapshot() -> dict:
+    """The home feed payload, refreshed as described in the module docstring."""
+    current = cache.get(SNAPSHOT_KEY)
+    if current is None:
+        return refresh()['data']
+    if time.time() - current['built_at'] > settings.HOME_FEED_REFRESH_INTERVAL:
+        current = refresh(wait=False) or current
+    return current['data']
+
+
+def _refresh_after_commit():
+    try:
+        refresh(wait=False)
+    except Exception:
+        logger.exception('Home feed refresh failed')
+
+
+def _on_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(Product.SHELF_FLAGS):
+        return
+    flags = instance.shelf_flags()
+    # Product.from_db() records the loaded flags; an instance built by hand
+    # has none, so its save is treated as a change.
+    loaded = getattr(instance, '_loaded_shelf_flags', None)
+    if created:
+        changed = any(flags[:3])
+    else:
+        changed = loaded is None or flags != loaded
+    instance._loaded_shelf_flags = flags
+    if changed:
+        transaction.on_commit(_refresh_after_commit)
+
+
+def _on_delete(sender, instance, **kwargs):
+    if any(instance.shelf_flags()[:3]):
+        transaction.on_commit(_refresh_after_commit)
+
+
+def connect_signals():
+    post_save.connect(_on_save, sender=Product, dispatch_uid='home_feed:save')
+    post_delete.connect(_on_delete, sender=Product, dispatch_uid='home_feed:delete')
@@ -0,0 +1,58 @@
+"""
+Bulk product hydration for endpoints that store product ids in arrays
+(product_recommendations, ...).
+
+``hydrate_lists({'similar_products': [...], 'you_might_also_like': [...]})``
+loads the union of all lists with a single ``id = ANY(%s::uuid[])`` primary
+key lookup and returns every list's product cards in that list's stored
+order.  Ids that are unknown, not live or repeated are skipped.
+"""
+from django.db import connection
+
+CARD_COLUMNS = (
+    'id', 'name', 'price', 'images', 'rating', 'reviews', 'in_stock',
+    'discount_percentage', 'is_on_sale', 'sale_price', 'brand',
+)
+
+CARDS_SQL = f"""
+    SELECT {', '.join(CARD_COLUMNS)}
+    FROM products
+    WHERE id = ANY(%s::uuid[]) AND status = 'active' AND approval_status = 'approved'
+"""
+
+
+def fetch_cards(ids) -> dict:
+    """Product cards for ``ids``, keyed by the id as a string."""
+    ids = list({str(i) for i in ids})
+    if not ids:
+        return {}
+    with connection.cursor() as c:
+        c.execute(CARDS_SQL, [ids])
+        rows = c.fetchall()
+    cards = {}
+    for row in rows:
+        card = dict(zip(CARD_COLUMNS, row))
+        card['id'] = str(card['id'])
+        cards[card['id']] = card
+    return cards
+
+
+def _ordered(ids, cards):
+    seen = set()
+    result = []
+    for pk in map(str, ids or ()):
+        if pk in cards and pk not in seen:
+            seen.add(pk)
+            result.append(cards[pk])
+    return result
+
+
+def hydrate(ids) -> list:
+    """Live product cards for ``ids``, in the same order."""
+    return _ordered(ids, fetch_cards(ids))
+
+
+def hydrate_lists(lists: dict) -> dict:
+    """``{name: ids}`` to ``{name: cards}`` with one query for all lists."""
+    cards = fetch_cards(pk for ids in lists.values() for pk in ids or ())
+    return {name: _ordered(ids, cards) for name, ids in lists.items()}
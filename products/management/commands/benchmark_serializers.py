@@ -0,0 +1,77 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from products.models import Product
+from products.serializers import ProductListSerializer
+
+
+class ReferenceProductListSerializer(serializers.ModelSerializer):
+    """ProductListSerializer without the field plan: plain DRF."""
+
+    class Meta(ProductListSerializer.Meta):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare ProductListSerializer (field plan, values_list rows) with plain DRF '
+        'ModelSerializer serialization of the same products. Checks the rendered JSON is '
+        'byte-for-byte identical and reports the best of --repeat timings.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Products per run')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        # Primary key order keeps the query itself cheap; the comparison is about serialization.
+        queryset = Product.objects.filter(status='active', approval_status='approved').order_by('id')
+        queryset = queryset[:max(1, options['rows'])]
+        render = JSONRenderer().render
+
+        def drf():
+            return render(ReferenceProductListSerializer(list(queryset.all()), many=True).data)
+
+        def instances():
+            return render(ProductListSerializer(list(queryset.all()), many=True).data)
+
+        def rows():
+            return render(ProductListSerializer(list(ProductListSerializer.rows(queryset)), many=True).data)
+
+        def serialize_only(serializer, items):
+            return lambda: render(serializer(items, many=True).data)
+
+        models, named_rows = list(queryset), list(ProductListSerializer.rows(queryset))
+        if not models:
+            raise CommandError('No products; seed the catalog first (manage.py seed_catalog).')
+        runs = [
+            ('DRF ModelSerializer, model instances', drf),
+            ('field plan, model instances', instances),
+            ('field plan, values_list rows', rows),
+            ('serialize only: DRF', serialize_only(ReferenceProductListSerializer, models)),
+            ('serialize only: field plan', serialize_only(ProductListSerializer, named_rows)),
+        ]
+
+        outputs = {fn() for _, fn in runs}
+        if len(outputs) != 1:
+            raise CommandError('Serialized output differs between the DRF and field plan paths')
+
+        self.stdout.write(f'{len(models)} products, best of {options["repeat"]} (query + serialize + render):')
+        timings = {}
+        for name, fn in runs:
+            best = float('inf')
+            for _ in range(max(1, options['repeat'])):
+                started = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - started)
+            timings[name] = best
+            self.stdout.write(f'  {name:<40} {best * 1000:8.1f} ms  {len(models) / best:>10,.0f} rows/s')
+
+        baseline = timings[runs[0][0]]
+        self.stdout.write(self.style.SUCCESS(
+            f'Identical output; values_list rows path {baseline / timings[runs[2][0]]:.1f}x faster end to end, '
+            f'serialization alone {timings[runs[3][0]] / timings[runs[4][0]]:.1f}x'
+        ))
@@ -0,0 +1,196 @@
+import json
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from products import recommender
+
+CATALOG_SQL = """
+    SELECT id::text, vendor_id::text, category_id::text, coalesce(rating, 0), coalesce(reviews, 0)
+    FROM products
+    WHERE status = 'active' AND approval_status = 'approved'
+    ORDER BY id
+"""
+
+# Orders that did not go through are not evidence of affinity.
+PURCHASES_SQL = """
+    SELECT DISTINCT oi.order_id::text, oi.product_id::text
+    FROM order_items oi
+    JOIN orders o ON o.id = oi.order_id
+    WHERE o.created_at >= now() - make_interval(days => %s)
+      AND o.status NOT IN ('cancelled', 'refunded', 'returned')
+"""
+
+# Anonymous views have no session id to group them by.
+VIEWS_SQL = """
+    SELECT DISTINCT user_id::text, product_id::text
+    FROM product_views
+    WHERE user_id IS NOT NULL AND created_at >= now() - make_interval(days => %s)
+"""
+
+EXISTING_SQL = """
+    SELECT product_id::text, similar_products::text[], from_seller_products::text[],
+           you_might_also_like::text[], algorithm_version
+    FROM product_recommendations
+"""
+
+# Rows of products that are gone or no longer live.
+DELETE_SQL = 'DELETE FROM product_recommendations WHERE product_id = ANY(%s::uuid[])'
+
+UPSERT_SQL = """
+    INSERT INTO product_recommendations AS r
+        (product_id, similar_products, from_seller_products, you_might_also_like,
+         algorithm_version, confidence_score, last_updated)
+    VALUES (%s, %s::uuid[], %s::uuid[], %s::uuid[], %s, %s, now())
+    ON CONFLICT (product_id) DO UPDATE SET
+        similar_products = EXCLUDED.similar_products,
+        from_seller_products = EXCLUDED.from_seller_products,
+        you_might_also_like = EXCLUDED.you_might_also_like,
+        algorithm_version = EXCLUDED.algorithm_version,
+        confidence_score = EXCLUDED.confidence_score,
+        last_updated = EXCLUDED.last_updated
+"""
+
+
+def _codes(values):
+    """Dense int codes for hashable ``values`` (None -> -1)."""
+    index = {}
+    return np.array([-1 if v is None else index.setdefault(v, len(index)) for v in values], dtype=np.int64)
+
+
+def _pairs(cursor, sql, days, position):
+    """(group codes, catalog positions) for live products, read in chunks."""
+    groups, items, index = [], [], {}
+    cursor.execute(sql, [days])
+    while rows := cursor.fetchmany(10000):
+        for group, product_id in rows:
+            item = position.get(product_id)
+            if item is not None:
+                groups.append(index.setdefault(group, len(index)))
+                items.append(item)
+    return np.array(groups, dtype=np.int64), np.array(items, dtype=np.int64)
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild product_recommendations from co-purchases (order_items), co-views '
+        '(product_views) and same-vendor listings. Lists are computed for the whole '
+        'catalog with sparse matrix products; only rows whose lists changed are written, '
+        'and rows of products that are no longer live are removed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help='Products per list')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Only orders and views from the last N days')
+        parser.add_argument('--co-view-weight', type=float, default=recommender.CO_VIEW_WEIGHT,
+                            help='Weight of co-view affinity against co-purchase affinity')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows upserted per transaction')
+        parser.add_argument('--full', action='store_true',
+                            help='Rewrite every row, not just the changed ones')
+        parser.add_argument('--dry-run', action='store_true', help='Compute and report, write nothing')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        timings = {}
+
+        @contextmanager
+        def phase(name):
+            started = time.monotonic()
+            yield
+            timings[name] = round(time.monotonic() - started, 3)
+
+        with phase('load'):
+            catalog, purchases, views = self._load(options['days'])
+        with phase('compute'):
+            results, stats = recommender.recommend(
+                catalog, purchases, views, n=max(1, options['top']), co_view_weight=options['co_view_weight'],
+            )
+        with phase('write'):
+            written, unchanged, removed = self._write(catalog.ids, results, options)
+        timings['total'] = round(sum(timings.values()), 3)
+
+        size = stats['products'] or 1
+        report = {
+            'algorithm_version': recommender.ALGORITHM_VERSION,
+            **stats,
+            'purchase_lines': len(purchases[0]),
+            'view_pairs': len(views[0]),
+            'coverage': {
+                'affinity': round(stats['with_affinities'] / size, 4),
+                'similar_products': round(stats['with_similar'] / size, 4),
+                'from_seller_products': round(stats['with_seller'] / size, 4),
+            },
+            'written': written,
+            'unchanged': unchanged,
+            'removed': removed,
+            'dry_run': options['dry_run'],
+            'seconds': timings,
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        coverage = report['coverage']
+        self.stdout.write(
+            f"{stats['products']} products, {report['purchase_lines']} order lines, "
+            f"{report['view_pairs']} user views"
+        )
+        self.stdout.write(
+            f"  affinity pairs: {stats['co_purchase_pairs']} co-purchase, {stats['co_view_pairs']} co-view"
+        )
+        self.stdout.write(
+            f"  coverage: {coverage['affinity']:.1%} from affinities, "
+            f"{coverage['similar_products']:.1%} with similar products, "
+            f"{coverage['from_seller_products']:.1%} with seller products"
+        )
+        self.stdout.write('  ' + ', '.join(f'{name} {seconds:.2f}s' for name, seconds in timings.items()))
+        verb, removal = ('Would write', 'would remove') if options['dry_run'] else ('Wrote', 'removed')
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {written} recommendation rows ({unchanged} unchanged), '
+            f'{removal} {removed} of products no longer listed'
+        ))
+
+    def _load(self, days):
+        with connection.cursor() as cursor:
+            cursor.execute(CATALOG_SQL)
+            rows = cursor.fetchall()
+            ids = [row[0] for row in rows]
+            catalog = recommender.Catalog(
+                ids=ids,
+                vendors=_codes(row[1] for row in rows),
+                categories=_codes(row[2] for row in rows),
+                ratings=np.array([float(row[3]) for row in rows]),
+                reviews=np.array([row[4] for row in rows], dtype=np.int64),
+            )
+            position = {product_id: i for i, product_id in enumerate(ids)}
+            purchases = _pairs(cursor, PURCHASES_SQL, days, position)
+            views = _pairs(cursor, VIEWS_SQL, days, position)
+        return catalog, purchases, views
+
+    def _write(self, ids, results, options):
+        with connection.cursor() as cursor:
+            cursor.execute(EXISTING_SQL)
+            existing = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+        changed = []
+        for product_id, rec in zip(ids, results):
+            lists = (rec.similar_products, rec.from_seller_products, rec.you_might_also_like)
+            if options['full'] or existing.get(product_id) != (*lists, recommender.ALGORITHM_VERSION):
+                changed.append((product_id, *lists, recommender.ALGORITHM_VERSION, rec.confidence))
+
+        stale = sorted(existing.keys() - set(ids))
+
+        if not options['dry_run']:
+            batch_size = max(1, options['batch_size'])
+            for start in range(0, len(changed), batch_size):
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(UPSERT_SQL, changed[start:start + batch_size])
+            for start in range(0, len(stale), batch_size):
+                with connection.cursor() as cursor:
+                    cursor.execute(DELETE_SQL, [stale[start:start + batch_size]])
+        return len(changed), len(results) - len(changed), len(stale)
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from besmart_backend.cache import invalidate
+
+SELECT_BATCH_SQL = """
+    SELECT id FROM products
+    WHERE (%(after)s::uuid IS NULL OR id > %(after)s::uuid) {missing}
+    ORDER BY id
+    LIMIT %(limit)s
+"""
+
+UPDATE_BATCH_SQL = """
+    UPDATE products
+    SET search_vector = products_search_document(name, brand, description, tags)
+    WHERE id = ANY(%s::uuid[])
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute products.search_vector (weighted name > brand > description > tags) '
+        'in short batches. Each batch is its own transaction and only locks its own rows, '
+        'so it is safe to run against the live catalog.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--missing-only', action='store_true',
+                            help='Only rows whose search_vector is NULL')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches to limit load on the primary')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        select_sql = SELECT_BATCH_SQL.format(missing='AND search_vector IS NULL' if options['missing_only'] else '')
+        after, total, started = None, 0, time.monotonic()
+
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(select_sql, {'after': after, 'limit': batch_size})
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                cursor.execute(UPDATE_BATCH_SQL, [ids])
+            total += len(ids)
+            after = ids[-1]
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  {total} rows')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        # Cached list pages and facets (search results included) predate the new vectors.
+        invalidate('product_lists', 'product_facets')
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt search_vector for {total} products in {time.monotonic() - started:.1f}s'
+        ))
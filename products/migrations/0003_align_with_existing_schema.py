@@ -0,0 +1,151 @@
+"""
+Bring the migration state in line with the Supabase tables the models map to:
+``products.sizes`` is a text[] column and ``product_reviews`` / ``product_qa``
+already exist there.
+
+The SQL is idempotent, so it is a no-op against the Supabase database and
+creates the same schema on fresh databases (local development, test runs).
+It is PostgreSQL-only; the SQLite fallback gets the migration state alone.
+"""
+import django.contrib.postgres.fields
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+ALIGN_SQL = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'products'
+          AND column_name = 'sizes' AND data_type = 'jsonb'
+    ) THEN
+        ALTER TABLE products ADD COLUMN sizes_text text[] NOT NULL DEFAULT '{}';
+        UPDATE products SET sizes_text = ARRAY(SELECT jsonb_array_elements_text(sizes))
+        WHERE jsonb_typeof(sizes) = 'array';
+        ALTER TABLE products DROP COLUMN sizes;
+        ALTER TABLE products RENAME COLUMN sizes_text TO sizes;
+    END IF;
+
+    IF to_regclass('product_reviews') IS NULL THEN
+        CREATE TABLE product_reviews (
+            id uuid NOT NULL PRIMARY KEY,
+            product_id uuid NOT NULL REFERENCES products (id) DEFERRABLE INITIALLY DEFERRED,
+            user_id uuid NOT NULL REFERENCES users_user (id) DEFERRABLE INITIALLY DEFERRED,
+            order_id uuid NULL,
+            rating integer NOT NULL,
+            title varchar(255) NULL,
+            content text NULL,
+            images text[] NOT NULL,
+            verified_purchase boolean NOT NULL,
+            helpful_count integer NOT NULL,
+            reported_count integer NOT NULL,
+            status varchar(20) NOT NULL,
+            vendor_response text NULL,
+            vendor_response_date timestamp with time zone NULL,
+            created_at timestamp with time zone NOT NULL,
+            updated_at timestamp with time zone NOT NULL
+        );
+        CREATE INDEX product_reviews_product_id_idx ON product_reviews (product_id);
+        CREATE INDEX product_reviews_user_id_idx ON product_reviews (user_id);
+    END IF;
+
+    IF to_regclass('product_qa') IS NULL THEN
+        CREATE TABLE product_qa (
+            id uuid NOT NULL PRIMARY KEY,
+            product_id uuid NOT NULL REFERENCES products (id) DEFERRABLE INITIALLY DEFERRED,
+            user_id uuid NOT NULL REFERENCES users_user (id) DEFERRABLE INITIALLY DEFERRED,
+            question text NOT NULL,
+            answer text NULL,
+            answered_by uuid NULL,
+            answered_at timestamp with time zone NULL,
+            is_helpful_count integer NOT NULL,
+            is_verified boolean NOT NULL,
+            status varchar(20) NOT NULL,
+            vendor_response text NULL,
+            vendor_response_date timestamp with time zone NULL,
+            created_at timestamp with time zone NOT NULL,
+            updated_at timestamp with time zone NOT NULL
+        );
+        CREATE INDEX product_qa_product_id_idx ON product_qa (product_id);
+        CREATE INDEX product_qa_user_id_idx ON product_qa (user_id);
+    END IF;
+END
+$$;
+"""
+
+
+def align_schema(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(ALIGN_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_subcategory_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(align_schema, migrations.RunPython.noop),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='product',
+                    name='sizes',
+                    field=django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=list, size=None),
+                ),
+                migrations.CreateModel(
+                    name='ProductQuestion',
+                    fields=[
+                        ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                        ('question', models.TextField()),
+                        ('answer', models.TextField(blank=True, null=True)),
+                        ('answered_by', models.UUIDField(blank=True, null=True)),
+                        ('answered_at', models.DateTimeField(blank=True, null=True)),
+                        ('is_helpful_count', models.IntegerField(default=0)),
+                        ('is_verified', models.BooleanField(default=False)),
+                        ('status', models.CharField(default='published', max_length=20)),
+                        ('vendor_response', models.TextField(blank=True, null=True)),
+                        ('vendor_response_date', models.DateTimeField(blank=True, null=True)),
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                        ('updated_at', models.DateTimeField(auto_now=True)),
+                        ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_qa', to='products.product')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'product_qa',
+                    },
+                ),
+                migrations.CreateModel(
+                    name='ProductReview',
+                    fields=[
+                        ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                        ('order_id', models.UUIDField(blank=True, null=True)),
+                        ('rating', models.IntegerField()),
+                        ('title', models.CharField(blank=True, max_length=255, null=True)),
+                        ('content', models.TextField(blank=True, null=True)),
+                        ('images', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=list, size=None)),
+                        ('verified_purchase', models.BooleanField(default=False)),
+                        ('helpful_count', models.IntegerField(default=0)),
+                        ('reported_count', models.IntegerField(default=0)),
+                        ('status', models.CharField(default='published', max_length=20)),
+                        ('vendor_response', models.TextField(blank=True, null=True)),
+                        ('vendor_response_date', models.DateTimeField(blank=True, null=True)),
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                        ('updated_at', models.DateTimeField(auto_now=True)),
+                        ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_reviews', to='products.product')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'product_reviews',
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,59 @@
+"""
+GIN index on ``products.search_vector`` for FullTextSearchFilter.
+
+The column already exists in Supabase and is not mapped on the model (the
+database computes it).  Fresh databases get the same column first.  The
+index is built CONCURRENTLY so the catalog stays writable while it builds,
+which is why this migration is non-atomic.
+"""
+from django.db import migrations
+
+from besmart_backend.db.indexes import create_index_concurrently
+
+
+ADD_COLUMN_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'products'
+          AND column_name = 'search_vector'
+    ) THEN
+        ALTER TABLE products ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                to_tsvector('english'::regconfig, name || ' ' || description || ' ' || brand)
+            ) STORED;
+    END IF;
+END $$;
+"""
+
+INDEX_NAME = 'products_search_vector_idx'
+INDEX_DEFINITION = 'ON products USING gin (search_vector)'
+
+
+def add_column(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(ADD_COLUMN_SQL, params=None)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        create_index_concurrently(schema_editor, INDEX_NAME, INDEX_DEFINITION)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('products', '0003_align_with_existing_schema'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_column, migrations.RunPython.noop),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,92 @@
+"""
+Maintain ``products.search_vector`` as a weighted document.
+
+The column used to be derived only from ``name || description || brand``
+(NULL as soon as one of them is NULL) and was not recomputed reliably on
+edits.  It is now a plain column kept up to date by a BEFORE INSERT/UPDATE
+trigger, weighted name (A) > brand (B) > description (C) > tags (D), with
+NULLs treated as empty text.
+
+Only the trigger is installed here; existing rows keep their old vector
+until ``manage.py rebuild_search_vectors`` rewrites them in small batches.
+"""
+from django.db import migrations
+
+
+FORWARD_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'products' AND column_name = 'tags'
+    ) THEN
+        ALTER TABLE products ADD COLUMN tags text[];
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'products'
+          AND column_name = 'search_vector' AND is_generated = 'ALWAYS'
+    ) THEN
+        -- Keeps the stored values; no table rewrite.
+        ALTER TABLE products ALTER COLUMN search_vector DROP EXPRESSION;
+    END IF;
+    ALTER TABLE products ALTER COLUMN search_vector DROP DEFAULT;
+END $$;
+
+CREATE OR REPLACE FUNCTION products_search_document(
+    p_name text, p_brand text, p_description text, p_tags text[]
+) RETURNS tsvector LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $fn$
+    SELECT setweight(to_tsvector('english'::regconfig, coalesce(p_name, '')), 'A')
+        || setweight(to_tsvector('english'::regconfig, coalesce(p_brand, '')), 'B')
+        || setweight(to_tsvector('english'::regconfig, coalesce(p_description, '')), 'C')
+        || setweight(to_tsvector('english'::regconfig, coalesce(array_to_string(p_tags, ' '), '')), 'D')
+$fn$;
+
+CREATE OR REPLACE FUNCTION products_search_vector_refresh() RETURNS trigger LANGUAGE plpgsql AS $fn$
+BEGIN
+    IF TG_OP = 'INSERT'
+       OR NEW.search_vector IS NULL
+       OR NEW.name IS DISTINCT FROM OLD.name
+       OR NEW.brand IS DISTINCT FROM OLD.brand
+       OR NEW.description IS DISTINCT FROM OLD.description
+       OR NEW.tags IS DISTINCT FROM OLD.tags
+    THEN
+        NEW.search_vector := products_search_document(NEW.name, NEW.brand, NEW.description, NEW.tags);
+    END IF;
+    RETURN NEW;
+END
+$fn$;
+
+DROP TRIGGER IF EXISTS products_search_vector_refresh ON products;
+CREATE TRIGGER products_search_vector_refresh
+    BEFORE INSERT OR UPDATE ON products
+    FOR EACH ROW EXECUTE FUNCTION products_search_vector_refresh();
+"""
+
+REVERSE_SQL = """
+DROP TRIGGER IF EXISTS products_search_vector_refresh ON products;
+DROP FUNCTION IF EXISTS products_search_vector_refresh();
+DROP FUNCTION IF EXISTS products_search_document(text, text, text, text[]);
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD_SQL, params=None)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(REVERSE_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
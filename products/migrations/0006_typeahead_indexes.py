@@ -0,0 +1,66 @@
+"""
+Indexes for the typeahead endpoint (products.typeahead).
+
+- btree ``lower(col) text_pattern_ops`` indexes serve prefix matches of any
+  length and need no extension;
+- GIN ``gin_trgm_ops`` indexes serve fuzzy (word similarity) matches and
+  are only created when pg_trgm can be installed.
+
+Product indexes are partial on the active/approved predicate every catalog
+query uses.  All are built CONCURRENTLY, so the migration is non-atomic.
+"""
+from django.db import migrations
+
+from besmart_backend.db.indexes import create_index_concurrently
+
+LIVE = "WHERE status = 'active' AND approval_status = 'approved'"
+
+PREFIX_INDEXES = {
+    'products_name_prefix_idx': f'ON products (lower(name) text_pattern_ops) {LIVE}',
+    'products_brand_prefix_idx': f'ON products (lower(brand) text_pattern_ops) {LIVE}',
+    'vendors_business_name_prefix_idx': 'ON vendors (lower(business_name) text_pattern_ops)',
+}
+
+TRIGRAM_INDEXES = {
+    'products_name_trgm_idx': f'ON products USING gin (name gin_trgm_ops) {LIVE}',
+    'products_brand_trgm_idx': f'ON products USING gin (brand gin_trgm_ops) {LIVE}',
+    'vendors_business_name_trgm_idx': 'ON vendors USING gin (business_name gin_trgm_ops)',
+}
+
+
+def _fetch(cursor, sql):
+    cursor.execute(sql)
+    return cursor.fetchone() is not None
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if _fetch(cursor, "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"):
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        trigram = _fetch(cursor, "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+
+    indexes = dict(PREFIX_INDEXES, **(TRIGRAM_INDEXES if trigram else {}))
+    for name, definition in indexes.items():
+        create_index_concurrently(schema_editor, name, definition)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in [*PREFIX_INDEXES, *TRIGRAM_INDEXES]:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('products', '0005_maintain_search_vector'),
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
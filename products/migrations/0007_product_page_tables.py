@@ -0,0 +1,130 @@
+"""
+Create the product-page side tables that exist in Supabase but have no
+models (delivery_info, warranty_info, product_offers, product_highlights,
+feature_posters, product_specifications, product_recommendations,
+product_reviews_summary), so fresh databases can serve the product page.
+
+``CREATE ... IF NOT EXISTS`` makes this a no-op for the tables on Supabase;
+the product_id indexes on the one-to-many tables are new there too (foreign
+keys are not indexed automatically).
+"""
+from django.db import migrations
+
+
+FORWARD_SQL = """
+CREATE TABLE IF NOT EXISTS delivery_info (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    product_id uuid NOT NULL UNIQUE REFERENCES products (id),
+    return_window_days integer DEFAULT 7,
+    cod_eligible boolean DEFAULT true,
+    free_delivery boolean DEFAULT false,
+    shipping_fee numeric DEFAULT 0,
+    eta_min_days integer DEFAULT 3,
+    eta_max_days integer DEFAULT 7,
+    delivery_notes text,
+    created_at timestamp with time zone DEFAULT now(),
+    updated_at timestamp with time zone DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS warranty_info (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    product_id uuid NOT NULL UNIQUE REFERENCES products (id),
+    type text NOT NULL,
+    duration text NOT NULL,
+    description text,
+    terms_url text,
+    coverage_details text[],
+    exclusions text[],
+    created_at timestamp with time zone DEFAULT now(),
+    updated_at timestamp with time zone DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS product_offers (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    product_id uuid NOT NULL REFERENCES products (id),
+    type text NOT NULL CHECK (type = ANY (ARRAY['coupon', 'bank', 'delivery', 'cod', 'timer'])),
+    code text,
+    description text NOT NULL,
+    expiry_date timestamp with time zone,
+    icon_url text,
+    is_active boolean DEFAULT true,
+    sort_order integer DEFAULT 0,
+    created_at timestamp with time zone DEFAULT now(),
+    updated_at timestamp with time zone DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS product_highlights (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    product_id uuid NOT NULL REFERENCES products (id),
+    label text NOT NULL,
+    icon_url text,
+    sort_order integer DEFAULT 0,
+    created_at timestamp with time zone DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS feature_posters (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    product_id uuid NOT NULL REFERENCES products (id),
+    title text NOT NULL,
+    subtitle text NOT NULL,
+    media_url text NOT NULL,
+    aspect_ratio text DEFAULT '16:9',
+    cta_label text,
+    sort_order integer DEFAULT 0,
+    is_active boolean DEFAULT true,
+    created_at timestamp with time zone DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS product_specifications (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    product_id uuid NOT NULL REFERENCES products (id),
+    group_name text NOT NULL,
+    spec_name text NOT NULL,
+    spec_value text NOT NULL,
+    sort_order integer DEFAULT 0,
+    created_at timestamp with time zone DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS product_recommendations (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    product_id uuid NOT NULL UNIQUE REFERENCES products (id),
+    similar_products uuid[] DEFAULT '{}',
+    from_seller_products uuid[] DEFAULT '{}',
+    you_might_also_like uuid[] DEFAULT '{}',
+    algorithm_version text DEFAULT 'v1.0',
+    confidence_score numeric DEFAULT 0.5,
+    last_updated timestamp with time zone DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS product_reviews_summary (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    product_id uuid NOT NULL UNIQUE REFERENCES products (id),
+    with_media integer DEFAULT 0,
+    histogram integer[] DEFAULT ARRAY[0, 0, 0, 0, 0],
+    total_reviews integer DEFAULT 0,
+    average_rating numeric DEFAULT 0,
+    last_updated timestamp with time zone DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS product_offers_product_id_idx ON product_offers (product_id, sort_order);
+CREATE INDEX IF NOT EXISTS product_highlights_product_id_idx ON product_highlights (product_id, sort_order);
+CREATE INDEX IF NOT EXISTS feature_posters_product_id_idx ON feature_posters (product_id, sort_order);
+CREATE INDEX IF NOT EXISTS product_specifications_product_id_idx ON product_specifications (product_id, sort_order);
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_typeahead_indexes'),
+    ]
+
+    operations = [
+        # Tables are left in place on reverse: on Supabase they predate this migration.
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+"""
+Per-product version counter for the product page side tables.
+
+Every insert, update or delete on delivery_info, warranty_info,
+product_offers, product_highlights, feature_posters or
+product_specifications bumps ``product_content_versions.version`` for the
+product(s) it touches, whichever client made the write (Django, the
+Supabase dashboard, vendor tooling).  products.product_page puts the version
+in its cache keys, so a write retires the cached payloads of that product
+only.
+"""
+from django.db import migrations
+
+TABLES = (
+    'delivery_info', 'warranty_info', 'product_offers',
+    'product_highlights', 'feature_posters', 'product_specifications',
+)
+
+FORWARD_SQL = """
+CREATE TABLE IF NOT EXISTS product_content_versions (
+    product_id uuid PRIMARY KEY,
+    version bigint NOT NULL DEFAULT 1,
+    updated_at timestamp with time zone NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION bump_product_content_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        INSERT INTO product_content_versions AS v (product_id) VALUES (OLD.product_id)
+        ON CONFLICT (product_id) DO UPDATE SET version = v.version + 1, updated_at = now();
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.product_id IS DISTINCT FROM OLD.product_id) THEN
+        INSERT INTO product_content_versions AS v (product_id) VALUES (NEW.product_id)
+        ON CONFLICT (product_id) DO UPDATE SET version = v.version + 1, updated_at = now();
+    END IF;
+    RETURN NULL;
+END
+$$;
+""" + ''.join(f"""
+DROP TRIGGER IF EXISTS {table}_content_version ON {table};
+CREATE TRIGGER {table}_content_version
+    AFTER INSERT OR UPDATE OR DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION bump_product_content_version();
+""" for table in TABLES)
+
+REVERSE_SQL = ''.join(
+    f'DROP TRIGGER IF EXISTS {table}_content_version ON {table};\n' for table in TABLES
+) + """
+DROP FUNCTION IF EXISTS bump_product_content_version();
+DROP TABLE IF EXISTS product_content_versions;
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD_SQL, params=None)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(REVERSE_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_page_tables'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,34 @@
+"""
+Create product_views (a Supabase-only table) for fresh databases, and give
+``id`` a default so products.view_tracking can insert batches without
+generating ids.  Both statements are no-ops where the table already matches.
+"""
+from django.db import migrations
+
+FORWARD_SQL = """
+CREATE TABLE IF NOT EXISTS product_views (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    product_id uuid NOT NULL REFERENCES products (id) ON DELETE CASCADE,
+    user_id uuid,
+    created_at timestamp with time zone NOT NULL DEFAULT now()
+);
+ALTER TABLE product_views ALTER COLUMN id SET DEFAULT gen_random_uuid();
+CREATE INDEX IF NOT EXISTS product_views_product_id_idx ON product_views (product_id, created_at);
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_product_content_versions'),
+    ]
+
+    operations = [
+        # The table is left in place on reverse: on Supabase it predates this migration.
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,193 @@
+"""
+Maintain ``product_reviews_summary`` and ``products.rating``/``reviews``
+from ``product_reviews``.
+
+Statement-level triggers with transition tables turn every insert, update
+or delete of reviews (API, moderation in the Supabase dashboard, bulk
+loads) into per-product deltas -- count, media count and rating histogram
+of the published reviews added minus those removed -- and apply them with
+one upsert into product_reviews_summary and one update of products, inside
+the writing transaction.  Updates that do not change a published review's
+product, rating, media or status (helpful/report counters) yield no delta
+and write nothing.
+
+The summary's product foreign key becomes ON DELETE CASCADE, since Django
+does not know about the table when it deletes a product, and existing
+summaries are rebuilt from the reviews once.
+"""
+from django.db import migrations
+
+
+FORWARD_SQL = """
+DO $$
+DECLARE
+    fk record;
+BEGIN
+    FOR fk IN
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = 'product_reviews_summary'::regclass AND contype = 'f'
+          AND confrelid = 'products'::regclass AND confdeltype <> 'c'
+    LOOP
+        EXECUTE format('ALTER TABLE product_reviews_summary DROP CONSTRAINT %I', fk.conname);
+        ALTER TABLE product_reviews_summary ADD FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE;
+    END LOOP;
+END $$;
+
+CREATE OR REPLACE FUNCTION product_reviews_histogram_add(a integer[], b integer[])
+RETURNS integer[] LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $fn$
+    SELECT array_agg(coalesce(a[i], 0) + coalesce(b[i], 0) ORDER BY i) FROM generate_series(1, 5) AS i
+$fn$;
+
+CREATE OR REPLACE FUNCTION product_reviews_average(h integer[])
+RETURNS numeric LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $fn$
+    SELECT CASE WHEN total > 0 THEN round(weighted::numeric / total, 2) ELSE 0 END
+    FROM (SELECT sum(coalesce(h[i], 0)) AS total, sum(i * coalesce(h[i], 0)) AS weighted
+          FROM generate_series(1, 5) AS i) t
+$fn$;
+
+-- Add the signed review rows (1 = now counted, -1 = no longer counted) to
+-- the summaries and products they belong to.
+CREATE OR REPLACE FUNCTION product_reviews_summary_apply(
+    p_products uuid[], p_ratings integer[], p_media boolean[], p_signs integer[]
+) RETURNS void LANGUAGE sql AS $fn$
+    WITH delta AS (
+        SELECT c.product_id,
+               sum(c.sign)::integer AS total,
+               coalesce(sum(c.sign) FILTER (WHERE c.media), 0)::integer AS with_media,
+               ARRAY[coalesce(sum(c.sign) FILTER (WHERE c.rating = 1), 0),
+                     coalesce(sum(c.sign) FILTER (WHERE c.rating = 2), 0),
+                     coalesce(sum(c.sign) FILTER (WHERE c.rating = 3), 0),
+                     coalesce(sum(c.sign) FILTER (WHERE c.rating = 4), 0),
+                     coalesce(sum(c.sign) FILTER (WHERE c.rating = 5), 0)]::integer[] AS histogram
+        FROM unnest(p_products, p_ratings, p_media, p_signs) AS c(product_id, rating, media, sign)
+        WHERE EXISTS (SELECT 1 FROM products p WHERE p.id = c.product_id)
+        GROUP BY c.product_id
+    ),
+    summary AS (
+        INSERT INTO product_reviews_summary AS s
+            (product_id, total_reviews, with_media, histogram, average_rating, last_updated)
+        SELECT product_id, total, with_media, histogram, product_reviews_average(histogram), now()
+        FROM delta
+        WHERE total <> 0 OR with_media <> 0 OR histogram <> ARRAY[0, 0, 0, 0, 0]
+        ON CONFLICT (product_id) DO UPDATE SET
+            total_reviews = coalesce(s.total_reviews, 0) + EXCLUDED.total_reviews,
+            with_media = coalesce(s.with_media, 0) + EXCLUDED.with_media,
+            histogram = product_reviews_histogram_add(s.histogram, EXCLUDED.histogram),
+            average_rating = product_reviews_average(product_reviews_histogram_add(s.histogram, EXCLUDED.histogram)),
+            last_updated = now()
+        RETURNING product_id, total_reviews, average_rating
+    )
+    UPDATE products p
+    SET rating = summary.average_rating, reviews = summary.total_reviews
+    FROM summary
+    WHERE p.id = summary.product_id
+      AND (p.rating, p.reviews) IS DISTINCT FROM (summary.average_rating, summary.total_reviews)
+$fn$;
+
+CREATE OR REPLACE FUNCTION product_reviews_summary_refresh() RETURNS trigger LANGUAGE plpgsql AS $fn$
+DECLARE
+    product_ids uuid[];
+    ratings integer[];
+    media boolean[];
+    signs integer[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(product_id), array_agg(rating), array_agg(coalesce(cardinality(images), 0) > 0), array_agg(1)
+        INTO product_ids, ratings, media, signs
+        FROM new_rows WHERE status = 'published';
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(product_id), array_agg(rating), array_agg(coalesce(cardinality(images), 0) > 0), array_agg(-1)
+        INTO product_ids, ratings, media, signs
+        FROM old_rows WHERE status = 'published';
+    ELSE
+        SELECT array_agg(product_id), array_agg(rating), array_agg(coalesce(cardinality(images), 0) > 0), array_agg(sign)
+        INTO product_ids, ratings, media, signs
+        FROM (
+            SELECT product_id, rating, images, 1 AS sign FROM new_rows WHERE status = 'published'
+            UNION ALL
+            SELECT product_id, rating, images, -1 FROM old_rows WHERE status = 'published'
+        ) changed;
+    END IF;
+    IF product_ids IS NOT NULL THEN
+        PERFORM product_reviews_summary_apply(product_ids, ratings, media, signs);
+    END IF;
+    RETURN NULL;
+END
+$fn$;
+
+DROP TRIGGER IF EXISTS product_reviews_summary_insert ON product_reviews;
+CREATE TRIGGER product_reviews_summary_insert
+    AFTER INSERT ON product_reviews REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION product_reviews_summary_refresh();
+DROP TRIGGER IF EXISTS product_reviews_summary_update ON product_reviews;
+CREATE TRIGGER product_reviews_summary_update
+    AFTER UPDATE ON product_reviews REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION product_reviews_summary_refresh();
+DROP TRIGGER IF EXISTS product_reviews_summary_delete ON product_reviews;
+CREATE TRIGGER product_reviews_summary_delete
+    AFTER DELETE ON product_reviews REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION product_reviews_summary_refresh();
+
+-- One-off rebuild so the deltas start from the true totals.
+WITH counted AS (
+    SELECT product_id,
+           count(*)::integer AS total,
+           (count(*) FILTER (WHERE coalesce(cardinality(images), 0) > 0))::integer AS with_media,
+           ARRAY[count(*) FILTER (WHERE rating = 1), count(*) FILTER (WHERE rating = 2),
+                 count(*) FILTER (WHERE rating = 3), count(*) FILTER (WHERE rating = 4),
+                 count(*) FILTER (WHERE rating = 5)]::integer[] AS histogram
+    FROM product_reviews r
+    WHERE status = 'published' AND EXISTS (SELECT 1 FROM products p WHERE p.id = r.product_id)
+    GROUP BY product_id
+)
+INSERT INTO product_reviews_summary AS s
+    (product_id, total_reviews, with_media, histogram, average_rating, last_updated)
+SELECT product_id, total, with_media, histogram, product_reviews_average(histogram), now()
+FROM counted
+ON CONFLICT (product_id) DO UPDATE SET
+    total_reviews = EXCLUDED.total_reviews, with_media = EXCLUDED.with_media,
+    histogram = EXCLUDED.histogram, average_rating = EXCLUDED.average_rating,
+    last_updated = EXCLUDED.last_updated;
+
+UPDATE product_reviews_summary s
+SET total_reviews = 0, with_media = 0, histogram = ARRAY[0, 0, 0, 0, 0], average_rating = 0, last_updated = now()
+WHERE NOT EXISTS (SELECT 1 FROM product_reviews r WHERE r.product_id = s.product_id AND r.status = 'published')
+  AND (s.total_reviews, s.with_media, s.average_rating) IS DISTINCT FROM (0, 0, 0);
+
+UPDATE products p
+SET rating = coalesce(s.average_rating, 0), reviews = coalesce(s.total_reviews, 0)
+FROM products p2 LEFT JOIN product_reviews_summary s ON s.product_id = p2.id
+WHERE p.id = p2.id
+  AND (p.rating, p.reviews) IS DISTINCT FROM (coalesce(s.average_rating, 0), coalesce(s.total_reviews, 0));
+"""
+
+REVERSE_SQL = """
+DROP TRIGGER IF EXISTS product_reviews_summary_insert ON product_reviews;
+DROP TRIGGER IF EXISTS product_reviews_summary_update ON product_reviews;
+DROP TRIGGER IF EXISTS product_reviews_summary_delete ON product_reviews;
+DROP FUNCTION IF EXISTS product_reviews_summary_refresh();
+DROP FUNCTION IF EXISTS product_reviews_summary_apply(uuid[], integer[], boolean[], integer[]);
+DROP FUNCTION IF EXISTS product_reviews_average(integer[]);
+DROP FUNCTION IF EXISTS product_reviews_histogram_add(integer[], integer[]);
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD_SQL, params=None)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(REVERSE_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_views'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
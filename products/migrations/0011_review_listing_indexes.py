@@ -0,0 +1,51 @@
+"""
+Indexes for the keyset-paginated review listing (/api/products/{id}/reviews/).
+
+One index per sort key, each ``(product_id, <key>, id)`` so a page is a
+range scan whichever way it is walked, plus one for the ``rating`` filter
+under the default newest-first sort and one for the ``has_media`` filter
+(matched through its ``cardinality(images) > 0`` predicate).  All are
+partial on published reviews and built CONCURRENTLY, so the migration is
+non-atomic.
+"""
+from django.db import migrations
+
+from besmart_backend.db.indexes import create_index_concurrently
+
+PUBLISHED = "WHERE status = 'published'"
+
+INDEXES = {
+    'product_reviews_created_idx': f'ON product_reviews (product_id, created_at, id) {PUBLISHED}',
+    'product_reviews_rating_idx': f'ON product_reviews (product_id, rating, id) {PUBLISHED}',
+    'product_reviews_helpful_idx': f'ON product_reviews (product_id, helpful_count, id) {PUBLISHED}',
+    'product_reviews_rating_created_idx': f'ON product_reviews (product_id, rating, created_at, id) {PUBLISHED}',
+    'product_reviews_media_created_idx': (
+        f'ON product_reviews (product_id, created_at, id) {PUBLISHED} AND cardinality(images) > 0'
+    ),
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, definition in INDEXES.items():
+        create_index_concurrently(schema_editor, name, definition)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('products', '0010_maintain_review_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
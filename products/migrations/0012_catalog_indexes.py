@@ -0,0 +1,61 @@
+"""
+Indexes for the catalog's hot product queries.
+
+Every catalog query filters ``status = 'active' AND approval_status =
+'approved'``, so every index here is partial on that predicate and only
+covers live products.  Each is matched to an access path:
+
+- list sort keys (ProductCursorPagination): ``(added_date, id)``,
+  ``(price, id)`` and ``(rating, id)``; price range filters use the price one;
+- category and vendor listings: ``(category_id|vendor_id, added_date, id)``;
+- featured / new-arrival / on-sale shelves: ``(added_date, id)`` narrowed
+  further by the shelf flag;
+- top-rated in-stock products of a category (recommendation fallback):
+  ``(category_id, rating) WHERE in_stock``.
+
+The keyset pages walk these in either direction, so they are ascending.
+All are built CONCURRENTLY, so the migration is non-atomic.
+"""
+from django.db import migrations
+
+from besmart_backend.db.indexes import create_index_concurrently
+
+LIVE = "WHERE status = 'active' AND approval_status = 'approved'"
+
+INDEXES = {
+    'products_live_added_idx': f'ON products (added_date, id) {LIVE}',
+    'products_live_price_idx': f'ON products (price, id) {LIVE}',
+    'products_live_rating_idx': f'ON products (rating, id) {LIVE}',
+    'products_live_category_added_idx': f'ON products (category_id, added_date, id) {LIVE}',
+    'products_live_vendor_added_idx': f'ON products (vendor_id, added_date, id) {LIVE}',
+    'products_featured_added_idx': f'ON products (added_date, id) {LIVE} AND is_featured',
+    'products_new_arrival_added_idx': f'ON products (added_date, id) {LIVE} AND is_new_arrival',
+    'products_on_sale_added_idx': f'ON products (added_date, id) {LIVE} AND is_on_sale',
+    'products_in_stock_category_rating_idx': f'ON products (category_id, rating) {LIVE} AND in_stock',
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, definition in INDEXES.items():
+        create_index_concurrently(schema_editor, name, definition)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('products', '0011_review_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
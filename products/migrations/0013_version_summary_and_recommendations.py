@@ -0,0 +1,42 @@
+"""
+Bump ``product_content_versions`` on writes to product_reviews_summary and
+product_recommendations too, so the cached /full/ page picks up new review
+summaries (written by the migration 0010 triggers) and rebuilt
+recommendation lists instead of serving them for up to
+PRODUCT_PAGE_CACHE_TTL.  Same row-level trigger function as migration 0008.
+"""
+from django.db import migrations
+
+TABLES = ('product_reviews_summary', 'product_recommendations')
+
+FORWARD_SQL = ''.join(f"""
+DROP TRIGGER IF EXISTS {table}_content_version ON {table};
+CREATE TRIGGER {table}_content_version
+    AFTER INSERT OR UPDATE OR DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION bump_product_content_version();
+""" for table in TABLES)
+
+REVERSE_SQL = ''.join(
+    f'DROP TRIGGER IF EXISTS {table}_content_version ON {table};\n' for table in TABLES
+)
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD_SQL, params=None)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(REVERSE_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
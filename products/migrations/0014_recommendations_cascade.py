@@ -0,0 +1,44 @@
+"""
+Make the product_recommendations product foreign key ON DELETE CASCADE.
+
+``manage.py build_recommendations`` writes a row for every live product,
+and Django does not know about the table when it deletes a product, so
+product deletes (``seed_catalog --flush`` among them) failed on the
+constraint.  Same constraint swap as migration 0010 does for
+product_reviews_summary.
+"""
+from django.db import migrations
+
+
+FORWARD_SQL = """
+DO $$
+DECLARE
+    fk record;
+BEGIN
+    FOR fk IN
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = 'product_recommendations'::regclass AND contype = 'f'
+          AND confrelid = 'products'::regclass AND confdeltype <> 'c'
+    LOOP
+        EXECUTE format('ALTER TABLE product_recommendations DROP CONSTRAINT %I', fk.conname);
+        ALTER TABLE product_recommendations ADD FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE;
+    END LOOP;
+END $$;
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_version_summary_and_recommendations'),
+    ]
+
+    operations = [
+        # The cascade is kept on reverse: the rows it removes reference nothing.
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
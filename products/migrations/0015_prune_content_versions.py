@@ -0,0 +1,32 @@
+"""
+Remove ``product_content_versions`` rows of products that no longer exist.
+
+Product deletes used to bump the deleted product's version, leaving a row
+behind for every deleted product; products.product_page now deletes it
+instead.  There is no foreign key: the side-table triggers bump versions
+while a product delete cascades to product_reviews_summary and
+product_recommendations, and would trip over one.
+"""
+from django.db import migrations
+
+
+FORWARD_SQL = """
+DELETE FROM product_content_versions v
+WHERE NOT EXISTS (SELECT 1 FROM products p WHERE p.id = v.product_id);
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_recommendations_cascade'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
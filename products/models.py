@@ -34,6 +34,10 @@ class Product(models.Model):
     status = models.CharField(max_length=20, default='active')
     colors = models.JSONField(default=dict) # Should be valid JSON
     
+    # Home feed shelf flags (products.home_feed).  Their values as loaded
+    # are kept so a save can tell whether the shelves changed.
+    SHELF_FLAGS = ('is_featured', 'is_new_arrival', 'is_on_sale', 'status', 'approval_status')
+
     class Meta:
         db_table = 'products'
         ordering = ['-added_date']
@@ -41,6 +45,29 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_shelf_flags = instance.shelf_flags()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        loaded = self.shelf_flags()
+        previous = getattr(self, '_loaded_shelf_flags', None)
+        if fields is not None and previous is not None:
+            # Flags that were not reloaded keep their baseline (and any
+            # unsaved edit stays an edit).
+            loaded = tuple(
+                new if name in fields else old
+                for name, new, old in zip(self.SHELF_FLAGS, loaded, previous)
+            )
+        self._loaded_shelf_flags = loaded
+
+    def shelf_flags(self):
+        # __dict__ rather than getattr: deferred fields must not be loaded here.
+        return tuple(self.__dict__.get(name) for name in self.SHELF_FLAGS)
+
 
 class ProductReview(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
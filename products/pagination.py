@@ -0,0 +1,42 @@
+from besmart_backend.pagination import KeysetPagination
+
+
+class ProductCursorPagination(KeysetPagination):
+    """Keyset pagination over (added_date|price|rating, id) for product lists."""
+    ordering = '-added_date'
+    keyset_fields = ('added_date', 'price', 'rating')
+
+
+class ProductReviewCursorPagination(KeysetPagination):
+    """
+    Keyset pagination over (created_at|rating|helpful_count, id) for a
+    product's reviews, sorted by the listing's own ``sort_by`` and
+    ``sort_order`` parameters rather than an OrderingFilter.
+    """
+    max_page_size = 50
+    ordering = '-created_at'
+    keyset_fields = ('created_at', 'rating', 'helpful_count')
+
+    def get_sort_key(self, request, queryset, view):
+        field = request.query_params.get('sort_by', 'created_at')
+        if field not in self.keyset_fields:
+            field = 'created_at'
+        return field, request.query_params.get('sort_order', 'desc') == 'desc'
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': 'sort_by',
+                'required': False,
+                'in': 'query',
+                'description': 'created_at (default), rating or helpful_count.',
+                'schema': {'type': 'string', 'enum': list(self.keyset_fields)},
+            },
+            {
+                'name': 'sort_order',
+                'required': False,
+                'in': 'query',
+                'description': 'desc (default) or asc.',
+                'schema': {'type': 'string', 'enum': ['desc', 'asc']},
+            },
+        ]
@@ -0,0 +1,203 @@
+"""
+Everything the mobile product page shows, in one payload.
+
+``load(product, sections)`` returns the same sections the individual
+/api/products/{id}/<section>/ endpoints serve, keyed by section name.  The
+product itself is serialized with ProductDetailSerializer; every other
+section is built as JSON by Postgres in a single statement (one scalar
+subquery per section), so the page costs two queries however many sections
+are requested.
+
+Differences from the individual endpoints: a missing delivery/warranty row
+is ``null`` instead of a 404, timestamps are in Postgres' ISO-8601 form, and
+recommended products keep the order stored in product_recommendations.
+
+Cached payloads are keyed by the product's content version (``versioned_key``),
+which database triggers bump on every write to that product's side-table
+rows (migrations 0008 and 0013) and ``connect_signals`` bumps on every save or delete
+of the product itself, so an edit retires only that product's entries.
+"""
+import json
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models.signals import post_delete, post_save
+
+from besmart_backend.cache import get_namespace
+
+from .hydration import CARD_COLUMNS
+from .models import Product
+from .serializers import ProductDetailSerializer
+
+PRODUCT_CARD = 'json_build_object({})'.format(', '.join(f"'{col}', rp.{col}" for col in CARD_COLUMNS))
+
+LIVE = "rp.status = 'active' AND rp.approval_status = 'approved'"
+
+BUMP_VERSION_SQL = """
+INSERT INTO product_content_versions AS v (product_id) VALUES (%s)
+ON CONFLICT (product_id) DO UPDATE SET version = v.version + 1, updated_at = now()
+"""
+
+DELETE_VERSION_SQL = 'DELETE FROM product_content_versions WHERE product_id = %s'
+
+
+def _hydrate(column):
+    """Live products for the ids in ``column`` (a uuid[]), in array order."""
+    return f"""(SELECT coalesce(json_agg({PRODUCT_CARD} ORDER BY ids.pos), '[]'::json)
+        FROM unnest(r.{column}) WITH ORDINALITY AS ids(pid, pos)
+        JOIN products rp ON rp.id = ids.pid
+        WHERE {LIVE})"""
+
+
+def _rows(select, order_by='t.sort_order'):
+    return f"(SELECT coalesce(json_agg(t ORDER BY {order_by}), '[]'::json) FROM ({select}) t)"
+
+
+def _row(select):
+    return f'(SELECT row_to_json(t) FROM ({select} LIMIT 1) t)'
+
+
+SECTION_SQL = {
+    'delivery_info': _row("""
+        SELECT id, product_id, return_window_days, cod_eligible, free_delivery,
+               shipping_fee, eta_min_days, eta_max_days, delivery_notes, created_at, updated_at
+        FROM delivery_info WHERE product_id = %(id)s"""),
+    'warranty_info': _row("""
+        SELECT id, product_id, type, duration, description, terms_url,
+               coverage_details, exclusions, created_at, updated_at
+        FROM warranty_info WHERE product_id = %(id)s"""),
+    'offers': _rows("""
+        SELECT id, product_id, type, code, description, expiry_date,
+               icon_url, is_active, sort_order, created_at, updated_at
+        FROM product_offers WHERE product_id = %(id)s AND is_active = true"""),
+    'highlights': _rows("""
+        SELECT id, product_id, label, icon_url, sort_order, created_at
+        FROM product_highlights WHERE product_id = %(id)s"""),
+    'feature_posters': _rows("""
+        SELECT id, product_id, title, subtitle, media_url, aspect_ratio,
+               cta_label, sort_order, is_active, created_at
+        FROM feature_posters WHERE product_id = %(id)s AND is_active = true"""),
+    'specifications': _rows("""
+        SELECT id, product_id, group_name, spec_name, spec_value, sort_order, created_at
+        FROM product_specifications WHERE product_id = %(id)s"""),
+    # Without a precomputed row, fall back to the category's top-rated
+    # products, as ProductRecommendationsView does.
+    'recommendations': f"""coalesce(
+        (SELECT json_build_object(
+            'similar_products', {_hydrate('similar_products')},
+            'from_seller_products', {_hydrate('from_seller_products')},
+            'you_might_also_like', {_hydrate('you_might_also_like')})
+         FROM product_recommendations r WHERE r.product_id = %(id)s LIMIT 1),
+        json_build_object(
+            'similar_products', (SELECT coalesce(json_agg(t.card ORDER BY t.rating DESC), '[]'::json) FROM (
+                SELECT {PRODUCT_CARD} AS card, rp.rating FROM products rp
+                WHERE rp.category_id = %(category_id)s AND rp.id != %(id)s AND {LIVE} AND rp.in_stock = true
+                ORDER BY rp.rating DESC LIMIT 10) t),
+            'from_seller_products', '[]'::json,
+            'you_might_also_like', '[]'::json))""",
+    'reviews_summary': _row("""
+        SELECT id, product_id, with_media, histogram, total_reviews, average_rating, last_updated
+        FROM product_reviews_summary WHERE product_id = %(id)s"""),
+}
+
+SECTIONS = ('product', *SECTION_SQL)
+
+EMPTY_REVIEWS_SUMMARY = {'total_reviews': 0, 'average_rating': 0.0, 'with_media': 0, 'histogram': [0, 0, 0, 0, 0]}
+
+
+def _listing(rows):
+    return {'count': len(rows), 'results': rows}
+
+
+def _specifications(rows):
+    groups = {}
+    for spec in rows:
+        name = spec.get('group_name', 'General')
+        groups.setdefault(name, {'group': name, 'rows': []})['rows'].append({
+            'name': spec.get('spec_name', ''),
+            'value': spec.get('spec_value', ''),
+        })
+    return {'count': len(rows), 'groups': list(groups.values()), 'raw': rows}
+
+
+SHAPES = {
+    'offers': _listing,
+    'highlights': _listing,
+    'feature_posters': _listing,
+    'specifications': _specifications,
+    'reviews_summary': lambda row: row or dict(EMPTY_REVIEWS_SUMMARY),
+}
+
+
+def load(product, sections=SECTIONS) -> dict:
+    """Build the requested ``sections`` for an already fetched ``product``."""
+    data = {}
+    if 'product' in sections:
+        data['product'] = ProductDetailSerializer(product).data
+
+    names = [name for name in SECTION_SQL if name in sections]
+    if names:
+        sql = 'SELECT ' + ',\n'.join(f'{SECTION_SQL[name]} AS {name}' for name in names)
+        with connection.cursor() as c:
+            c.execute(sql, {'id': product.id, 'category_id': product.category_id})
+            row = c.fetchone()
+        for name, value in zip(names, row):
+            if isinstance(value, str):
+                value = json.loads(value)
+            shape = SHAPES.get(name)
+            data[name] = shape(value) if shape else value
+    return data
+
+
+def content_version(product_id) -> int:
+    """Write counter of ``product_id``'s side-table rows, shared by all
+    workers and re-read at most once per CACHE_VERSION_CHECK_INTERVAL."""
+    def fetch():
+        with connection.cursor() as c:
+            c.execute('SELECT version FROM product_content_versions WHERE product_id = %s', [product_id])
+            row = c.fetchone()
+        return row[0] if row else 0
+
+    return _version_tier().get_or_set(str(product_id), fetch)
+
+
+def _version_tier():
+    return get_namespace(
+        'product_content_version', timeout=max(1, int(settings.CACHE_VERSION_CHECK_INTERVAL)),
+    )
+
+
+def bump_content_version(product_id, using=None):
+    """Retire ``product_id``'s cached page and sections, as the side-table
+    triggers do, and forget the memoised version once the write commits."""
+    with connections[using or DEFAULT_DB_ALIAS].cursor() as c:
+        c.execute(BUMP_VERSION_SQL, [product_id])
+    transaction.on_commit(lambda: _version_tier().delete(str(product_id)), using=using)
+
+
+def _on_product_write(sender, instance, using=None, **kwargs):
+    bump_content_version(instance.pk, using)
+
+
+def _on_product_delete(sender, instance, using=None, **kwargs):
+    """Drop the deleted product's version row.  Runs after the DELETE, so it
+    also removes rows the side-table triggers wrote while cascading."""
+    product_id = instance.pk
+    with connections[using or DEFAULT_DB_ALIAS].cursor() as c:
+        c.execute(DELETE_VERSION_SQL, [product_id])
+    transaction.on_commit(lambda: _version_tier().delete(str(product_id)), using=using)
+
+
+def connect_signals():
+    post_save.connect(_on_product_write, sender=Product, dispatch_uid='product_page:save')
+    post_delete.connect(_on_product_delete, sender=Product, dispatch_uid='product_page:delete')
+
+
+def versioned_key(product_id, suffix='') -> str:
+    return f'{product_id}:v{content_version(product_id)}:{suffix}'
+
+
+def cached_section(product_id, section, producer):
+    """Read-through cache for one side-table payload of ``product_id``."""
+    tier = get_namespace('product_content', timeout=settings.PRODUCT_CONTENT_CACHE_TTL)
+    return tier.get_or_set(versioned_key(product_id, section), producer)
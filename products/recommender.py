@@ -0,0 +1,149 @@
+"""
+Offline product recommender behind ``manage.py build_recommendations``.
+
+Affinities come from sparse matrix products over the whole catalog:
+
+- co-purchase: ``B.T @ B`` with B the binary (order x product) matrix of
+  order_items, so cell (i, j) counts the orders that contain both products;
+- co-view: the same over (user x product) pairs from product_views.
+
+Both are normalized to cosine similarity, ``count / sqrt(n_i * n_j)``, so
+best-sellers do not end up next to everything.  Per product:
+
+- ``similar_products``: top N of co-purchase + ``co_view_weight`` * co-view,
+  padded with the best-rated products of the same category;
+- ``you_might_also_like``: top N co-viewed products not already in
+  similar_products, padded the same way;
+- ``from_seller_products``: best-rated other products of the same vendor.
+
+``confidence`` is the mean blended score of the affinity-based entries,
+scaled to 0..1 (0 when similar_products is padding only).
+"""
+from typing import NamedTuple
+
+import numpy as np
+from scipy import sparse
+
+ALGORITHM_VERSION = 'cf-v1'
+CO_VIEW_WEIGHT = 0.5
+
+
+class Catalog(NamedTuple):
+    ids: list                 # product ids; row/column order of every matrix
+    vendors: np.ndarray       # int codes, -1 for none
+    categories: np.ndarray    # int codes, -1 for none
+    ratings: np.ndarray
+    reviews: np.ndarray
+
+
+class Recommendation(NamedTuple):
+    similar_products: list
+    from_seller_products: list
+    you_might_also_like: list
+    confidence: float
+
+
+def incidence(groups, items, n_items):
+    """Binary (group x item) CSR matrix from parallel code arrays."""
+    groups = np.asarray(groups, dtype=np.int64)
+    items = np.asarray(items, dtype=np.int64)
+    n_groups = int(groups.max()) + 1 if len(groups) else 0
+    matrix = sparse.csr_matrix(
+        (np.ones(len(items), dtype=np.float64), (groups, items)), shape=(n_groups, n_items),
+    )
+    matrix.data[:] = 1.0  # repeated (group, item) pairs were summed
+    return matrix
+
+
+def cosine_cooccurrence(matrix):
+    """Item x item cosine similarity of co-occurrence, without the diagonal."""
+    co = (matrix.T @ matrix).tocsr()
+    counts = co.diagonal()
+    co = (co - sparse.diags(counts)).tocsr()
+    co.eliminate_zeros()
+    scale = np.zeros_like(counts)
+    np.divide(1.0, np.sqrt(counts), out=scale, where=counts > 0)
+    norm = sparse.diags(scale)
+    return (norm @ co @ norm).tocsr()
+
+
+def top_n(matrix, n):
+    """Per row, (column indexes, scores) of the ``n`` largest entries, best first."""
+    indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+    rows = []
+    for r in range(matrix.shape[0]):
+        cols, scores = indices[indptr[r]:indptr[r + 1]], data[indptr[r]:indptr[r + 1]]
+        if len(cols) > n:
+            keep = np.argpartition(-scores, n)[:n]
+            cols, scores = cols[keep], scores[keep]
+        order = np.lexsort((cols, -scores))
+        rows.append((cols[order], scores[order]))
+    return rows
+
+
+def ranked_members(groups, catalog, limit):
+    """``{group code: item indexes}``, best-rated (then most reviewed) first."""
+    order = np.lexsort((np.arange(len(groups)), -catalog.reviews, -catalog.ratings, groups))
+    bounds = np.flatnonzero(np.diff(groups[order])) + 1
+    members = {}
+    for chunk in np.split(order, bounds):
+        if len(chunk) and groups[chunk[0]] >= 0:
+            members[int(groups[chunk[0]])] = chunk[:limit]
+    return members
+
+
+def _fill(items, candidates, exclude, n):
+    for c in candidates:
+        if len(items) >= n:
+            break
+        c = int(c)
+        if c not in exclude:
+            items.append(c)
+            exclude.add(c)
+    return items
+
+
+def recommend(catalog, purchases, views, n=10, co_view_weight=CO_VIEW_WEIGHT):
+    """
+    Recommendations for every catalog product, in catalog order.
+
+    ``purchases`` and ``views`` are (group codes, item indexes) array pairs:
+    order and user codes against catalog positions.  Returns the list of
+    Recommendation (product ids as strings) and a dict of statistics.
+    """
+    size = len(catalog.ids)
+    co_purchase = cosine_cooccurrence(incidence(*purchases, size))
+    co_view = cosine_cooccurrence(incidence(*views, size))
+    blended = (co_purchase + co_view_weight * co_view).tocsr()
+
+    similar_top = top_n(blended, n)
+    viewed_top = top_n(co_view, 2 * n)
+    by_category = ranked_members(catalog.categories, catalog, 3 * n + 1)
+    by_vendor = ranked_members(catalog.vendors, catalog, n + 1)
+
+    ids = catalog.ids
+    results, covered = [], 0
+    for i in range(size):
+        cols, scores = similar_top[i]
+        similar = [int(c) for c in cols]
+        covered += bool(similar)
+        confidence = round(float(scores.mean()) / (1 + co_view_weight), 4) if len(scores) else 0.0
+        category = by_category.get(int(catalog.categories[i]), ())
+        taken = {i, *similar}
+        _fill(similar, category, taken, n)
+        also = _fill([], viewed_top[i][0], taken, n)
+        _fill(also, category, taken, n)
+        seller = [int(c) for c in by_vendor.get(int(catalog.vendors[i]), ()) if c != i][:n]
+        results.append(Recommendation(
+            [ids[c] for c in similar], [ids[c] for c in seller], [ids[c] for c in also], confidence,
+        ))
+
+    stats = {
+        'products': size,
+        'co_purchase_pairs': co_purchase.nnz // 2,
+        'co_view_pairs': co_view.nnz // 2,
+        'with_affinities': covered,
+        'with_similar': sum(1 for r in results if r.similar_products),
+        'with_seller': sum(1 for r in results if r.from_seller_products),
+    }
+    return results, stats
@@ -1,3 +1,1165 @@
-from django.test import TestCase
+import json
+import re
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_init
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from besmart_backend.cache import clear_local_caches, get_namespace
+from besmart_backend.query_budgets import QueryBudgetTestCase, build_fixture
+from categories.models import Category
+from orders.models import Order, OrderItem, ShippingAddress
+from users.models import User
+from vendors.models import Vendor
+
+from . import home_feed, hydration, product_page, typeahead, view_tracking
+from .models import Product, ProductReview
+from .serializers import ProductListSerializer, field_plan
+
+
+class ProductQueryBudgetTests(QueryBudgetTestCase):
+    app = 'products'
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class ProductCursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        base = timezone.now()
+        # Few distinct prices/ratings and one shared timestamp per pair so
+        # every sort key has ties the id tiebreaker has to resolve.
+        Product.objects.bulk_create(
+            Product(
+                name=f'Keyset {i}', price=Decimal(10 + i % 3), rating=Decimal(i % 5),
+                sku=f'KEYSET-{i}', is_featured=i % 2 == 0,
+            )
+            for i in range(23)
+        )
+        for i, product in enumerate(Product.objects.order_by('sku')):
+            Product.objects.filter(pk=product.pk).update(added_date=base - timedelta(minutes=i // 2))
+        Product.objects.create(name='Hidden', price=1, sku='KEYSET-hidden', approval_status='pending')
+
+    def setUp(self):
+        cache.clear()
+        clear_local_caches()
+
+    def _walk(self, url, direction='next'):
+        seen = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen.extend(p['id'] for p in response.data['results'])
+            url = response.data[direction]
+            pages += 1
+        return seen, pages
+
+    def test_walks_every_ordering_without_gaps_or_duplicates(self):
+        visible = Product.objects.filter(status='active', approval_status='approved')
+        for ordering in ('-added_date', 'added_date', 'price', '-price', 'rating', '-rating'):
+            with self.subTest(ordering=ordering):
+                ids, pages = self._walk(f'/api/products/?ordering={ordering}&page_size=5')
+                field = ordering.lstrip('-')
+                prefix = '-' if ordering.startswith('-') else ''
+                expected = [str(pk) for pk in visible.order_by(ordering, f'{prefix}id').values_list('id', flat=True)]
+                self.assertEqual(ids, expected, field)
+                self.assertEqual(pages, 5)
+
+    def test_previous_links_walk_back_to_the_first_page(self):
+        url = '/api/products/?ordering=price&page_size=4'
+        first = self.client.get(url).data
+        second = self.client.get(first['next']).data
+        third = self.client.get(second['next']).data
+        back = self.client.get(third['previous']).data
+        self.assertEqual(back['results'], second['results'])
+        back = self.client.get(back['previous']).data
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['previous'])
+
+    def test_null_keys_page_in_database_order(self):
+        # The Supabase columns are nullable even where the model says otherwise.
+        with connection.cursor() as c:
+            c.execute('ALTER TABLE products ALTER COLUMN rating DROP NOT NULL')
+        Product.objects.filter(sku__in=['KEYSET-1', 'KEYSET-4', 'KEYSET-9', 'KEYSET-16']).update(rating=None)
+        visible = Product.objects.filter(status='active', approval_status='approved')
+        for ordering in ('rating', '-rating'):
+            prefix = '-' if ordering.startswith('-') else ''
+            expected = [str(pk) for pk in visible.order_by(ordering, f'{prefix}id').values_list('id', flat=True)]
+            for page_size in (2, 3, 5):
+                with self.subTest(ordering=ordering, page_size=page_size):
+                    url = f'/api/products/?ordering={ordering}&page_size={page_size}'
+                    ids, _ = self._walk(url)
+                    self.assertEqual(ids, expected)
+
+                    page = self.client.get(url).data
+                    while page['next']:
+                        page = self.client.get(page['next']).data
+                    pages = [page['results']]
+                    while page['previous']:
+                        page = self.client.get(page['previous']).data
+                        pages.insert(0, page['results'])
+                    self.assertEqual([p['id'] for results in pages for p in results], expected)
+
+    def test_filters_still_apply(self):
+        ids, _ = self._walk('/api/products/?is_featured=true&ordering=-rating&page_size=3')
+        self.assertEqual(len(ids), 12)
+        featured, _ = self._walk('/api/products/featured/?page_size=5')
+        self.assertEqual(sorted(featured), sorted(ids))
+
+    def test_page_size_is_capped(self):
+        response = self.client.get('/api/products/?page_size=100000')
+        self.assertEqual(len(response.data['results']), 23)
+        response = self.client.get('/api/products/?page_size=0')
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_bad_cursors_are_rejected(self):
+        next_url = self.client.get('/api/products/?ordering=price&page_size=5').data['next']
+        cursor = next_url.split('cursor=')[1].split('&')[0]
+        self.assertEqual(self.client.get(f'/api/products/?ordering=rating&cursor={cursor}').status_code, 404)
+        self.assertEqual(self.client.get('/api/products/?cursor=not-a-cursor').status_code, 404)
+
+    def test_unsupported_ordering_falls_back_to_added_date(self):
+        response = self.client.get('/api/products/?ordering=orders_count&page_size=50')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 23)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class FullTextSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def make(name, description, brand='Acme', **kwargs):
+            return Product.objects.create(name=name, description=description, brand=brand, price=10, **kwargs)
+
+        cls.headphones = make('Wireless headphones', 'Wireless over-ear headphones with wireless charging case')
+        cls.speaker = make('Bluetooth speaker', 'Portable wireless speaker')
+        cls.cable = make('USB cable', 'Braided charging cable', sku='CABLE-01')
+        make('Wireless mouse', 'Quiet mouse', approval_status='pending')
+        for i in range(7):
+            make(f'Wireless earbuds {i}', 'Earbuds')
+
+    def _ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [p['id'] for p in response.data['results']]
+
+    def test_prefix_matches_partial_words(self):
+        ids = self._ids('/api/products/?search=wirel head')
+        self.assertEqual(ids, [str(self.headphones.id)])
+
+    def test_results_are_ranked_by_relevance(self):
+        ids = self._ids('/api/products/?search=wireless&page_size=50')
+        self.assertEqual(len(ids), 9)
+        self.assertEqual(ids[0], str(self.headphones.id))
+
+    def test_rank_ordered_pages_do_not_overlap(self):
+        seen, url = [], '/api/products/?search=wireless&page_size=2'
+        while url:
+            response = self.client.get(url)
+            seen.extend(p['id'] for p in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 9)
+        self.assertEqual(len(set(seen)), 9)
+
+    def test_explicit_ordering_overrides_rank(self):
+        ids = self._ids('/api/products/?search=wireless&ordering=added_date&page_size=50')
+        self.assertEqual(ids[:2], [str(self.headphones.id), str(self.speaker.id)])
+
+    def test_exact_sku_matches(self):
+        self.assertEqual(self._ids('/api/products/?search=CABLE-01'), [str(self.cable.id)])
+
+    def test_search_endpoint_uses_full_text(self):
+        ids = self._ids('/api/products/search/?search=charging')
+        self.assertEqual(set(ids), {str(self.headphones.id), str(self.cable.id)})
+
+    def test_stopword_only_search_falls_back_to_substring_match(self):
+        # 'with' and 'what is' compile to an empty tsquery.
+        self.assertEqual(self._ids('/api/products/?search=with'), [str(self.headphones.id)])
+        self.assertEqual(self._ids('/api/products/search/?search=with'), [str(self.headphones.id)])
+        self.assertEqual(self._ids('/api/products/?search=what is'), [])
+
+    def test_punctuation_only_search_returns_everything(self):
+        self.assertEqual(len(self._ids('/api/products/?search=%26%7C!&page_size=50')), 10)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class SearchVectorMaintenanceTests(TestCase):
+    def _search(self, text):
+        response = self.client.get('/api/products/', {'search': text, 'page_size': 50})
+        return [p['id'] for p in response.data['results']]
+
+    def test_vector_follows_edits(self):
+        product = Product.objects.create(name='Canvas tote', description='Bag', brand='Acme', price=5)
+        product.name = 'Leather satchel'
+        product.save()
+        self.assertEqual(self._search('satchel'), [str(product.id)])
+        self.assertEqual(self._search('tote'), [])
+
+    def test_null_parts_do_not_blank_the_document(self):
+        product = Product.objects.create(name='Ceramic mug', description=None, brand=None, price=5)
+        self.assertEqual(self._search('mug'), [str(product.id)])
+
+    def test_name_outranks_brand_outranks_description_outranks_tags(self):
+        by_name = Product.objects.create(name='Lantern', description='Light', brand='Acme', price=5)
+        by_brand = Product.objects.create(name='Torch', description='Light', brand='Lantern Co', price=5)
+        by_description = Product.objects.create(name='Lamp', description='A lantern style lamp', brand='Acme', price=5)
+        by_tag = Product.objects.create(name='Candle', description='Wax', brand='Acme', price=5)
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE products SET tags = ARRAY['lantern'] WHERE id = %s", [by_tag.id])
+        self.assertEqual(
+            self._search('lantern'),
+            [str(p.id) for p in (by_name, by_brand, by_description, by_tag)],
+        )
+
+    def test_rebuild_command_fills_missing_vectors(self):
+        products = [
+            Product.objects.create(name=f'Kettle {i}', description='Steel', brand='Acme', price=5, sku=f'KETTLE-{i}')
+            for i in range(5)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute('ALTER TABLE products DISABLE TRIGGER products_search_vector_refresh')
+            cursor.execute('UPDATE products SET search_vector = NULL')
+            cursor.execute('ALTER TABLE products ENABLE TRIGGER products_search_vector_refresh')
+        self.assertEqual(self._search('kettle'), [])
+
+        out = StringIO()
+        call_command('rebuild_search_vectors', '--batch-size', '2', '--missing-only', stdout=out)
+        self.assertIn('for 5 products', out.getvalue())
+        self.assertEqual(len(self._search('kettle')), len(products))
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class TypeaheadTests(TestCase):
+    url = '/api/products/typeahead/'
+
+    @classmethod
+    def setUpTestData(cls):
+        for i, (name, brand) in enumerate([
+            ('Wireless headphones', 'Sonix'), ('Wireless mouse', 'Sonix'),
+            ('Wired keyboard', 'Keyco'), ('Headphone stand', 'Sonix'), ('50%_off sticker', None),
+        ]):
+            Product.objects.create(name=name, brand=brand, price=10, sku=f'TA-{i}')
+        Product.objects.create(name='Wireless charger', brand='Sonix', price=10, approval_status='pending')
+        Vendor.objects.create(business_name='Sonix Official', business_email='s@example.com', status='approved')
+        Vendor.objects.create(business_name='Sonic Clone', business_email='c@example.com', status='pending')
+
+    def setUp(self):
+        cache.clear()
+        clear_local_caches()
+
+    def _get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_prefix_matches_each_section(self):
+        data = self._get(q='  SONI ')
+        self.assertEqual(data['query'], 'soni')
+        self.assertEqual([b['name'] for b in data['brands']], ['Sonix'])
+        self.assertEqual([v['name'] for v in data['vendors']], ['Sonix Official'])
+        self.assertEqual(data['products'], [])
+
+        data = self._get(q='wire')
+        self.assertEqual([p['name'] for p in data['products']], ['Wired keyboard', 'Wireless headphones', 'Wireless mouse'])
+
+    def test_limit_and_min_length(self):
+        self.assertEqual(len(self._get(q='wire', limit=1)['products']), 1)
+        self.assertEqual(self._get(q='w')['products'], [])
+        self.assertEqual(self.client.get(self.url, {'q': 'wire', 'limit': 'x'}).status_code, 400)
+
+    def test_like_wildcards_are_literal(self):
+        self.assertEqual([p['name'] for p in self._get(q='50%_')['products']], ['50%_off sticker'])
+        self.assertEqual(self._get(q='5_')['products'], [])
+
+    def test_hot_prefixes_are_served_from_cache(self):
+        self._get(q='wire')
+        with self.assertNumQueries(0):
+            self._get(q='WIRE')
+
+    def test_misspellings_match_with_trigrams(self):
+        if not typeahead.trigram_available():
+            self.skipTest('pg_trgm is not installed')
+        data = self._get(q='wirles hedphones')
+        self.assertEqual(data['products'][0]['name'], 'Wireless headphones')
+        self.assertLess(data['products'][0]['score'], 1.0)
+
+
+def _normalized(value):
+    """Parse timestamps so Python and Postgres ISO-8601 spellings compare equal."""
+    if isinstance(value, dict):
+        return {k: _normalized(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalized(v) for v in value]
+    if isinstance(value, str):
+        return parse_datetime(value) or value
+    return value
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class ProductPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product_id = build_fixture()['product']['id']
+        cls.url = f'/api/products/{cls.product_id}/full/'
+
+    def setUp(self):
+        cache.clear()
+        clear_local_caches()
+
+    def _get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_sections_match_the_individual_endpoints(self):
+        page = self._get(self.url)
+        self.assertEqual(list(page), list(product_page.SECTIONS))
+        endpoints = {
+            'product': '', 'delivery_info': 'delivery-info/', 'warranty_info': 'warranty-info/',
+            'offers': 'offers/', 'highlights': 'highlights/', 'feature_posters': 'feature-posters/',
+            'specifications': 'specifications/', 'reviews_summary': 'reviews-summary/',
+            'recommendations': 'recommendations/',
+        }
+        for section, path in endpoints.items():
+            with self.subTest(section=section):
+                expected = self._get(f'/api/products/{self.product_id}/{path}')
+                self.assertEqual(_normalized(page[section]), _normalized(expected))
+        self.assertEqual(page['offers']['count'], 5)
+        self.assertEqual([g['group'] for g in page['specifications']['groups']], ['Build', 'General'])
+
+
+    def test_recommendations_keep_stored_order(self):
+        with connection.cursor() as c:
+            c.execute('SELECT from_seller_products FROM product_recommendations WHERE product_id = %s',
+                      [self.product_id])
+            stored = [str(pk) for pk in c.fetchone()[0]]
+        page = self._get(self.url + '?include=recommendations')
+        self.assertEqual([p['id'] for p in page['recommendations']['from_seller_products']], stored)
+
+    def test_include_selects_sections(self):
+        page = self._get(self.url + '?include=product, offers')
+        self.assertEqual(list(page), ['product', 'offers'])
+        response = self.client.get(self.url + '?include=offers,nope')
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_is_built_in_three_queries_and_then_cached(self):
+        # Content version, product row, every other section.
+        with CaptureQueriesContext(connection) as ctx:
+            self._get(self.url)
+        self.assertEqual(len(ctx.captured_queries), 3)
+        with CaptureQueriesContext(connection) as ctx:
+            self._get(self.url + '?include=highlights')
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_product_saves_invalidate_only_their_page(self):
+        self._get(self.url)
+        other = Product.objects.create(name='Other', price=10, sku='PAGE-other')
+        other_url = f'/api/products/{other.id}/full/'
+        self._get(other_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.get(id=self.product_id)
+            product.price = 99
+            product.save()
+        with CaptureQueriesContext(connection) as ctx:
+            page = self._get(self.url)
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertEqual(page['product']['price'], '99.00')
+        with self.assertNumQueries(0):
+            self._get(other_url)
+
+    def test_deleted_products_are_404(self):
+        product = Product.objects.create(name='Gone', price=10, sku='PAGE-gone')
+        url = f'/api/products/{product.id}/full/'
+        self._get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_missing_sections_are_empty(self):
+        product = Product.objects.create(name='Bare', price=10, sku='PAGE-bare')
+        page = self._get(f'/api/products/{product.id}/full/')
+        self.assertIsNone(page['delivery_info'])
+        self.assertEqual(page['offers'], {'count': 0, 'results': []})
+        self.assertEqual(page['reviews_summary'], product_page.EMPTY_REVIEWS_SUMMARY)
+
+    def test_unknown_and_unapproved_products_are_404(self):
+        hidden = Product.objects.create(name='Hidden', price=10, sku='PAGE-hidden', approval_status='pending')
+        self.assertEqual(self.client.get(f'/api/products/{hidden.id}/full/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/products/{uuid.uuid4()}/full/').status_code, 404)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class ProductContentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Cached', price=10, sku='CONTENT-1')
+        cls.other = Product.objects.create(name='Other', price=10, sku='CONTENT-2')
+        with connection.cursor() as c:
+            for product in (cls.product, cls.other):
+                c.execute("INSERT INTO product_highlights (product_id, label) VALUES (%s, 'Light')", [product.id])
+
+    def setUp(self):
+        cache.clear()
+        clear_local_caches()
+
+    def _version(self, product):
+        with connection.cursor() as c:
+            c.execute('SELECT version FROM product_content_versions WHERE product_id = %s', [product.id])
+            row = c.fetchone()
+        return row[0] if row else 0
+
+    def _highlights(self, product, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(f'/api/products/{product.id}/highlights/')
+        return [h['label'] for h in response.json()['results']]
+
+    def test_review_summaries_and_recommendations_bump_the_version(self):
+        user = User.objects.create(email='content@example.com', username='content@example.com')
+        before = self._version(self.product)
+        ProductReview.objects.create(product=self.product, user=user, rating=4)
+        self.assertGreater(self._version(self.product), before)
+
+        before, other = self._version(self.product), self._version(self.other)
+        with connection.cursor() as c:
+            c.execute('INSERT INTO product_recommendations (product_id, similar_products) VALUES (%s, %s)',
+                      [self.product.id, [self.other.id]])
+        self.assertGreater(self._version(self.product), before)
+        self.assertEqual(self._version(self.other), other)
+
+    def test_hot_sections_are_served_from_memory(self):
+        self.assertEqual(self._highlights(self.product, 3), ['Light'])
+        self.assertEqual(self._highlights(self.product, 0), ['Light'])
+
+    def test_writes_retire_only_that_products_entries(self):
+        self._highlights(self.product, 3)
+        self._highlights(self.other, 3)
+        with connection.cursor() as c:
+            c.execute("INSERT INTO product_highlights (product_id, label, sort_order) VALUES (%s, 'New', 1)",
+                      [self.product.id])
+        # Skip the CACHE_VERSION_CHECK_INTERVAL wait for the new version.
+        get_namespace('product_content_version').invalidate()
+
+        self.assertEqual(self._highlights(self.product, 3), ['Light', 'New'])
+        self.assertEqual(self._highlights(self.other, 1), ['Light'])
+
+    def test_every_write_bumps_the_version(self):
+        before = self._version(self.product)
+        with connection.cursor() as c:
+            c.execute("INSERT INTO delivery_info (product_id) VALUES (%s)", [self.product.id])
+            c.execute("UPDATE delivery_info SET free_delivery = true WHERE product_id = %s", [self.product.id])
+            c.execute("DELETE FROM delivery_info WHERE product_id = %s", [self.product.id])
+        self.assertEqual(self._version(self.product), before + 3)
+
+        other_before = self._version(self.other)
+        with connection.cursor() as c:
+            c.execute("UPDATE product_highlights SET product_id = %s WHERE product_id = %s",
+                      [self.other.id, self.product.id])
+        self.assertEqual(self._version(self.product), before + 4)
+        self.assertEqual(self._version(self.other), other_before + 1)
+
+    def test_deleting_a_product_drops_its_version_row(self):
+        product = Product.objects.create(name='Gone', price=10, sku='CONTENT-3')
+        with connection.cursor() as c:
+            c.execute('INSERT INTO product_recommendations (product_id, similar_products) VALUES (%s, %s)',
+                      [product.id, [self.other.id]])
+        self.assertGreater(self._version(product), 0)
+        product_id = product.id
+        product.delete()
+        with connection.cursor() as c:
+            c.execute('SELECT count(*) FROM product_content_versions WHERE product_id = %s', [product_id])
+            self.assertEqual(c.fetchone()[0], 0)
+
+    def test_missing_rows_are_cached_as_404(self):
+        url = f'/api/products/{self.product.id}/warranty-info/'
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(
+    ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False,
+    VIEW_TRACKING_FLUSH_INTERVAL=0, VIEW_TRACKING_BATCH_SIZE=3, VIEW_TRACKING_BUFFER_SIZE=5,
+)
+class ViewTrackingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Viewed', price=10, sku='VIEW-1')
+
+    def setUp(self):
+        self.buffer = view_tracking.ViewBuffer()
+        original, view_tracking.buffer = view_tracking.buffer, self.buffer
+        self.addCleanup(setattr, view_tracking, 'buffer', original)
+
+    def _view(self, product_id):
+        return self.client.post(f'/api/products/{product_id}/view/').status_code
+
+    def _stored(self):
+        with connection.cursor() as c:
+            c.execute('SELECT count(*) FROM product_views WHERE product_id = %s', [self.product.id])
+            return c.fetchone()[0]
+
+    def test_views_are_buffered_then_written_in_one_batch(self):
+        self.assertEqual(self._view(self.product.id), 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._view(self.product.id), 200)
+        self.assertEqual(self._stored(), 0)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self._view(self.product.id), 200)
+        self.assertEqual(self._stored(), 3)
+        stats = self.buffer.stats()
+        self.assertEqual((stats['written'], stats['batches'], stats['buffered']), (3, 1, 0))
+
+    def test_unknown_products_are_rejected_and_remembered(self):
+        hidden = Product.objects.create(name='Hidden', price=10, sku='VIEW-2', approval_status='pending')
+        self.assertEqual(self._view(hidden.id), 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._view(hidden.id), 404)
+        self.assertEqual(self.buffer.stats()['rejected'], 2)
+
+    def test_products_published_after_the_id_load_are_accepted(self):
+        self._view(self.product.id)
+        fresh = Product.objects.create(name='Fresh', price=10, sku='VIEW-3')
+        with self.assertNumQueries(1):
+            self.assertEqual(self._view(fresh.id), 200)
+
+    @override_settings(VIEW_TRACKING_BATCH_SIZE=100)
+    def test_a_full_buffer_drops_instead_of_blocking(self):
+        for _ in range(7):
+            self.assertEqual(self._view(self.product.id), 200)
+        stats = self.buffer.stats()
+        self.assertEqual((stats['accepted'], stats['dropped'], stats['buffered']), (5, 2, 5))
+        self.assertEqual(self.buffer.flush(), 5)
+        self.assertEqual(self._stored(), 5)
+
+    def test_views_of_deleted_products_are_skipped(self):
+        gone = Product.objects.create(name='Gone', price=10, sku='VIEW-4')
+        self._view(self.product.id)
+        self._view(gone.id)
+        gone.delete()
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.buffer.stats()['failed'], 0)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class ReviewSummaryMaintenanceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Reviewed', price=10, sku='REVIEW-1')
+        cls.users = User.objects.bulk_create(
+            User(email=f'reviewer{i}@example.com', username=f'reviewer{i}@example.com') for i in range(6)
+        )
+
+    def _review(self, user, rating, **kwargs):
+        return ProductReview.objects.create(product=self.product, user=user, rating=rating, **kwargs)
+
+    def _summary(self):
+        with connection.cursor() as c:
+            c.execute("""
+                SELECT total_reviews, with_media, histogram, average_rating
+                FROM product_reviews_summary WHERE product_id = %s
+            """, [self.product.id])
+            row = c.fetchone()
+        self.product.refresh_from_db(fields=['rating', 'reviews'])
+        self.assertEqual((self.product.reviews, self.product.rating), (row[0], row[3]))
+        return row[0], row[1], row[2], float(row[3])
+
+    def test_creates_updates_and_moderation_are_reflected(self):
+        self._review(self.users[0], 5, images=['https://example.com/r.png'])
+        review = self._review(self.users[1], 2)
+        self.assertEqual(self._summary(), (2, 1, [0, 1, 0, 0, 1], 3.5))
+
+        review.rating = 4
+        review.save()
+        self.assertEqual(self._summary(), (2, 1, [0, 0, 0, 1, 1], 4.5))
+
+        ProductReview.objects.filter(pk=review.pk).update(status='hidden')
+        self.assertEqual(self._summary(), (1, 1, [0, 0, 0, 0, 1], 5.0))
+
+        ProductReview.objects.filter(pk=review.pk).update(status='published')
+        review.delete()
+        self.assertEqual(self._summary(), (1, 1, [0, 0, 0, 0, 1], 5.0))
+
+    def test_bulk_writes_are_applied_as_one_delta(self):
+        ProductReview.objects.bulk_create(
+            ProductReview(product=self.product, user=u, rating=i % 5 + 1) for i, u in enumerate(self.users)
+        )
+        self.assertEqual(self._summary(), (6, 0, [2, 1, 1, 1, 1], 2.67))
+        ProductReview.objects.filter(product=self.product, rating=1).delete()
+        self.assertEqual(self._summary(), (4, 0, [0, 1, 1, 1, 1], 3.5))
+
+    def test_counter_updates_do_not_touch_the_summary(self):
+        review = self._review(self.users[0], 3)
+        with connection.cursor() as c:
+            c.execute('SELECT last_updated FROM product_reviews_summary WHERE product_id = %s', [self.product.id])
+            before = c.fetchone()[0]
+        ProductReview.objects.filter(pk=review.pk).update(helpful_count=7)
+        with connection.cursor() as c:
+            c.execute('SELECT last_updated FROM product_reviews_summary WHERE product_id = %s', [self.product.id])
+            self.assertEqual(c.fetchone()[0], before)
+
+    def test_deleting_a_reviewed_product_removes_its_summary(self):
+        self._review(self.users[0], 4)
+        self.product.delete()
+        with connection.cursor() as c:
+            c.execute('SELECT count(*) FROM product_reviews_summary WHERE product_id = %s', [self.product.id])
+            self.assertEqual(c.fetchone()[0], 0)
+
+    def test_endpoints_read_the_precomputed_summary(self):
+        self._review(self.users[0], 5, images=['https://example.com/r.png'])
+        self._review(self.users[1], 3)
+        url = f'/api/products/{self.product.id}/reviews/'
+        with self.assertNumQueries(3):
+            data = self.client.get(url).json()
+        self.assertEqual(data['summary'], {'average_rating': 4.0, 'total_reviews': 2, 'histogram': [0, 0, 1, 0, 1]})
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(self.client.get(url, {'has_media': 'true'}).json()['count'], 1)
+
+        summary = self.client.get(f'/api/products/{self.product.id}/reviews-summary/').json()
+        self.assertEqual((summary['total_reviews'], summary['with_media']), (2, 1))
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class ReviewListingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Popular', price=10, sku='REVIEWS-1')
+        users = User.objects.bulk_create(
+            User(email=f'lister{i}@example.com', username=f'lister{i}@example.com') for i in range(23)
+        )
+        ProductReview.objects.bulk_create(
+            ProductReview(
+                product=cls.product, user=u, rating=i % 3 + 3, helpful_count=i % 4,
+                images=['https://example.com/r.png'] if i % 5 == 0 else [],
+            )
+            for i, u in enumerate(users)
+        )
+        ProductReview.objects.filter(product=cls.product, helpful_count=3).update(status='hidden')
+        cls.url = f'/api/products/{cls.product.id}/reviews/'
+
+    def _walk(self, params):
+        response = self.client.get(self.url, dict(params, page_size=4))
+        ids = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids.extend(r['id'] for r in response.data['results'])
+            if not response.data['next']:
+                return ids, response.data
+            response = self.client.get(response.data['next'])
+
+    def test_walks_every_sort_without_gaps_or_duplicates(self):
+        published = ProductReview.objects.filter(product=self.product, status='published')
+        for sort_by in ('created_at', 'rating', 'helpful_count'):
+            for sort_order in ('desc', 'asc'):
+                with self.subTest(sort_by=sort_by, sort_order=sort_order):
+                    ids, data = self._walk({'sort_by': sort_by, 'sort_order': sort_order})
+                    prefix = '-' if sort_order == 'desc' else ''
+                    expected = published.order_by(f'{prefix}{sort_by}', f'{prefix}id').values_list('id', flat=True)
+                    self.assertEqual(ids, [str(pk) for pk in expected])
+                    self.assertEqual(data['count'], 18)
+
+    def test_filters_and_counts(self):
+        ids, data = self._walk({'rating': '5'})
+        self.assertEqual(len(ids), data['count'])
+        self.assertEqual(data['count'], 6)
+        ids, data = self._walk({'has_media': 'true', 'sort_by': 'rating'})
+        self.assertEqual((len(ids), data['count']), (4, 4))
+        ids, data = self._walk({'has_media': 'true', 'rating': '3'})
+        self.assertEqual((len(ids), data['count']), (1, 1))
+        ids, _ = self._walk({'rating': 'x'})
+        self.assertEqual(len(ids), 18)
+
+    def test_pages_carry_the_summary_and_only_the_reviewers_email(self):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(self.url, {'page_size': 5}).data
+        self.assertEqual(len(data['results']), 5)
+        self.assertEqual(data['summary']['total_reviews'], 18)
+        self.assertTrue(data['results'][0]['user_name'].startswith('lister'))
+        page_sql = ctx.captured_queries[-1]['sql']
+        self.assertIn('"users_user"."email"', page_sql)
+        self.assertNotIn('"users_user"."password"', page_sql)
+
+    def test_cursor_is_bound_to_its_sort(self):
+        next_url = self.client.get(self.url, {'page_size': 2}).data['next']
+        cursor = next_url.split('cursor=')[1].split('&')[0]
+        response = self.client.get(self.url, {'cursor': cursor, 'sort_by': 'rating'})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class ProductHydrationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = [Product.objects.create(name=f'Card {i}', price=10 + i, sku=f'CARD-{i}') for i in range(5)]
+        cls.hidden = Product.objects.create(name='Hidden', price=1, sku='CARD-hidden', status='inactive')
+        cls.ids = [p.id for p in cls.products]
+
+    def test_lists_keep_their_order_in_one_query(self):
+        a, b, c, d, e = self.ids
+        with self.assertNumQueries(1):
+            lists = hydration.hydrate_lists({
+                'first': [e, self.hidden.id, a, uuid.uuid4(), c],
+                'second': [str(c), b, c],
+                'empty': None,
+            })
+        self.assertEqual([p['id'] for p in lists['first']], [str(e), str(a), str(c)])
+        self.assertEqual([p['id'] for p in lists['second']], [str(c), str(b)])
+        self.assertEqual(lists['empty'], [])
+        self.assertEqual(set(lists['first'][0]), set(hydration.CARD_COLUMNS))
+
+    def test_empty_lists_do_not_query(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(hydration.hydrate([]), [])
+            self.assertEqual(hydration.hydrate_lists({'a': [], 'b': None}), {'a': [], 'b': []})
+
+    def test_recommendations_endpoint_hydrates_in_stored_order(self):
+        owner = self.products[0]
+        stored = [self.ids[3], self.ids[1], self.hidden.id]
+        with connection.cursor() as c:
+            c.execute(
+                "INSERT INTO product_recommendations (product_id, similar_products, you_might_also_like) "
+                "VALUES (%s, %s::uuid[], %s::uuid[])",
+                [owner.id, stored, [self.ids[4]]],
+            )
+        with self.assertNumQueries(3):
+            data = self.client.get(f'/api/products/{owner.id}/recommendations/').json()
+        self.assertEqual([p['id'] for p in data['similar_products']], [str(self.ids[3]), str(self.ids[1])])
+        self.assertEqual([p['id'] for p in data['you_might_also_like']], [str(self.ids[4])])
+        self.assertEqual(data['from_seller_products'], [])
+
+
+class RecommenderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category, other_category = uuid.uuid4(), uuid.uuid4()
+        home = Vendor.objects.create(business_name='Home', business_email='home@example.com', status='approved')
+        away = Vendor.objects.create(business_name='Away', business_email='away@example.com', status='approved')
+        cls.p = [
+            Product.objects.create(
+                name=f'Rec {i}', price=10, sku=f'REC-{i}', category_id=category,
+                vendor_id=(home if i < 4 else away).id, rating=Decimal(i),
+            )
+            for i in range(6)
+        ]
+        cls.elsewhere = Product.objects.create(name='Elsewhere', price=10, sku='REC-x', category_id=other_category)
+        cls.hidden = Product.objects.create(
+            name='Hidden', price=10, sku='REC-h', category_id=category, vendor_id=home.id, status='inactive',
+        )
+        cls.user = User.objects.create(email='buyer@example.com', username='buyer@example.com')
+        address = ShippingAddress.objects.create(
+            user=cls.user, name='Buyer', phone='1', address_line1='1 Road',
+            city='Lagos', state='Lagos', zip='100001',
+        )
+        p0, p1, p2, p3, p4, p5 = cls.p
+        baskets = [([p0, p1], 'delivered'), ([p0, p1, p2], 'shipped'), ([p2, p3], 'pending'),
+                   ([p0, p5], 'cancelled')]
+        for i, (items, status) in enumerate(baskets):
+            order = Order.objects.create(
+                user=cls.user, address_id=address.id, subtotal=10, shipping_fee=0, total=10,
+                order_number=f'REC{i}', status=status,
+            )
+            OrderItem.objects.bulk_create(
+                OrderItem(order=order, product=p, quantity=1, price=10, selected_size='M', selected_color='black')
+                for p in items
+            )
+        with connection.cursor() as c:
+            c.executemany(
+                'INSERT INTO product_views (product_id, user_id) VALUES (%s, %s)',
+                [(p0.id, cls.user.id), (p4.id, cls.user.id), (p0.id, None), (p3.id, None)],
+            )
+
+    def _build(self, *args):
+        out = StringIO()
+        call_command('build_recommendations', '--top', '4', '--co-view-weight', '0.4', *args, stdout=out)
+        return out.getvalue()
+
+    def _rows(self):
+        with connection.cursor() as c:
+            c.execute(
+                'SELECT product_id::text, similar_products::text[], from_seller_products::text[], '
+                'you_might_also_like::text[], confidence_score, last_updated FROM product_recommendations'
+            )
+            return {row[0]: row[1:] for row in c.fetchall()}
+
+    def test_affinities_rank_first_then_category_padding(self):
+        self._build()
+        p0, p1, p2, p3, p4, p5 = (str(p.id) for p in self.p)
+        rows = self._rows()
+        self.assertNotIn(str(self.hidden.id), rows)
+
+        similar, seller, also, confidence, _ = rows[p0]
+        # Two shared orders with p1, one with p2, one co-viewing user with p4
+        # (weighted down); p5's only shared order was cancelled.  p5 pads.
+        self.assertEqual(similar, [p1, p2, p4, p5])
+        self.assertEqual(seller, [p3, p2, p1])
+        self.assertEqual(also, [p3])
+        self.assertGreater(confidence, 0)
+
+        similar, seller, also, confidence, _ = rows[str(self.elsewhere.id)]
+        self.assertEqual((similar, seller, also, confidence), ([], [], [], 0))
+
+    def test_second_run_writes_only_changed_products(self):
+        self.assertIn('Wrote 7 recommendation rows (0 unchanged)', self._build())
+        before = self._rows()
+        self.assertIn('Wrote 0 recommendation rows (7 unchanged)', self._build())
+        self.assertEqual(self._rows(), before)
+
+        Product.objects.filter(pk=self.p[3].pk).update(rating=Decimal('0.5'))
+        self._build()
+        after = self._rows()
+        changed = {pid for pid in after if after[pid] != before[pid]}
+        # p3 moved down every category and vendor ranking it appears in.
+        self.assertIn(str(self.p[0].id), changed)
+        self.assertNotIn(str(self.elsewhere.id), changed)
+
+    def test_rows_of_unlisted_and_deleted_products_are_removed(self):
+        self._build()
+        self.elsewhere.delete()
+        self.assertNotIn(str(self.elsewhere.id), self._rows())
+
+        Product.objects.filter(pk=self.p[5].pk).update(status='inactive')
+        report = json.loads(self._build('--dry-run', '--json'))
+        self.assertEqual(report['removed'], 1)
+        self.assertIn(str(self.p[5].id), self._rows())
+        self.assertIn('removed 1 of products no longer listed', self._build())
+        self.assertNotIn(str(self.p[5].id), self._rows())
+
+    def test_dry_run_and_json_report(self):
+        report = json.loads(self._build('--dry-run', '--json'))
+        self.assertEqual(self._rows(), {})
+        self.assertEqual(report['written'], 7)
+        self.assertEqual(report['purchase_lines'], 7)
+        self.assertEqual(report['view_pairs'], 2)
+        self.assertEqual(report['co_purchase_pairs'], 4)
+        self.assertEqual(report['coverage']['affinity'], round(5 / 7, 4))
+        self.assertEqual(set(report['seconds']), {'load', 'compute', 'write', 'total'})
+
+
+class ReferenceProductListSerializer(serializers.ModelSerializer):
+    class Meta(ProductListSerializer.Meta):
+        pass
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class ProductListSerializationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.create(
+            name='Plain', price=Decimal('10'), sku=None, category_id=uuid.uuid4(),
+            description='not listed ' * 50,
+        )
+        Product.objects.create(
+            name='On sale ünïcode "quoted"', price=Decimal('1234.5'), rating=Decimal('4.25'),
+            discount_percentage=Decimal('12.5'), sale_price=Decimal('0.99'), is_on_sale=True,
+            sku='FAST-1', subcategory_id=uuid.uuid4(), in_stock=False, stock_quantity=3,
+        )
+        Product.objects.create(name='Zero', price=Decimal('0.00'), sale_price=Decimal('0'), sku='FAST-2')
+
+    def _reference(self, queryset):
+        return JSONRenderer().render(ReferenceProductListSerializer(queryset, many=True).data)
+
+    def test_field_plan_output_is_byte_identical(self):
+        queryset = Product.objects.order_by('name')
+        expected = self._reference(list(queryset))
+        self.assertEqual(JSONRenderer().render(ProductListSerializer(list(queryset), many=True).data), expected)
+        rows = list(ProductListSerializer.rows(queryset))
+        self.assertEqual(JSONRenderer().render(ProductListSerializer(rows, many=True).data), expected)
+
+    def test_method_fields_fall_back_to_drf(self):
+        class WithExtra(ProductListSerializer):
+            extra = serializers.SerializerMethodField()
+
+            class Meta(ProductListSerializer.Meta):
+                fields = [*ProductListSerializer.Meta.fields, 'extra']
+
+            def get_extra(self, obj):
+                return obj.sku or '-'
+
+        self.assertIsNone(field_plan(WithExtra()))
+        data = WithExtra(Product.objects.order_by('name'), many=True).data
+        self.assertEqual([row['extra'] for row in data], ['FAST-1', '-', 'FAST-2'])
+
+    def test_list_endpoint_reads_only_listed_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/products/', {'ordering': 'price'})
+        self.assertEqual(response.status_code, 200)
+        sql = ctx.captured_queries[-1]['sql']
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"colors"', sql)
+        expected = self._reference(list(Product.objects.order_by('price', 'id')))
+        self.assertEqual(JSONRenderer().render(response.json()['results']), expected)
+
+    def test_search_keeps_rank_for_cursors(self):
+        response = self.client.get('/api/products/', {'search': 'sale', 'page_size': 1})
+        self.assertEqual([p['sku'] for p in response.json()['results']], ['FAST-1'])
+        self.assertIsNone(response.json()['next'])
+
+    def test_list_etag_follows_product_saves(self):
+        etag = self.client.get('/api/products/featured/')['ETag']
+        self.assertEqual(self.client.get('/api/products/featured/', headers={'If-None-Match': etag}).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(sku='FAST-1').get().save()
+        response = self.client.get('/api/products/featured/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False,
+                   HOME_FEED_SHELF_SIZE=2, HOME_FEED_CATEGORY_COUNT=1, HOME_FEED_REFRESH_INTERVAL=60)
+class HomeFeedTests(TestCase):
+    url = '/api/products/home-feed/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.audio, cls.garden = Category.objects.create(name='Audio'), Category.objects.create(name='Garden')
+        now = timezone.now()
+        cls.products = Product.objects.bulk_create(
+            Product(
+                name=f'Shelf {i}', price=10, sku=f'SHELF-{i}', category_id=(cls.audio if i < 3 else cls.garden).id,
+                is_featured=i % 2 == 0, is_new_arrival=i < 3, is_on_sale=i == 3,
+            )
+            for i in range(5)
+        )
+        for i, product in enumerate(cls.products):  # added_date is auto_now_add
+            Product.objects.filter(pk=product.pk).update(added_date=now - timedelta(days=i))
+        Product.objects.create(name='Hidden', price=1, sku='SHELF-h', is_featured=True, approval_status='pending')
+
+    def setUp(self):
+        cache.clear()
+
+    def _skus(self, data, shelf):
+        return [p['sku'] for p in data[shelf]]
+
+    def test_snapshot_is_served_from_one_cache_read(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(self._skus(data, 'featured'), ['SHELF-0', 'SHELF-2'])
+        self.assertEqual(self._skus(data, 'new_arrivals'), ['SHELF-0', 'SHELF-1'])
+        self.assertEqual(self._skus(data, 'on_sale'), ['SHELF-3'])
+        self.assertEqual(data['top_categories'], [
+            {'id': str(self.audio.id), 'name': 'Audio', 'image_url': None, 'product_count': 3},
+        ])
+        self.assertEqual(
+            data['featured'][0],
+            self.client.get('/api/products/featured/').json()['results'][0],
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).json(), data)
+
+    def test_flag_changes_rebuild_after_commit(self):
+        self.client.get(self.url)
+        product = Product.objects.get(sku='SHELF-1')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            product.price = 12
+            product.save()
+        self.assertNotIn(home_feed._refresh_after_commit, callbacks)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            product.is_featured = True
+            product.save()
+        self.assertEqual(callbacks.count(home_feed._refresh_after_commit), 1)
+        with self.assertNumQueries(0):
+            data = self.client.get(self.url).json()
+        self.assertEqual(self._skus(data, 'featured'), ['SHELF-0', 'SHELF-1'])
+
+    def test_flags_are_tracked_without_post_init(self):
+        self.assertFalse(post_init.has_listeners(Product))
+        product = Product.objects.get(sku='SHELF-1')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            product.is_featured = True
+            product.save(update_fields=['price'])
+        self.assertNotIn(home_feed._refresh_after_commit, callbacks)
+
+        Product.objects.filter(pk=product.pk).update(is_on_sale=True)
+        product.refresh_from_db(fields=['is_on_sale'])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            product.save()
+        # is_featured was still an unsaved edit; is_on_sale was not.
+        self.assertEqual(callbacks.count(home_feed._refresh_after_commit), 1)
+
+        product = Product.objects.only('id', 'price').get(sku='SHELF-2')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            product.price = 11
+            product.save()
+        self.assertNotIn(home_feed._refresh_after_commit, callbacks)
+
+    def test_shelves_match_the_list_endpoints_order(self):
+        Product.objects.filter(sku__in=['SHELF-3', 'SHELF-4']).update(is_on_sale=True, added_date=timezone.now())
+        data = home_feed.refresh()['data']
+        on_sale = [p['sku'] for p in self.client.get('/api/products/on-sale/').json()['results']]
+        self.assertEqual(self._skus(data, 'on_sale'), on_sale)
+
+    def test_stale_snapshot_is_rebuilt_by_a_request(self):
+        self.client.get(self.url)
+        Product.objects.filter(sku='SHELF-4').update(is_on_sale=True, added_date=timezone.now())
+        self.assertEqual(self._skus(self.client.get(self.url).json(), 'on_sale'), ['SHELF-3'])
+        with override_settings(HOME_FEED_REFRESH_INTERVAL=0):
+            data = self.client.get(self.url).json()
+        self.assertEqual(self._skus(data, 'on_sale'), ['SHELF-4', 'SHELF-3'])
+
+    @override_settings(CACHE_STAMPEDE_WAIT=0.1)
+    def test_another_process_lock_is_left_alone(self):
+        cache.add(home_feed.LOCK_KEY, 1, 60)
+        self.assertIsNone(home_feed.refresh(wait=False))
+        # The wait times out with no snapshot stored, so this caller builds one.
+        self.assertEqual(self._skus(home_feed.refresh()['data'], 'on_sale'), ['SHELF-3'])
+        self.assertIsNotNone(cache.get(home_feed.LOCK_KEY))
+
+    def test_refresh_command(self):
+        out = StringIO()
+        call_command('refresh_home_feed', stdout=out)
+        self.assertIn('2 featured, 2 new_arrivals, 1 on_sale, 1 top_categories', out.getvalue())
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False,
+                   PRODUCT_FACET_PRICE_BUCKETS=[20, 50], PRODUCT_FACET_LIMIT=2)
+class ProductFacetTests(TestCase):
+    url = '/api/products/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.audio, cls.garden = uuid.uuid4(), uuid.uuid4()
+        specs = [
+            ('Acme', cls.audio, 10, True, True),
+            ('Acme', cls.audio, 25, False, True),
+            ('Acme', cls.garden, 60, False, False),
+            ('Bolt', cls.audio, 20, True, True),
+            ('Bolt', cls.garden, 49.99, False, True),
+            ('Cora', None, 100, False, True),
+            (None, None, 5, False, True),
+        ]
+        Product.objects.bulk_create(
+            Product(name=f'Facet speaker {i}', price=price, sku=f'FACET-{i}', brand=brand,
+                    category_id=category, is_on_sale=on_sale, in_stock=in_stock)
+            for i, (brand, category, price, on_sale, in_stock) in enumerate(specs)
+        )
+        Product.objects.create(name='Facet hidden', price=1, sku='FACET-h', brand='Acme', status='inactive')
+
+    def setUp(self):
+        cache.clear()
+        clear_local_caches()
+
+    def _facets(self, **params):
+        response = self.client.get(self.url, {'facets': 'true', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['facets']
+
+    def test_counts_from_one_grouping_sets_query(self):
+        with self.assertNumQueries(2):
+            facets = self._facets()
+        self.assertEqual(facets['total'], 7)
+        self.assertEqual(facets['brand'], [{'value': 'Acme', 'count': 3}, {'value': 'Bolt', 'count': 2}])
+        self.assertEqual(facets['category'], [
+            {'value': str(self.audio), 'count': 3}, {'value': str(self.garden), 'count': 2},
+        ])
+        self.assertEqual(facets['price'], [
+            {'min': None, 'max': 20, 'count': 2},
+            {'min': 20, 'max': 50, 'count': 3},
+            {'min': 50, 'max': None, 'count': 2},
+        ])
+        self.assertEqual(facets['on_sale'], {'true': 2, 'false': 5})
+        self.assertEqual(facets['in_stock'], {'true': 6, 'false': 1})
+
+    def test_facets_follow_the_listing_filters(self):
+        facets = self._facets(brand='Acme', price__lte=30)
+        self.assertEqual(facets['total'], 2)
+        self.assertEqual(facets['brand'], [{'value': 'Acme', 'count': 2}])
+        self.assertEqual([b['count'] for b in facets['price']], [1, 1, 0])
+
+        facets = self._facets(search='speaker', is_on_sale='true')
+        self.assertEqual(facets['total'], 2)
+        self.assertEqual(facets['on_sale'], {'true': 2, 'false': 0})
+
+    def test_search_only_facets_are_cached_across_pages(self):
+        first = self.client.get(self.url, {'facets': 'true', 'search': 'speaker', 'page_size': 2}).json()
+        with self.assertNumQueries(1):
+            second = self.client.get(first['next']).json()  # keeps facets=true
+        self.assertEqual(second['facets'], first['facets'])
+        self.assertEqual(first['facets']['total'], 7)
+
+    def test_facets_are_opt_in(self):
+        self.assertNotIn('facets', self.client.get(self.url).json())
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False)
+class CatalogIndexTests(TestCase):
+    """The catalog's page queries, as the views issue them, plan as index scans (migration 0012)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vendor = Vendor.objects.create(business_name='Indexed', business_email='i@example.com', status='approved')
+        cls.category = Category.objects.create(name='Indexed')
+        categories = [cls.category.id, *(uuid.uuid4() for _ in range(19))]
+        vendors = [cls.vendor.id, *(uuid.uuid4() for _ in range(49))]
+        Product.objects.bulk_create(
+            (
+                Product(
+                    name=f'Indexed {i}', price=Decimal(i % 5000) / 10 + 1, sku=f'IDX-{i}',
+                    rating=Decimal(i % 50) / 10, in_stock=i % 7 != 0,
+                    category_id=categories[i % len(categories)], vendor_id=vendors[i % len(vendors)],
+                    is_featured=i % 20 == 0, is_new_arrival=i % 20 == 1, is_on_sale=i % 20 == 2,
+                    status='inactive' if i % 25 == 3 else 'active',
+                )
+                for i in range(5000)
+            ),
+            batch_size=2500,
+        )
+        cls.product = Product.objects.filter(category_id=cls.category.id, status='active').first()
+        with connection.cursor() as c:
+            c.execute("UPDATE products SET added_date = now() - random() * interval '365 days'")
+            c.execute('ANALYZE products')
+
+    def setUp(self):
+        cache.clear()
+        clear_local_caches()
+
+    def _page_query_scans(self, url):
+        """Scan nodes of the products query that fetches the page for ``url``."""
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        # The page is the last products query with a LIMIT (after any lookups and counts).
+        sql = [q['sql'] for q in ctx.captured_queries if re.search(r'FROM "?products"?\s', q['sql']) and 'LIMIT' in q['sql']]
+        with connection.cursor() as c:
+            c.execute('EXPLAIN (FORMAT JSON) ' + sql[-1])
+            plan = c.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+
+        def walk(node):
+            yield node
+            for child in node.get('Plans', ()):
+                yield from walk(child)
+        return [(n['Node Type'], n.get('Index Name')) for n in walk(plan[0]['Plan']) if 'Scan' in n['Node Type']]
+
+    def test_catalog_pages_use_index_scans(self):
+        paths = {
+            '/api/products/': 'products_live_added_idx',
+            '/api/products/?ordering=price': 'products_live_price_idx',
+            '/api/products/?ordering=-rating': 'products_live_rating_idx',
+            '/api/products/?ordering=price&price__gte=100&price__lte=120': 'products_live_price_idx',
+            f'/api/products/?category_id={self.category.id}': 'products_live_category_added_idx',
+            '/api/products/featured/': 'products_featured_added_idx',
+            '/api/products/new-arrivals/': 'products_new_arrival_added_idx',
+            '/api/products/on-sale/': 'products_on_sale_added_idx',
+            f'/api/categories/{self.category.id}/products/': 'products_live_category_added_idx',
+            f'/api/vendors/{self.vendor.id}/products/': 'products_live_vendor_added_idx',
+            # No precomputed row: falls back to the category's top-rated in-stock products.
+            f'/api/products/{self.product.id}/recommendations/': 'products_in_stock_category_rating_idx',
+        }
+        for url, index in paths.items():
+            with self.subTest(url=url):
+                scans = self._page_query_scans(url)
+                self.assertNotIn('Seq Scan', [node for node, _ in scans])
+                self.assertIn(index, [name for _, name in scans])
@@ -0,0 +1,135 @@
+"""
+Typeahead suggestions for the search box: products, brands and vendors.
+
+All sections come back from one UNION ALL query with two arms per section:
+
+- prefix arm: ``lower(col) LIKE 'wir%' ORDER BY lower(col) USING ~<~ LIMIT k``
+  walks the text_pattern_ops btree from migration 0006 in index order and
+  stops after k rows (``~<~`` is the byte order that opclass sorts by; a
+  plain ORDER BY would sort every match in the database collation).
+  Brands use a loose index scan (recursive CTE) so a brand shared by
+  thousands of products costs one index probe per distinct brand;
+- fuzzy arm: pg_trgm word similarity (``q <% col``) on the GIN trigram
+  indexes, for near-misses like "wirles" or "hedphones".
+
+Prefix matches are listed first, then fuzzy matches by similarity.  When
+the pg_trgm extension is not installed (some local databases) only the
+prefix arms run.
+"""
+import logging
+import re
+from contextlib import nullcontext
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+_available = {}
+
+LIVE = "p.status = 'active' AND p.approval_status = 'approved'"
+LIVE_VENDOR = "v.status = 'approved' AND v.is_active"
+
+PREFIX_ARMS = f"""
+(SELECT 'product' AS kind, true AS prefix, p.id::text AS id, p.name AS text, p.images AS image, 1.0 AS score
+ FROM products p
+ WHERE {LIVE} AND lower(p.name) LIKE %(prefix)s
+ ORDER BY lower(p.name) USING ~<~
+ LIMIT %(limit)s)
+UNION ALL
+(WITH RECURSIVE brands(v) AS (
+    (SELECT lower(p.brand) FROM products p
+     WHERE {LIVE} AND lower(p.brand) LIKE %(prefix)s
+     ORDER BY lower(p.brand) USING ~<~ LIMIT 1)
+    UNION ALL
+    SELECT (SELECT lower(p.brand) FROM products p
+            WHERE {LIVE} AND lower(p.brand) LIKE %(prefix)s AND lower(p.brand) ~>~ brands.v
+            ORDER BY lower(p.brand) USING ~<~ LIMIT 1)
+    FROM brands WHERE brands.v IS NOT NULL
+ )
+ SELECT 'brand', true, NULL,
+        (SELECT p.brand FROM products p WHERE {LIVE} AND lower(p.brand) = brands.v LIMIT 1),
+        NULL, 1.0
+ FROM brands WHERE brands.v IS NOT NULL
+ LIMIT %(limit)s)
+UNION ALL
+(SELECT 'vendor', true, v.id::text, v.business_name, v.business_logo, 1.0
+ FROM vendors v
+ WHERE {LIVE_VENDOR} AND lower(v.business_name) LIKE %(prefix)s
+ ORDER BY lower(v.business_name) USING ~<~
+ LIMIT %(limit)s)
+"""
+
+FUZZY_ARMS = f"""
+UNION ALL
+(SELECT 'product', false, p.id::text, p.name, p.images, word_similarity(%(q)s, p.name) AS score
+ FROM products p
+ WHERE {LIVE} AND %(q)s <%% p.name AND lower(p.name) NOT LIKE %(prefix)s
+ ORDER BY score DESC, p.name
+ LIMIT %(limit)s)
+UNION ALL
+(SELECT 'brand', false, NULL, p.brand, NULL, max(word_similarity(%(q)s, p.brand)) AS score
+ FROM products p
+ WHERE {LIVE} AND %(q)s <%% p.brand AND lower(p.brand) NOT LIKE %(prefix)s
+ GROUP BY p.brand
+ ORDER BY score DESC, p.brand
+ LIMIT %(limit)s)
+UNION ALL
+(SELECT 'vendor', false, v.id::text, v.business_name, v.business_logo,
+        word_similarity(%(q)s, v.business_name) AS score
+ FROM vendors v
+ WHERE {LIVE_VENDOR} AND %(q)s <%% v.business_name AND lower(v.business_name) NOT LIKE %(prefix)s
+ ORDER BY score DESC, v.business_name
+ LIMIT %(limit)s)
+"""
+
+
+def normalize(text, max_length=64):
+    return ' '.join((text or '').split()).lower()[:max_length]
+
+
+def trigram_available() -> bool:
+    """Whether pg_trgm is installed in the current database (checked once per process)."""
+    alias = connection.alias
+    if alias not in _available:
+        with connection.cursor() as c:
+            c.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _available[alias] = c.fetchone() is not None
+        if not _available[alias]:
+            logger.warning('pg_trgm is not installed; typeahead falls back to prefix matching')
+    return _available[alias]
+
+
+def suggest(query: str, limit: int = 5, threshold: float = 0.3) -> dict:
+    """
+    Top ``limit`` product, brand and vendor suggestions for ``query``
+    (already normalized).  ``threshold`` is the minimum pg_trgm word
+    similarity for a fuzzy match.
+    """
+    result = {'products': [], 'brands': [], 'vendors': []}
+    if not query:
+        return result
+
+    prefix = re.sub(r'([\\%_])', r'\\\1', query) + '%'
+    params = {'q': query, 'prefix': prefix, 'limit': limit}
+    fuzzy = trigram_available()
+    # set_config(..., true) only lasts for the transaction the query runs in.
+    with transaction.atomic() if fuzzy else nullcontext(), connection.cursor() as c:
+        if fuzzy:
+            c.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(threshold)])
+        c.execute(PREFIX_ARMS + FUZZY_ARMS if fuzzy else PREFIX_ARMS, params)
+        rows = c.fetchall()
+
+    # Prefix rows first (already in index order), then fuzzy rows by score.
+    rows.sort(key=lambda r: not r[1])
+    sections = {'product': result['products'], 'brand': result['brands'], 'vendor': result['vendors']}
+    for kind, _, id_, text, image, score in rows:
+        section = sections[kind]
+        if len(section) >= limit:
+            continue
+        item = {'name': text, 'score': round(float(score), 3)}
+        if kind == 'product':
+            item.update(id=id_, image=image)
+        elif kind == 'vendor':
+            item.update(id=id_, logo=image)
+        section.append(item)
+    return result
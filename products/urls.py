@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import (
-    ProductListView, ProductDetailView,
+    ProductListView, ProductDetailView, ProductFullView, ProductTypeaheadView, HomeFeedView,
     FeaturedProductsView, NewArrivalsView, OnSaleProductsView, ProductSearchView,
     ProductSizeChartView, ProductViewTrackView,
     ProductReviewsListCreateView, CanReviewProductView,
@@ -18,8 +18,10 @@ urlpatterns = [
     path('featured/', FeaturedProductsView.as_view(), name='product-featured'),
     path('new-arrivals/', NewArrivalsView.as_view(), name='product-new-arrivals'),
     path('on-sale/', OnSaleProductsView.as_view(), name='product-on-sale'),
+    path('home-feed/', HomeFeedView.as_view(), name='product-home-feed'),
     path('search/', ProductSearchView.as_view(), name='product-search'),
     path('search-by-image/', ImageSearchView.as_view(), name='product-image-search'),
+    path('typeahead/', ProductTypeaheadView.as_view(), name='product-typeahead'),
 
     # Parameterized paths (uuid)
     path('<uuid:id>/delivery-info/', ProductDeliveryInfoView.as_view(), name='product-delivery-info'),
@@ -37,5 +39,6 @@ urlpatterns = [
     path('<uuid:id>/qa/', ProductQAListCreateView.as_view(), name='product-qa'),
     path('<uuid:id>/size-chart/', ProductSizeChartView.as_view(), name='product-size-chart'),
     path('<uuid:id>/view/', ProductViewTrackView.as_view(), name='product-view'),
+    path('<uuid:id>/full/', ProductFullView.as_view(), name='product-full'),
     path('<uuid:id>/', ProductDetailView.as_view(), name='product-detail'),
 ]
@@ -0,0 +1,172 @@
+"""
+Buffered ingestion for product view events (POST /api/products/{id}/view/).
+
+Views are the highest-volume write in the app, so the endpoint does not
+write to the database itself:
+
+- product ids are checked against an in-memory set of live product ids,
+  reloaded every VIEW_TRACKING_ID_REFRESH seconds; an id missing from the
+  set (a product published since the last reload, or garbage) is looked up
+  once and the answer remembered until the next reload;
+- accepted events go into a bounded per-process buffer
+  (VIEW_TRACKING_BUFFER_SIZE).  When it is full, new events are dropped and
+  counted instead of blocking the request;
+- a daemon thread writes the buffer as one multi-row INSERT every
+  VIEW_TRACKING_FLUSH_INTERVAL seconds, or as soon as
+  VIEW_TRACKING_BATCH_SIZE events are waiting.  Whatever is left is written
+  at interpreter exit.
+
+With VIEW_TRACKING_FLUSH_INTERVAL = 0 no thread is started and a batch is
+written by the request that fills it (tests, one-off scripts).
+``get_view_tracking_stats()`` returns the counters for this process.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from besmart_backend.cache import LocalLRU
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+# Rows whose product was deleted after validation are skipped instead of
+# failing the whole batch on the foreign key.
+INSERT_SQL = """
+    INSERT INTO product_views (product_id, user_id, created_at)
+    SELECT v.product_id, v.user_id, v.created_at
+    FROM unnest(%s::uuid[], %s::uuid[], %s::timestamptz[]) AS v(product_id, user_id, created_at)
+    WHERE EXISTS (SELECT 1 FROM products p WHERE p.id = v.product_id)
+"""
+
+COUNTERS = ('accepted', 'rejected', 'dropped', 'written', 'failed', 'batches')
+
+
+class ViewBuffer:
+    def __init__(self):
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._live_ids = None
+        self._live_ids_loaded_at = 0.0
+        self._lookups = LocalLRU(10000)
+        self._stats = dict.fromkeys(COUNTERS, 0)
+        self._reported_drops = 0
+
+    # -- validation --------------------------------------------------------
+    def reload_ids(self):
+        ids = frozenset(
+            Product.objects.filter(status='active', approval_status='approved').values_list('id', flat=True)
+        )
+        self._live_ids, self._live_ids_loaded_at = ids, time.time()
+        self._lookups.clear()
+
+    def _ids_stale(self):
+        return time.time() - self._live_ids_loaded_at >= settings.VIEW_TRACKING_ID_REFRESH
+
+    def is_live(self, product_id) -> bool:
+        # The flusher thread keeps the set fresh; without one, reload inline.
+        if self._live_ids is None or (self._thread is None and self._ids_stale()):
+            self.reload_ids()
+        if product_id in self._live_ids:
+            return True
+        live = self._lookups.get(product_id)
+        if live is None:
+            live = Product.objects.filter(id=product_id, status='active', approval_status='approved').exists()
+            self._lookups.set(product_id, live, self._live_ids_loaded_at + settings.VIEW_TRACKING_ID_REFRESH)
+        return live
+
+    # -- buffering ---------------------------------------------------------
+    def record(self, product_id, user_id=None) -> bool:
+        """Queue a view of ``product_id``; False if it is not a live product."""
+        if not self.is_live(product_id):
+            self._count('rejected')
+            return False
+        with self._lock:
+            if len(self._events) >= settings.VIEW_TRACKING_BUFFER_SIZE:
+                self._stats['dropped'] += 1
+                return True
+            self._events.append((str(product_id), user_id and str(user_id), timezone.now()))
+            self._stats['accepted'] += 1
+            batch_ready = len(self._events) >= settings.VIEW_TRACKING_BATCH_SIZE
+
+        if self._ensure_thread():
+            if batch_ready:
+                self._wake.set()
+        elif batch_ready:
+            self.flush()
+        return True
+
+    def flush(self) -> int:
+        """Write every buffered event; returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._events)
+                self._events.clear()
+                dropped = self._stats['dropped']
+            if dropped > self._reported_drops:
+                logger.warning('view tracking buffer full: dropped %d events', dropped - self._reported_drops)
+                self._reported_drops = dropped
+            if not batch:
+                return 0
+            product_ids, user_ids, created = zip(*batch)
+            try:
+                with connection.cursor() as c:
+                    c.execute(INSERT_SQL, [list(product_ids), list(user_ids), list(created)])
+                    written = c.rowcount
+            except Exception:
+                logger.exception('could not write %d product views', len(batch))
+                self._count('failed', len(batch))
+                return 0
+            self._count('written', written)
+            self._count('batches')
+            return written
+
+    # -- background flushing -----------------------------------------------
+    def _ensure_thread(self) -> bool:
+        if settings.VIEW_TRACKING_FLUSH_INTERVAL <= 0:
+            return False
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='view-tracking', daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+        return True
+
+    def _run(self):
+        while True:
+            self._wake.wait(settings.VIEW_TRACKING_FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                self.flush()
+                if self._ids_stale():
+                    self.reload_ids()
+            except Exception:
+                logger.exception('view tracking flush failed')
+            finally:
+                # Hand the thread's connection back (to the pool) between batches.
+                connection.close()
+
+    def _count(self, counter, n=1):
+        with self._lock:
+            self._stats[counter] += n
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, buffered=len(self._events))
+
+
+buffer = ViewBuffer()
+
+
+def get_view_tracking_stats() -> dict:
+    return buffer.stats()
@@ -1,19 +1,28 @@
 import uuid as uuid_module
+from urllib.parse import quote
 from rest_framework import generics, filters, status, views, permissions
 from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 from django.db import connection
+from django.db.models import Func, IntegerField
+from django.conf import settings
+from besmart_backend.cache import cached_view, get_namespace
 from .models import Product, ProductReview, ProductQuestion
 from .serializers import ProductListSerializer, ProductDetailSerializer
+from .pagination import ProductCursorPagination, ProductReviewCursorPagination
+from .filters import FullTextSearchFilter
+from . import facets, home_feed, hydration, product_page, typeahead, view_tracking
+from .product_page import EMPTY_REVIEWS_SUMMARY
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
 class ProductListView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     queryset = Product.objects.all().filter(status='active', approval_status='approved')
     serializer_class = ProductListSerializer
-    pagination_class = None
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = ProductCursorPagination
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     
     # Filter fields
     filterset_fields = {
@@ -26,24 +35,43 @@ class ProductListView(generics.ListAPIView):
         'vendor_id': ['exact'],
     }
     
-    # Search fields (Search vector in DB is more complex, using simple icontains for now)
+    # ?search= runs against products.search_vector (name, description, brand) or an
+    # exact sku; see FullTextSearchFilter.
     search_fields = ['name', 'description', 'brand', 'sku']
     
     # Ordering fields
-    ordering_fields = ['price', 'added_date', 'rating', 'orders_count']
+    ordering_fields = ['price', 'added_date', 'rating']
     ordering = ['-added_date']
 
     @extend_schema(
         summary="List all products",
-        description="Get a list of products with filtering, searching and sorting capabilities.",
+        description=(
+            "Get a cursor-paginated list of products with filtering, searching and sorting "
+            "capabilities. Sort with ordering=added_date|price|rating (prefix '-' for "
+            "descending) and follow the next/previous links. With facets=true the response "
+            "also carries brand, category, price-bucket, on-sale and in-stock counts for "
+            "everything the filters match."
+        ),
         parameters=[
             OpenApiParameter(name='price__gte', description='Minimum price', required=False, type=float),
             OpenApiParameter(name='price__lte', description='Maximum price', required=False, type=float),
+            OpenApiParameter(name='facets', description='Include facet counts', required=False, type=bool),
         ]
     )
+    @cached_view('product_lists', timeout=settings.PRODUCT_LIST_CACHE_TTL)
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get('facets', '').lower() in ('1', 'true'):
+            response.data['facets'] = facets.for_request(request, self.filter_queryset(self.get_queryset()))
+        return response
+
+    def filter_queryset(self, queryset):
+        # Narrowed after filtering, so the search rank annotation comes along.
+        return ProductListSerializer.rows(super().filter_queryset(queryset), 'added_date')
+
 class ProductDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.AllowAny]
     queryset = Product.objects.all()
@@ -52,30 +80,148 @@ class ProductDetailView(generics.RetrieveAPIView):
 
 class FeaturedProductsView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
-    queryset = Product.objects.filter(is_featured=True, status='active', approval_status='approved')
+    queryset = ProductListSerializer.rows(
+        Product.objects.filter(is_featured=True, status='active', approval_status='approved'), 'added_date',
+    )
     serializer_class = ProductListSerializer
-    pagination_class = None
+    pagination_class = ProductCursorPagination
+
+    @cached_view('product_lists', timeout=settings.PRODUCT_LIST_CACHE_TTL)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 class NewArrivalsView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
-    queryset = Product.objects.filter(is_new_arrival=True, status='active', approval_status='approved').order_by('-added_date')
+    queryset = ProductListSerializer.rows(
+        Product.objects.filter(is_new_arrival=True, status='active', approval_status='approved').order_by('-added_date'),
+        'added_date',
+    )
     serializer_class = ProductListSerializer
-    pagination_class = None
+    pagination_class = ProductCursorPagination
+
+    @cached_view('product_lists', timeout=settings.PRODUCT_LIST_CACHE_TTL)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 class OnSaleProductsView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
-    queryset = Product.objects.filter(is_on_sale=True, status='active', approval_status='approved')
+    queryset = ProductListSerializer.rows(
+        Product.objects.filter(is_on_sale=True, status='active', approval_status='approved')
+        .order_by('-added_date', '-id')
+    )
     serializer_class = ProductListSerializer
 
+    @cached_view('product_lists', timeout=settings.PRODUCT_LIST_CACHE_TTL)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+class HomeFeedView(views.APIView):
+    """
+    GET /api/products/home-feed/ — featured, new-arrival and on-sale shelves
+    plus top categories, served from a precomputed snapshot (one cache read).
+    """
+    permission_classes = []
+    authentication_classes = []
+
+    @extend_schema(responses={200: {'type': 'object', 'properties': {
+        'featured': {'type': 'array'},
+        'new_arrivals': {'type': 'array'},
+        'on_sale': {'type': 'array'},
+        'top_categories': {'type': 'array'},
+        'generated_at': {'type': 'string', 'format': 'date-time'},
+    }}})
+    def get(self, request):
+        return Response(home_feed.snapshot())
+
 class ProductSearchView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = ProductListSerializer
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [FullTextSearchFilter]
     search_fields = ['name', 'description', 'brand']
     
     def get_queryset(self):
         return Product.objects.filter(status='active', approval_status='approved')
 
+    def filter_queryset(self, queryset):
+        return ProductListSerializer.rows(super().filter_queryset(queryset))
+
+
+class ProductTypeaheadView(views.APIView):
+    """GET /api/products/typeahead/?q= — product, brand and vendor suggestions"""
+    permission_classes = []
+    authentication_classes = []
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter('q', str, description='What the user has typed so far'),
+            OpenApiParameter('limit', int, description='Suggestions per section (default 5, max 20)'),
+            OpenApiParameter('threshold', float, description='Minimum fuzzy-match similarity, 0.1-1 (default 0.3)'),
+        ],
+        responses={200: {'type': 'object', 'properties': {
+            'query': {'type': 'string'},
+            'products': {'type': 'array'},
+            'brands': {'type': 'array'},
+            'vendors': {'type': 'array'},
+        }}},
+    )
+    def get(self, request):
+        query = typeahead.normalize(request.query_params.get('q'))
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 5)), 20))
+            threshold = float(request.query_params.get('threshold', settings.TYPEAHEAD_SIMILARITY_THRESHOLD))
+        except ValueError:
+            return Response({"detail": "limit and threshold must be numbers."}, status=status.HTTP_400_BAD_REQUEST)
+        threshold = round(max(0.1, min(threshold, 1.0)), 2)
+
+        if len(query) < settings.TYPEAHEAD_MIN_LENGTH:
+            data = typeahead.suggest('')
+        else:
+            # Hot prefixes ("iph", "sams") are served from the shared cache.
+            tier = get_namespace('typeahead', timeout=settings.TYPEAHEAD_CACHE_TTL)
+            data = tier.get_or_set(
+                f'{limit}|{threshold}|{quote(query)}',
+                lambda: typeahead.suggest(query, limit=limit, threshold=threshold),
+            )
+        return Response({'query': query, **data})
+
+
+class ProductFullView(views.APIView):
+    """GET /api/products/{id}/full/ — the whole product page in one call"""
+    permission_classes = []
+    authentication_classes = []
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'include', str,
+                description='Comma-separated sections (default all): ' + ', '.join(product_page.SECTIONS),
+            ),
+        ],
+        responses={200: {'type': 'object'}, 404: None},
+    )
+    def get(self, request, id):
+        include = request.query_params.get('include')
+        sections = product_page.SECTIONS
+        if include:
+            sections = [s.strip() for s in include.split(',') if s.strip()]
+            unknown = set(sections) - set(product_page.SECTIONS)
+            if unknown:
+                return Response(
+                    {"detail": f"Unknown sections: {', '.join(sorted(unknown))}."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        def build():
+            product = Product.objects.filter(id=id, status='active', approval_status='approved').first()
+            if product is None:
+                raise NotFound()
+            return product_page.load(product)
+
+        # The page is cached whole, so every include= combination shares one entry.
+        tier = get_namespace('product_page', timeout=settings.PRODUCT_PAGE_CACHE_TTL)
+        page = tier.get_or_set(product_page.versioned_key(id), build)
+        return Response({name: page[name] for name in sections})
+
 
 class ProductSizeChartView(views.APIView):
     """GET /api/products/{id}/size-chart/"""
@@ -108,27 +254,28 @@ class ProductSizeChartView(views.APIView):
 
 
 class ProductViewTrackView(views.APIView):
-    """POST /api/products/{id}/view/ — track product view"""
+    """POST /api/products/{id}/view/ — track product view (buffered, see products.view_tracking)"""
     permission_classes = []
 
     @extend_schema(responses={200: {'type': 'object', 'properties': {'success': {'type': 'boolean'}}}})
     def post(self, request, id):
-        product = get_object_or_404(Product, id=id, status='active', approval_status='approved')
-        try:
-            with connection.cursor() as c:
-                c.execute("""
-                    INSERT INTO product_views (id, product_id, user_id, created_at)
-                    VALUES (gen_random_uuid(), %s, %s, NOW())
-                """, [str(product.id), str(request.user.id) if request.user.is_authenticated else None])
-        except Exception:
-            pass
+        user_id = request.user.id if request.user.is_authenticated else None
+        if not view_tracking.buffer.record(id, user_id):
+            raise NotFound()
         return Response({"success": True})
 
 
+REVIEW_LIST_FIELDS = (
+    'id', 'product', 'user', 'order_id', 'rating', 'title', 'content', 'images', 'verified_purchase',
+    'helpful_count', 'reported_count', 'status', 'vendor_response', 'created_at', 'updated_at',
+)
+
+
 class ProductReviewsListCreateView(generics.ListCreateAPIView):
     """GET/POST /api/products/{id}/reviews/"""
     permission_classes = []
     authentication_classes = []
+    pagination_class = ProductReviewCursorPagination
 
     def get_serializer_class(self):
         from .serializers import ProductReviewSerializer, ProductReviewCreateSerializer
@@ -140,7 +287,23 @@ class ProductReviewsListCreateView(generics.ListCreateAPIView):
         return []  # GET is public
 
     def get_queryset(self):
-        return ProductReview.objects.filter(product_id=self.kwargs['id'], status='published').select_related('user').order_by('-created_at')
+        reviews = ProductReview.objects.filter(product_id=self.kwargs['id'], status='published')
+
+        # Gap 9: Rating filter
+        rating = self.request.query_params.get('rating')
+        if rating in ('1', '2', '3', '4', '5'):
+            reviews = reviews.filter(rating=int(rating))
+
+        # Gap 8: has_media filter (getReviewsWithMedia); same expression as
+        # the partial index from migration 0011.
+        has_media = self.request.query_params.get('has_media')
+        if has_media and has_media.lower() == 'true':
+            reviews = reviews.alias(
+                media_count=Func('images', function='cardinality', output_field=IntegerField()),
+            ).filter(media_count__gt=0)
+
+        # Only the reviewer's email is shown, so skip the rest of the user row.
+        return reviews.select_related('user').only(*REVIEW_LIST_FIELDS, 'user__email')
 
     def perform_create(self, serializer):
         product = get_object_or_404(Product, id=self.kwargs['id'], status='active', approval_status='approved')
@@ -161,57 +324,33 @@ class ProductReviewsListCreateView(generics.ListCreateAPIView):
         from .serializers import ProductReviewSerializer
         return Response(ProductReviewSerializer(self.created_review).data, status=status.HTTP_201_CREATED)
 
+    @extend_schema(parameters=[
+        OpenApiParameter('rating', int, description='Only reviews with this rating (1-5).'),
+        OpenApiParameter('has_media', bool, description='Only reviews with images.'),
+    ])
     def get(self, request, *args, **kwargs):
         product = get_object_or_404(Product, id=self.kwargs['id'], status='active', approval_status='approved')
-        reviews = ProductReview.objects.filter(product=product, status='published').select_related('user')
+        summary = _review_summary(product.id) or EMPTY_REVIEWS_SUMMARY
+        histogram = summary['histogram'] or EMPTY_REVIEWS_SUMMARY['histogram']
 
-        # Gap 9: Rating filter
-        rating_filter = request.query_params.get('rating')
-        if rating_filter:
-            try:
-                reviews = reviews.filter(rating=int(rating_filter))
-            except (ValueError, TypeError):
-                pass
-
-        # Gap 8: has_media filter (getReviewsWithMedia)
-        has_media = request.query_params.get('has_media')
-        if has_media and has_media.lower() == 'true':
-            from django.db.models import Q
-            reviews = reviews.exclude(images=[]).exclude(images__isnull=True)
-
-        # Gap 9: Sort support
-        sort_by = request.query_params.get('sort_by', 'created_at')
-        sort_order = request.query_params.get('sort_order', 'desc')
-        allowed_sorts = {'created_at', 'rating', 'helpful_count'}
-        if sort_by not in allowed_sorts:
-            sort_by = 'created_at'
-        order_prefix = '-' if sort_order == 'desc' else ''
-        reviews = reviews.order_by(f'{order_prefix}{sort_by}')
+        page = self.paginate_queryset(self.get_queryset())
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
 
-        from .serializers import ProductReviewSerializer
-        from django.db.models import Avg, Count
-        agg = ProductReview.objects.filter(product=product, status='published').aggregate(avg=Avg('rating'), total=Count('id'))
-
-        # Compute histogram
-        histogram = [0, 0, 0, 0, 0]
-        from django.db.models import Count as DjCount
-        rating_counts = ProductReview.objects.filter(
-            product=product, status='published'
-        ).values('rating').annotate(cnt=DjCount('id'))
-        for rc in rating_counts:
-            idx = rc['rating'] - 1
-            if 0 <= idx < 5:
-                histogram[idx] = rc['cnt']
+        # Matching reviews, from the summary where it has the number.
+        rating = request.query_params.get('rating')
+        media_only = request.query_params.get('has_media', '').lower() == 'true'
+        if rating in ('1', '2', '3', '4', '5'):
+            count = self.get_queryset().count() if media_only else histogram[int(rating) - 1]
+        else:
+            count = summary['with_media'] if media_only else summary['total_reviews']
 
-        return Response({
-            "count": reviews.count(),
-            "results": ProductReviewSerializer(reviews, many=True).data,
-            "summary": {
-                "average_rating": float(agg['avg'] or 0),
-                "total_reviews": agg['total'] or 0,
-                "histogram": histogram,
-            }
-        })
+        response.data['count'] = count or 0
+        response.data['summary'] = {
+            "average_rating": float(summary['average_rating'] or 0),
+            "total_reviews": summary['total_reviews'] or 0,
+            "histogram": histogram,
+        }
+        return response
 
 
 class CanReviewProductView(views.APIView):
@@ -439,66 +578,69 @@ class ImageSearchView(views.APIView):
         })
 
 
-class ProductDeliveryInfoView(views.APIView):
-    """GET /api/products/{id}/delivery-info/"""
+class CachedProductSectionView(views.APIView):
+    """
+    Base for the product page side-table endpoints.  ``load(id)`` returns the
+    payload, or None when the product has no row (served as a 404); payloads
+    are cached per product content version (see product_page.cached_section).
+    """
     permission_classes = []
     authentication_classes = []
+    section = None
+    not_found = None
 
     def get(self, request, id):
-        get_object_or_404(Product, id=id, status='active', approval_status='approved')
+        def build():
+            get_object_or_404(Product, id=id, status='active', approval_status='approved')
+            return self.load(str(id))
+
+        data = product_page.cached_section(id, self.section, build)
+        if data is None:
+            return Response({"detail": self.not_found}, status=404)
+        return Response(data)
+
+    def load(self, id):
+        raise NotImplementedError
+
+
+class ProductDeliveryInfoView(CachedProductSectionView):
+    """GET /api/products/{id}/delivery-info/"""
+    section = 'delivery_info'
+    not_found = "No delivery info for this product."
+
+    def load(self, id):
         with connection.cursor() as c:
             c.execute("""
                 SELECT id, product_id, return_window_days, cod_eligible, free_delivery,
                        shipping_fee, eta_min_days, eta_max_days, delivery_notes, 
                        created_at, updated_at
                 FROM delivery_info WHERE product_id = %s LIMIT 1
-            """, [str(id)])
-            row = c.fetchone()
-            cols = [col[0] for col in c.description] if c.description else []
-        if not row:
-            return Response({"detail": "No delivery info for this product."}, status=404)
-        data = dict(zip(cols, row))
-        for k, v in list(data.items()):
-            if hasattr(v, 'isoformat'):
-                data[k] = v.isoformat()
-            elif isinstance(v, uuid_module.UUID):
-                data[k] = str(v)
-        return Response(data)
+            """, [id])
+            rows = _dictfetchall(c)
+        return rows[0] if rows else None
 
 
-class ProductWarrantyInfoView(views.APIView):
+class ProductWarrantyInfoView(CachedProductSectionView):
     """GET /api/products/{id}/warranty-info/"""
-    permission_classes = []
-    authentication_classes = []
+    section = 'warranty_info'
+    not_found = "No warranty info for this product."
 
-    def get(self, request, id):
-        get_object_or_404(Product, id=id, status='active', approval_status='approved')
+    def load(self, id):
         with connection.cursor() as c:
             c.execute("""
                 SELECT id, product_id, type, duration, description, terms_url,
                        coverage_details, exclusions, created_at, updated_at
                 FROM warranty_info WHERE product_id = %s LIMIT 1
-            """, [str(id)])
-            row = c.fetchone()
-            cols = [col[0] for col in c.description] if c.description else []
-        if not row:
-            return Response({"detail": "No warranty info for this product."}, status=404)
-        data = dict(zip(cols, row))
-        for k, v in list(data.items()):
-            if hasattr(v, 'isoformat'):
-                data[k] = v.isoformat()
-            elif isinstance(v, uuid_module.UUID):
-                data[k] = str(v)
-        return Response(data)
+            """, [id])
+            rows = _dictfetchall(c)
+        return rows[0] if rows else None
 
 
-class ProductOffersView(views.APIView):
+class ProductOffersView(CachedProductSectionView):
     """GET /api/products/{id}/offers/"""
-    permission_classes = []
-    authentication_classes = []
+    section = 'offers'
 
-    def get(self, request, id):
-        get_object_or_404(Product, id=id, status='active', approval_status='approved')
+    def load(self, id):
         with connection.cursor() as c:
             c.execute("""
                 SELECT id, product_id, type, code, description, expiry_date,
@@ -506,35 +648,31 @@ class ProductOffersView(views.APIView):
                 FROM product_offers
                 WHERE product_id = %s AND is_active = true
                 ORDER BY sort_order
-            """, [str(id)])
+            """, [id])
             rows = _dictfetchall(c)
-        return Response({"count": len(rows), "results": rows})
+        return {"count": len(rows), "results": rows}
 
 
-class ProductHighlightsView(views.APIView):
+class ProductHighlightsView(CachedProductSectionView):
     """GET /api/products/{id}/highlights/"""
-    permission_classes = []
-    authentication_classes = []
+    section = 'highlights'
 
-    def get(self, request, id):
-        get_object_or_404(Product, id=id, status='active', approval_status='approved')
+    def load(self, id):
         with connection.cursor() as c:
             c.execute("""
                 SELECT id, product_id, label, icon_url, sort_order, created_at
                 FROM product_highlights
                 WHERE product_id = %s ORDER BY sort_order
-            """, [str(id)])
+            """, [id])
             rows = _dictfetchall(c)
-        return Response({"count": len(rows), "results": rows})
+        return {"count": len(rows), "results": rows}
 
 
-class FeaturePostersView(views.APIView):
+class FeaturePostersView(CachedProductSectionView):
     """GET /api/products/{id}/feature-posters/"""
-    permission_classes = []
-    authentication_classes = []
+    section = 'feature_posters'
 
-    def get(self, request, id):
-        get_object_or_404(Product, id=id, status='active', approval_status='approved')
+    def load(self, id):
         with connection.cursor() as c:
             c.execute("""
                 SELECT id, product_id, title, subtitle, media_url, aspect_ratio,
@@ -542,24 +680,22 @@ class FeaturePostersView(views.APIView):
                 FROM feature_posters
                 WHERE product_id = %s AND is_active = true
                 ORDER BY sort_order
-            """, [str(id)])
+            """, [id])
             rows = _dictfetchall(c)
-        return Response({"count": len(rows), "results": rows})
+        return {"count": len(rows), "results": rows}
 
 
-class ProductSpecificationsView(views.APIView):
+class ProductSpecificationsView(CachedProductSectionView):
     """GET /api/products/{id}/specifications/"""
-    permission_classes = []
-    authentication_classes = []
+    section = 'specifications'
 
-    def get(self, request, id):
-        get_object_or_404(Product, id=id, status='active', approval_status='approved')
+    def load(self, id):
         with connection.cursor() as c:
             c.execute("""
                 SELECT id, product_id, group_name, spec_name, spec_value, sort_order, created_at
                 FROM product_specifications
                 WHERE product_id = %s ORDER BY sort_order
-            """, [str(id)])
+            """, [id])
             rows = _dictfetchall(c)
 
         # Group by group_name (mobile expects this format)
@@ -573,15 +709,20 @@ class ProductSpecificationsView(views.APIView):
                 'value': spec.get('spec_value', ''),
             })
 
-        return Response({
+        return {
             "count": len(rows),
             "groups": list(groups.values()),
             "raw": rows,
-        })
+        }
 
 
 class ProductRecommendationsView(views.APIView):
-    """GET /api/products/{id}/recommendations/"""
+    """
+    GET /api/products/{id}/recommendations/
+
+    Lists are precomputed by ``manage.py build_recommendations``; products
+    without a row fall back to the category's top-rated products.
+    """
     permission_classes = []
     authentication_classes = []
 
@@ -589,13 +730,11 @@ class ProductRecommendationsView(views.APIView):
         product = get_object_or_404(Product, id=id, status='active', approval_status='approved')
         with connection.cursor() as c:
             c.execute("""
-                SELECT id, product_id, similar_products, from_seller_products,
-                       you_might_also_like, algorithm_version, confidence_score, last_updated
+                SELECT similar_products, from_seller_products, you_might_also_like
                 FROM product_recommendations
                 WHERE product_id = %s LIMIT 1
             """, [str(id)])
             row = c.fetchone()
-            cols = [col[0] for col in c.description] if c.description else []
 
         if not row:
             # Fallback: return products from same category
@@ -615,40 +754,13 @@ class ProductRecommendationsView(views.APIView):
                 "you_might_also_like": [],
             })
 
-        data = dict(zip(cols, row))
-        for k, v in list(data.items()):
-            if hasattr(v, 'isoformat'):
-                data[k] = v.isoformat()
-            elif isinstance(v, uuid_module.UUID):
-                data[k] = str(v)
-            elif isinstance(v, list):
-                data[k] = [str(x) if isinstance(x, uuid_module.UUID) else x for x in v]
-
-        # Fetch actual product objects for similar_products
-        similar_ids = data.get('similar_products', []) or []
-        from_seller_ids = data.get('from_seller_products', []) or []
-        you_might_ids = data.get('you_might_also_like', []) or []
-
-        def _fetch_products_by_ids(ids):
-            if not ids:
-                return []
-            str_ids = [str(i) for i in ids]
-            placeholders = ','.join(['%s'] * len(str_ids))
-            with connection.cursor() as c:
-                c.execute(f"""
-                    SELECT id, name, price, images, rating, reviews, in_stock,
-                           discount_percentage, is_on_sale, sale_price, brand
-                    FROM products
-                    WHERE id::text IN ({placeholders})
-                      AND status = 'active' AND approval_status = 'approved'
-                """, str_ids)
-                return _dictfetchall(c)
-
-        return Response({
-            "similar_products": _fetch_products_by_ids(similar_ids),
-            "from_seller_products": _fetch_products_by_ids(from_seller_ids),
-            "you_might_also_like": _fetch_products_by_ids(you_might_ids),
-        })
+        # One primary-key lookup for all three lists, each kept in stored order.
+        similar_ids, from_seller_ids, you_might_ids = row
+        return Response(hydration.hydrate_lists({
+            "similar_products": similar_ids,
+            "from_seller_products": from_seller_ids,
+            "you_might_also_like": you_might_ids,
+        }))
 
 
 class ProductReviewsSummaryView(views.APIView):
@@ -658,34 +770,25 @@ class ProductReviewsSummaryView(views.APIView):
 
     def get(self, request, id):
         get_object_or_404(Product, id=id, status='active', approval_status='approved')
-        with connection.cursor() as c:
-            c.execute("""
-                SELECT id, product_id, with_media, histogram, total_reviews,
-                       average_rating, last_updated
-                FROM product_reviews_summary
-                WHERE product_id = %s LIMIT 1
-            """, [str(id)])
-            row = c.fetchone()
-            cols = [col[0] for col in c.description] if c.description else []
-
-        if not row:
-            return Response({
-                "total_reviews": 0, "average_rating": 0.0,
-                "with_media": 0, "histogram": [0, 0, 0, 0, 0],
-            })
-
-        data = dict(zip(cols, row))
-        for k, v in list(data.items()):
-            if hasattr(v, 'isoformat'):
-                data[k] = v.isoformat()
-            elif isinstance(v, uuid_module.UUID):
-                data[k] = str(v)
-        return Response(data)
+        return Response(_review_summary(id) or dict(EMPTY_REVIEWS_SUMMARY))
 
 
 # ---------------------------------------------------------------------------
 # Utility
 # ---------------------------------------------------------------------------
+def _review_summary(product_id):
+    """The product_reviews_summary row, kept current by triggers on product_reviews (migration 0010)."""
+    with connection.cursor() as c:
+        c.execute("""
+            SELECT id, product_id, with_media, histogram, total_reviews,
+                   average_rating, last_updated
+            FROM product_reviews_summary
+            WHERE product_id = %s LIMIT 1
+        """, [str(product_id)])
+        rows = _dictfetchall(c)
+    return rows[0] if rows else None
+
+
 def _dictfetchall(cursor) -> list:
     cols = [col[0] for col in cursor.description] if cursor.description else []
     rows = []
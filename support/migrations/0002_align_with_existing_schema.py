@@ -0,0 +1,69 @@
+"""
+Add ConversationContext to the migration state.  The ``conversation_context``
+table already exists in Supabase; the SQL only creates it on fresh PostgreSQL
+databases (the SQLite fallback gets the migration state alone).
+"""
+import django.contrib.postgres.fields
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS conversation_context (
+    id uuid NOT NULL PRIMARY KEY,
+    conversation_id uuid NULL REFERENCES chat_conversations (id) DEFERRABLE INITIALLY DEFERRED,
+    user_id uuid NULL REFERENCES users_user (id) DEFERRABLE INITIALLY DEFERRED,
+    user_message text NOT NULL,
+    intent_type text NOT NULL,
+    intent_confidence numeric(5, 2) NULL,
+    ai_response text NOT NULL,
+    extracted_info text NULL,
+    products_mentioned uuid[] NOT NULL,
+    created_at timestamp with time zone NULL
+);
+CREATE INDEX IF NOT EXISTS conversation_context_conversation_id_idx ON conversation_context (conversation_id);
+CREATE INDEX IF NOT EXISTS conversation_context_user_id_idx ON conversation_context (user_id);
+"""
+
+
+def create_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_table, migrations.RunPython.noop),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='ConversationContext',
+                    fields=[
+                        ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                        ('user_message', models.TextField()),
+                        ('intent_type', models.TextField()),
+                        ('intent_confidence', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                        ('ai_response', models.TextField()),
+                        ('extracted_info', models.TextField(blank=True, null=True)),
+                        ('products_mentioned', django.contrib.postgres.fields.ArrayField(base_field=models.UUIDField(), blank=True, default=list, size=None)),
+                        ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                        ('conversation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='context_entries', to='support.chatconversation')),
+                        ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'conversation_context',
+                    },
+                ),
+            ],
+        ),
+    ]
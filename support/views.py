@@ -54,7 +54,11 @@ class ChatConversationViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return ChatConversation.objects.none()
-        return ChatConversation.objects.filter(user=self.request.user).order_by('-last_message_at')
+        return (
+            ChatConversation.objects.filter(user=self.request.user)
+            .select_related('user__profile').prefetch_related('messages')
+            .order_by('-last_message_at')
+        )
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -1,10 +1,21 @@
+import logging
+
+import jwt
 from rest_framework import authentication
 from rest_framework import exceptions
 from django.conf import settings
 from django.contrib.auth import get_user_model
 
+from . import token_cache
+
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+# ES256, RS256, PS256, EdDSA: signed with a key pair Supabase holds.
+ASYMMETRIC_ALGORITHM_PREFIXES = ('ES', 'RS', 'PS', 'Ed')
+
+
 class SupabaseAuthentication(authentication.BaseAuthentication):
     """
     Validates Supabase JWTs and syncs the user to Django.
@@ -13,6 +24,16 @@ class SupabaseAuthentication(authentication.BaseAuthentication):
     invalid / expired — letting DRF permission classes decide whether to
     allow or deny the request.  Only raises AuthenticationFailed for
     malformed Authorization headers (no actual token after "Bearer").
+
+    With SUPABASE_AUTH_VERIFY_MODE = 'local' the signature, expiry, audience
+    and issuer are checked in-process against SUPABASE_JWT_SECRET, so no
+    round trip to Supabase is made.  Views that must observe revoked
+    sessions (account deletion, password change) set
+    ``require_remote_token_check = True`` and are always verified with
+    ``supabase.auth.get_user``.
+
+    Resolved principals are kept in ``users.token_cache`` so repeat requests
+    with the same token skip both verification and the users lookup.
     """
 
     def authenticate(self, request):
@@ -29,24 +50,91 @@ class SupabaseAuthentication(authentication.BaseAuthentication):
             return None
 
         try:
-            from users.views import get_supabase_client
-            supabase = get_supabase_client()
+            remote_required = self._requires_remote_check(request)
 
-            user_response = supabase.auth.get_user(token)
-            user_data = user_response.user
+            cached = token_cache.get_principal(token)
+            if cached is token_cache.REVOKED:
+                return None
+            if cached is not None and not remote_required:
+                return (cached, None)
+
+            user_data = None
+            if not remote_required and self._can_verify_locally(token):
+                user_data = self._verify_local(token)
+            else:
+                user_data = self._verify_remote(token)
 
             if not user_data:
                 return None
 
             user, _ = User.objects.get_or_create(
-                id=user_data.id,
+                id=user_data['id'],
                 defaults={
-                    'email': user_data.email,
-                    'username': user_data.email,
+                    'email': user_data['email'],
+                    'username': user_data['email'],
                 },
             )
+            if not user.is_active:
+                return None
+            token_cache.set_principal(token, user, user_data.get('exp'))
             return (user, None)
 
         except Exception as e:
-            print(f"DEBUG: Supabase token validation failed (treating as anonymous): {e}")
+            logger.debug("Supabase token validation failed (treating as anonymous): %s", e)
             return None
+
+    def _requires_remote_check(self, request):
+        view = (getattr(request, 'parser_context', None) or {}).get('view')
+        return getattr(view, 'require_remote_token_check', False)
+
+    def _can_verify_locally(self, token):
+        if settings.SUPABASE_AUTH_VERIFY_MODE != 'local' or not settings.SUPABASE_JWT_SECRET:
+            return False
+
+        # Projects migrated to asymmetric signing keys issue ES256/RS256
+        # tokens that the shared secret cannot verify.  Any other algorithm
+        # outside SUPABASE_JWT_ALGORITHMS is rejected by _verify_local.
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError:
+            return True
+        alg = str(header.get('alg', ''))
+        return alg in settings.SUPABASE_JWT_ALGORITHMS or not alg.startswith(ASYMMETRIC_ALGORITHM_PREFIXES)
+
+    def _verify_local(self, token):
+        try:
+            payload = jwt.decode(
+                token,
+                settings.SUPABASE_JWT_SECRET,
+                algorithms=settings.SUPABASE_JWT_ALGORITHMS,
+                audience=settings.SUPABASE_JWT_AUDIENCE,
+                issuer=settings.SUPABASE_JWT_ISSUER,
+                leeway=settings.SUPABASE_JWT_LEEWAY,
+                options={'require': ['exp', 'sub']},
+            )
+        except jwt.InvalidTokenError as e:
+            logger.debug("Local JWT verification failed: %s", e)
+            return None
+
+        email = payload.get('email')
+        if not email:
+            return None
+        return {'id': payload['sub'], 'email': email, 'exp': payload['exp']}
+
+    def _verify_remote(self, token):
+        from users.supabase_client import get_supabase_client
+        supabase = get_supabase_client()
+
+        user_response = supabase.auth.get_user(token)
+        user_data = user_response.user if user_response else None
+        if not user_data:
+            return None
+        return {'id': user_data.id, 'email': user_data.email, 'exp': token_expiry(token)}
+
+
+def token_expiry(token):
+    """Unverified ``exp`` claim of a token, used only to bound cache lifetimes."""
+    try:
+        return jwt.decode(token, options={'verify_signature': False}).get('exp')
+    except jwt.InvalidTokenError:
+        return None
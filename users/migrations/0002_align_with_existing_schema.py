@@ -0,0 +1,51 @@
+"""
+``profiles.id`` is both the primary key and the link to the user.  0001 created
+the column as ``id_id``; Supabase (and the model) call it ``id``.  Rename it on
+fresh databases; the Supabase table is left untouched.
+"""
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+RENAME_SQL = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'profiles' AND column_name = 'id_id'
+    ) THEN
+        ALTER TABLE profiles RENAME COLUMN id_id TO id;
+    END IF;
+END
+$$;
+"""
+
+
+def rename_column(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(RENAME_SQL, params=None)
+    else:
+        schema_editor.execute('ALTER TABLE profiles RENAME COLUMN id_id TO id')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(rename_column, migrations.RunPython.noop),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='profile',
+                    name='id',
+                    field=models.OneToOneField(db_column='id', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='profile', serialize=False, to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+    ]
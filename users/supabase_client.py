@@ -0,0 +1,151 @@
+"""
+Process-wide Supabase client.
+
+Every Supabase call used to build a fresh client (and a fresh TLS
+connection).  This module keeps one pooled ``httpx.Client`` per process with
+keep-alive connections, configurable timeouts and pool size, and builds the
+Supabase client on top of it lazily.
+
+Two entry points:
+
+- ``get_supabase_client()`` returns the shared client.  Use it for stateless
+  calls only: ``auth.get_user(jwt)`` and ``auth.admin.*``.
+- ``session_client()`` returns a new lightweight client that still shares the
+  pooled connections.  Use it for calls that store a session or PKCE state
+  on the client (sign-in, sign-up, refresh, password reset, update_user) so
+  one user's session never leaks into another request.
+
+Both are fork-safe: a worker forked after the first call rebuilds its own
+connection pool instead of sharing sockets with the parent.
+
+Per-endpoint call counts and latencies are kept in-process and exposed via
+``get_call_stats()``.
+
+The ``supabase`` package itself is only imported when the first client is
+built, so importing this module (every worker does, via users.views and the
+auth backend) stays cheap.
+"""
+import os
+import threading
+import time
+
+import httpx
+from django.conf import settings
+
+from besmart_backend import perf
+
+_lock = threading.Lock()
+_state = {'pid': None, 'http': None, 'client': None}
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def _endpoint_name(url: httpx.URL) -> str:
+    """'/auth/v1/admin/users/<id>' -> 'auth.admin.users'"""
+    parts = [p for p in url.path.split('/') if p and p != 'v1']
+    named = [p for p in parts if not any(ch.isdigit() for ch in p)]
+    return '.'.join(named[:3]) or 'root'
+
+
+def _record(name, elapsed_ms, failed):
+    perf.record_external('supabase', name, elapsed_ms, failed)
+    with _stats_lock:
+        s = _stats.setdefault(name, {'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        s['count'] += 1
+        s['total_ms'] += elapsed_ms
+        s['max_ms'] = max(s['max_ms'], elapsed_ms)
+        if failed:
+            s['errors'] += 1
+
+
+class _TimedTransport(httpx.HTTPTransport):
+    """HTTP transport that records time-to-response-headers per endpoint."""
+
+    def handle_request(self, request):
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = super().handle_request(request)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            _record(_endpoint_name(request.url), (time.perf_counter() - start) * 1000, failed)
+
+
+def _build_http_client() -> httpx.Client:
+    limits = httpx.Limits(
+        max_connections=settings.SUPABASE_HTTP_POOL_SIZE,
+        max_keepalive_connections=settings.SUPABASE_HTTP_POOL_SIZE,
+        keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        settings.SUPABASE_HTTP_TIMEOUT,
+        connect=settings.SUPABASE_HTTP_CONNECT_TIMEOUT,
+    )
+    return httpx.Client(
+        transport=_TimedTransport(limits=limits, retries=1),
+        timeout=timeout,
+    )
+
+
+def _http_client() -> httpx.Client:
+    """The pooled transport for this process (rebuilt after fork)."""
+    pid = os.getpid()
+    if _state['pid'] == pid and _state['http'] is not None:
+        return _state['http']
+    with _lock:
+        if _state['pid'] != pid or _state['http'] is None:
+            _state['http'] = _build_http_client()
+            _state['client'] = None
+            _state['pid'] = pid
+    return _state['http']
+
+
+def _create(http_client):
+    url = settings.SUPABASE_URL
+    key = settings.SUPABASE_KEY
+    if not url or not key:
+        raise ValueError("Supabase credentials not configured.")
+    # deferred: ~0.3s of worker boot (profile_startup LAZY_MODULES); the SDK
+    # pulls in postgrest, gotrue, realtime and storage3.
+    from supabase import create_client, ClientOptions
+
+    options = ClientOptions(
+        httpx_client=http_client,
+        auto_refresh_token=False,
+        persist_session=False,
+        postgrest_client_timeout=settings.SUPABASE_HTTP_TIMEOUT,
+    )
+    return create_client(url, key, options=options)
+
+
+def get_supabase_client():
+    """Shared client for stateless Supabase calls."""
+    http_client = _http_client()
+    client = _state['client']
+    if client is not None:
+        return client
+    with _lock:
+        if _state['client'] is None:
+            _state['client'] = _create(http_client)
+        return _state['client']
+
+
+def session_client():
+    """Per-call client for session-bound auth calls, on the shared pool."""
+    return _create(_http_client())
+
+
+def get_call_stats() -> dict:
+    """Snapshot of per-endpoint Supabase call counters for this process."""
+    with _stats_lock:
+        return {
+            name: dict(s, avg_ms=round(s['total_ms'] / s['count'], 2) if s['count'] else 0.0)
+            for name, s in _stats.items()
+        }
+
+
+def reset_call_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -1,3 +1,239 @@
-from django.test import TestCase
+import base64
+import json
+import time
+import uuid
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import jwt
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from besmart_backend import perf
+from besmart_backend.query_budgets import QueryBudgetTestCase
+
+from . import supabase_client, token_cache
+from .authentication import SupabaseAuthentication
+from .models import User
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PERF_INSTRUMENTATION_ENABLED=False,
+                   AUTH_PRINCIPAL_CACHE_TTL=300)
+class TokenCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='cached@example.com', username='cached@example.com')
+
+    def setUp(self):
+        cache.clear()
+        token_cache._local.clear()
+
+    def _cache(self, token, exp=None):
+        token_cache.set_principal(token, self.user, exp if exp is not None else time.time() + 600)
+
+    def test_hits_build_a_fresh_user_without_queries(self):
+        self._cache('token-a')
+        with self.assertNumQueries(0):
+            first = token_cache.get_principal('token-a')
+            second = token_cache.get_principal('token-a')
+        self.assertEqual((first.pk, first.email), (self.user.pk, self.user.email))
+        self.assertIsNot(first, second)
+        self.assertFalse(first._state.adding)
+
+        # Another worker: only the shared tier has the entry.
+        token_cache._local.clear()
+        self.assertEqual(token_cache.get_principal('token-a').pk, self.user.pk)
+        self.assertIsNone(token_cache.get_principal('token-b'))
+
+    def test_entries_never_outlive_the_token(self):
+        now = time.time()
+        self._cache('expired', exp=now - 1)
+        self.assertIsNone(token_cache.get_principal('expired'))
+
+        self._cache('short', exp=now + 30)
+        self.assertIn(token_cache._ttl(now + 30), (29, 30))
+        self.assertIsNotNone(token_cache.get_principal('short'))
+        with mock.patch('time.time', return_value=now + 31):
+            self.assertIsNone(token_cache.get_principal('short'))
+
+    def test_logout_revokes_the_presenting_token(self):
+        self._cache('token-a')
+        self._cache('token-b')
+        with mock.patch('users.views.get_supabase_client'):
+            response = self.client.post('/api/users/logout/', headers={'Authorization': 'Bearer token-a'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(token_cache.get_principal('token-a'), token_cache.REVOKED)
+        token_cache._local.clear()
+        self.assertIs(token_cache.get_principal('token-a'), token_cache.REVOKED)
+        self.assertEqual(token_cache.get_principal('token-b').pk, self.user.pk)
+
+    def test_account_deletion_retires_every_token_of_the_user(self):
+        self._cache('token-a')
+        self._cache('token-b')
+        other = User.objects.create(email='other@example.com', username='other@example.com')
+        token_cache.set_principal('token-c', other, time.time() + 600)
+
+        remote = mock.Mock()
+        remote.auth.get_user.return_value.user = mock.Mock(id=self.user.id, email=self.user.email)
+        with mock.patch('users.supabase_client.get_supabase_client', return_value=remote), \
+                mock.patch('users.views.get_supabase_client', return_value=remote), \
+                mock.patch('users.views.session_client'), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/users/account/delete/', {'password': 'secret'},
+                headers={'Authorization': 'Bearer token-a'}, content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(token_cache.get_principal('token-a'), token_cache.REVOKED)
+        self.assertIsNone(token_cache.get_principal('token-b'))
+        self.assertEqual(token_cache.get_principal('token-c').pk, other.pk)
+
+    def test_deactivated_users_do_not_authenticate(self):
+        self._cache('token-a')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertIsNone(token_cache.get_principal('token-a'))
+
+        remote = mock.Mock()
+        remote.auth.get_user.return_value.user = mock.Mock(id=self.user.id, email=self.user.email)
+        with override_settings(SUPABASE_AUTH_VERIFY_MODE='remote'), \
+                mock.patch('users.supabase_client.get_supabase_client', return_value=remote):
+            response = self.client.get('/api/users/me/', headers={'Authorization': 'Bearer token-a'})
+        self.assertIn(response.status_code, (401, 403))
+        self.assertIsNone(token_cache.get_principal('token-a'))
+
+
+SECRET = 'test-jwt-secret-with-enough-length-for-hs256'
+ISSUER = 'https://example.supabase.co/auth/v1'
+
+
+@override_settings(SUPABASE_AUTH_VERIFY_MODE='local', SUPABASE_JWT_SECRET=SECRET, SUPABASE_JWT_ALGORITHMS=['HS256'],
+                   SUPABASE_JWT_AUDIENCE='authenticated', SUPABASE_JWT_ISSUER=ISSUER, SUPABASE_JWT_LEEWAY=0)
+class SupabaseAuthenticationTests(TestCase):
+    user_id = uuid.UUID('5d0b6a52-52a6-4a43-a0a5-0b3cf2b1d9a1')
+
+    def setUp(self):
+        cache.clear()
+        token_cache._local.clear()
+        self.remote = mock.Mock()
+        self.remote.auth.get_user.return_value.user = mock.Mock(id=str(self.user_id), email='remote@example.com')
+        patcher = mock.patch('users.supabase_client.get_supabase_client', return_value=self.remote)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _token(self, key=SECRET, algorithm='HS256', **overrides):
+        claims = {
+            'sub': str(self.user_id), 'email': 'local@example.com', 'aud': 'authenticated',
+            'iss': ISSUER, 'exp': int(time.time()) + 600,
+        }
+        claims.update(overrides)
+        return jwt.encode({k: v for k, v in claims.items() if v is not None}, key, algorithm=algorithm)
+
+    def _authenticate(self, token, remote_view=False):
+        request = RequestFactory().get('/', headers={'Authorization': f'Bearer {token}'})
+        if remote_view:
+            request.parser_context = {'view': SimpleNamespace(require_remote_token_check=True)}
+        return SupabaseAuthentication().authenticate(request)
+
+    def test_valid_tokens_are_verified_locally(self):
+        user, _ = self._authenticate(self._token())
+        self.assertEqual((str(user.id), user.email), (str(self.user_id), 'local@example.com'))
+        self.remote.auth.get_user.assert_not_called()
+
+    def test_invalid_tokens_are_rejected(self):
+        cases = {
+            'signature': self._token(key='another-secret-with-enough-length-for-hs256'),
+            'audience': self._token(aud='anon'),
+            'issuer': self._token(iss='https://elsewhere.supabase.co/auth/v1'),
+            'expired': self._token(exp=int(time.time()) - 60),
+            'sub': self._token(sub=None),
+            'email': self._token(email=None),
+            'algorithm': self._token(algorithm='HS384'),
+            'unsigned': self._token(key=None, algorithm='none'),
+        }
+        for name, token in cases.items():
+            with self.subTest(name):
+                self.assertIsNone(self._authenticate(token))
+        self.remote.auth.get_user.assert_not_called()
+        self.assertFalse(User.objects.exists())
+
+    def test_asymmetric_tokens_fall_back_to_remote_verification(self):
+        header = base64.urlsafe_b64encode(json.dumps({'alg': 'ES256', 'typ': 'JWT'}).encode()).rstrip(b'=')
+        token = header.decode() + '.' + self._token().split('.', 1)[1]
+        user, _ = self._authenticate(token)
+        self.assertEqual(user.email, 'remote@example.com')
+        self.remote.auth.get_user.assert_called_once_with(token)
+
+    def test_remote_check_views_verify_remotely_despite_a_cached_principal(self):
+        token = self._token()
+        self._authenticate(token)
+        self.assertIsNotNone(token_cache.get_principal(token))
+
+        user, _ = self._authenticate(token, remote_view=True)
+        self.assertEqual(str(user.id), str(self.user_id))
+        self.remote.auth.get_user.assert_called_once_with(token)
+
+        self.remote.auth.get_user.return_value.user = None
+        self.assertIsNone(self._authenticate(token, remote_view=True))
+
+
+@override_settings(SUPABASE_URL='https://example.supabase.co',
+                   SUPABASE_KEY=jwt.encode({'role': 'anon'}, 'anon-key-secret-with-enough-length'))
+class SupabaseClientTests(SimpleTestCase):
+    def setUp(self):
+        saved = dict(supabase_client._state)
+        self.addCleanup(supabase_client._state.update, saved)
+        supabase_client._state.update(pid=None, http=None, client=None)
+        supabase_client.reset_call_stats()
+        self.addCleanup(supabase_client.reset_call_stats)
+
+    def test_shared_client_is_reused(self):
+        client = supabase_client.get_supabase_client()
+        self.assertIs(supabase_client.get_supabase_client(), client)
+        self.assertIs(client.auth._http_client, supabase_client._state['http'])
+
+    def test_session_clients_get_their_own_auth_on_the_shared_pool(self):
+        shared = supabase_client.get_supabase_client()
+        first, second = supabase_client.session_client(), supabase_client.session_client()
+        self.assertIsNot(first, shared)
+        self.assertIsNot(first.auth, second.auth)
+        for client in (first, second):
+            self.assertIs(client.auth._http_client, supabase_client._state['http'])
+
+    def test_a_forked_worker_builds_its_own_pool(self):
+        client = supabase_client.get_supabase_client()
+        supabase_client._state['pid'] = -1
+        self.assertIsNot(supabase_client.get_supabase_client(), client)
+
+    def test_transport_records_stats_and_request_timings(self):
+        transport = supabase_client._TimedTransport()
+        responses = [httpx.Response(200), httpx.Response(503), httpx.ConnectError('down')]
+
+        def respond(self, request):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        stats, token = perf.start_request()
+        self.addCleanup(perf.end_request, token)
+        with mock.patch.object(httpx.HTTPTransport, 'handle_request', respond):
+            for path in ('/auth/v1/admin/users/5d0b6a52', '/auth/v1/user', '/auth/v1/user'):
+                try:
+                    transport.handle_request(httpx.Request('GET', f'https://example.supabase.co{path}'))
+                except httpx.ConnectError:
+                    pass
+
+        calls = supabase_client.get_call_stats()
+        self.assertEqual(set(calls), {'auth.admin.users', 'auth.user'})
+        self.assertEqual((calls['auth.admin.users']['count'], calls['auth.admin.users']['errors']), (1, 0))
+        self.assertEqual((calls['auth.user']['count'], calls['auth.user']['errors']), (2, 2))
+        self.assertEqual(stats.external['supabase']['calls'], 3)
+        self.assertEqual(stats.external['supabase']['errors'], 2)
+        self.assertEqual(stats.external['supabase']['endpoints'], {'auth.admin.users': 1, 'auth.user': 2})
+
+
+class UserQueryBudgetTests(QueryBudgetTestCase):
+    app = 'users'
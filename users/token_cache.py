@@ -0,0 +1,137 @@
+"""
+Verified-principal cache for SupabaseAuthentication.
+
+Maps sha256(access token) -> the resolved user's column values, so a token
+that has already been validated skips JWT verification and the users
+SELECT / INSERT on later requests.  Every hit builds a fresh User from the
+values; no instance is shared between requests.  Two tiers:
+
+- a bounded in-process LRU (AUTH_PRINCIPAL_CACHE_SIZE entries)
+- the shared Django cache, so other workers benefit from the first lookup
+
+No entry outlives the token's ``exp`` claim.  LogoutView publishes a
+revocation marker for the token, and every save or delete of a User bumps
+that user's generation (``connect_signals``), which retires all of the
+user's entries at once (account deletion, deactivation).  Both are checked
+on every hit.  Markers and generations live in the shared cache, so they
+reach every worker only when it is shared (CACHE_REDIS_URL / REDIS_URL);
+with the locmem fallback they apply to the worker that wrote them, and
+other workers keep serving their entries for up to AUTH_PRINCIPAL_CACHE_TTL.
+"""
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+
+from besmart_backend.cache import LocalLRU
+
+PRINCIPAL_KEY = 'auth:principal:{}'
+REVOKED_KEY = 'auth:revoked:{}'
+GENERATION_KEY = 'auth:user-generation:{}'
+
+# Returned by get_principal() for tokens that were explicitly revoked, so
+# callers can reject them without re-verifying the (still valid) signature.
+REVOKED = object()
+
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+_local = LocalLRU(settings.AUTH_PRINCIPAL_CACHE_SIZE)
+
+
+def _ttl(exp):
+    """Seconds an entry may live: the configured TTL, capped at the token's exp."""
+    ttl = settings.AUTH_PRINCIPAL_CACHE_TTL
+    if exp is not None:
+        ttl = min(ttl, int(exp - time.time()))
+    return ttl
+
+
+def _user_fields():
+    return [field.attname for field in get_user_model()._meta.concrete_fields]
+
+
+def _build(values):
+    return get_user_model().from_db(DEFAULT_DB_ALIAS, _user_fields(), values)
+
+
+def get_principal(token: str):
+    """Return a User for ``token``, None on a miss, or REVOKED."""
+    h = token_hash(token)
+    entry = _local.get(h)
+    if entry is None:
+        found = cache.get_many([PRINCIPAL_KEY.format(h), REVOKED_KEY.format(h)])
+        if found.get(REVOKED_KEY.format(h)):
+            return REVOKED
+        entry = found.get(PRINCIPAL_KEY.format(h))
+        if entry is None or entry[2] <= time.time():
+            return None
+        if cache.get(GENERATION_KEY.format(entry[0])) != entry[1]:
+            return None
+        _local.set(h, entry, entry[2])
+        return _build(entry[3])
+
+    user_id, generation, _, values = entry
+    found = cache.get_many([REVOKED_KEY.format(h), GENERATION_KEY.format(user_id)])
+    if found.get(REVOKED_KEY.format(h)):
+        _local.delete(h)
+        return REVOKED
+    if found.get(GENERATION_KEY.format(user_id)) != generation:
+        _local.delete(h)
+        return None
+    return _build(values)
+
+
+def set_principal(token: str, user, exp=None):
+    """Cache ``user``'s values for ``token`` until min(now + TTL, exp)."""
+    ttl = _ttl(exp)
+    if ttl <= 0:
+        return
+    h = token_hash(token)
+    expires_at = time.time() + ttl
+    values = tuple(getattr(user, name) for name in _user_fields())
+    entry = (user.pk, cache.get(GENERATION_KEY.format(user.pk)), expires_at, values)
+    _local.set(h, entry, expires_at)
+    cache.set(PRINCIPAL_KEY.format(h), entry, ttl)
+
+
+def revoke_token(token: str, exp=None):
+    """Stop ``token`` resolving from the cache (in every worker, given a shared cache)."""
+    h = token_hash(token)
+    _local.delete(h)
+    cache.delete(PRINCIPAL_KEY.format(h))
+    # Keep the marker until the token would have expired anyway.
+    ttl = int(exp - time.time()) if exp is not None else settings.AUTH_PRINCIPAL_REVOCATION_TTL
+    if ttl > 0:
+        cache.set(REVOKED_KEY.format(h), True, ttl)
+
+
+def revoke_user(user_id):
+    """Retire every cached principal of ``user_id``.
+
+    The new generation outlives every entry written before it, since no
+    entry lives longer than AUTH_PRINCIPAL_CACHE_TTL.
+    """
+    cache.set(GENERATION_KEY.format(user_id), uuid.uuid4().hex, settings.AUTH_PRINCIPAL_CACHE_TTL)
+
+
+def _on_user_write(sender, instance, using=None, created=False, **kwargs):
+    if created:
+        return
+    user_id = instance.pk
+    revoke_user(user_id)
+    # Again after commit: a request may have cached the old row meanwhile.
+    transaction.on_commit(lambda: revoke_user(user_id), using=using)
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(_on_user_write, sender=User, dispatch_uid='token_cache:save')
+    post_delete.connect(_on_user_write, sender=User, dispatch_uid='token_cache:delete')
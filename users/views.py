@@ -5,18 +5,12 @@ from django.contrib.auth import get_user_model
 from .serializers import RegisterSerializer, UserSerializer, ProfileSerializer, LogoutSerializer, LoginSerializer, PasswordResetSerializer, PasswordChangeSerializer
 from drf_spectacular.utils import extend_schema
 from django.conf import settings
-from supabase import create_client, Client
+from .authentication import token_expiry
+from .supabase_client import get_supabase_client, session_client
+from . import token_cache
 
 User = get_user_model()
 
-# Initialize Supabase Client (Helper)
-def get_supabase_client():
-    url = settings.SUPABASE_URL
-    key = settings.SUPABASE_KEY
-    if not url or not key:
-        raise ValueError("Supabase credentials not configured.")
-    return create_client(url, key)
-
 class RegisterView(APIView):
     permission_classes = (permissions.AllowAny,)
     serializer_class = RegisterSerializer
@@ -36,7 +30,7 @@ class RegisterView(APIView):
              return Response({"error": "Email and password are required."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            supabase = get_supabase_client()
+            supabase = session_client()
             # 1. Sign up with Supabase
             auth_response = supabase.auth.sign_up({
                 "email": email, 
@@ -91,7 +85,7 @@ class LoginView(APIView):
         password = serializer.validated_data['password']
 
         try:
-            supabase = get_supabase_client()
+            supabase = session_client()
             auth_response = supabase.auth.sign_in_with_password({
                 "email": email,
                 "password": password
@@ -131,12 +125,12 @@ class LogoutView(APIView):
             auth_header = request.headers.get('Authorization')
             if auth_header:
                 token = auth_header.split(' ')[1]
+                token_cache.revoke_token(token, token_expiry(token))
                 supabase = get_supabase_client()
-                # Attempt to sign out the user identified by the token
-                # In supabase-py, invalidating a generic JWT might be via admin or just client sign_out if session set
-                # For safety/simplicity in proxy:
+                # Revoke the refresh tokens of the user identified by the token.
+                # admin.sign_out is stateless, so it is safe on the shared client.
                 try:
-                    supabase.auth.sign_out(scope='global', jwt=token)
+                    supabase.auth.admin.sign_out(token, 'global')
                 except:
                     # If this specific method fails (SDK difference), generic return is fallback
                     pass
@@ -159,7 +153,7 @@ class PasswordResetView(APIView):
         redirect_to = serializer.validated_data.get('redirect_to')
 
         try:
-            supabase = get_supabase_client()
+            supabase = session_client()
             options = {}
             if redirect_to:
                 options['redirect_to'] = redirect_to
@@ -173,6 +167,7 @@ class PasswordResetView(APIView):
 class PasswordChangeView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = PasswordChangeSerializer
+    require_remote_token_check = True
 
     @extend_schema(summary="Change Password (LoggedIn User)")
     def post(self, request):
@@ -190,7 +185,7 @@ class PasswordChangeView(APIView):
             
             token = auth_header.split(' ')[1]
             
-            supabase = get_supabase_client()
+            supabase = session_client()
             # Update user using their JWT
             auth_response = supabase.auth.update_user({"password": new_password}, jwt=token)
             
@@ -244,7 +239,7 @@ class TokenRefreshView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         try:
-            supabase = get_supabase_client()
+            supabase = session_client()
             auth_response = supabase.auth.refresh_session(refresh_token)
             session = auth_response.session
             if session is None:
@@ -289,6 +284,7 @@ class AccountDeletionEligibilityView(APIView):
 class AccountDeleteView(APIView):
     """POST /api/users/account/delete/ — requires password"""
     permission_classes = (permissions.IsAuthenticated,)
+    require_remote_token_check = True
 
     @extend_schema(request={'type': 'object', 'properties': {'password': {'type': 'string'}}}, responses={200: {'type': 'object'}})
     def post(self, request):
@@ -300,7 +296,7 @@ class AccountDeleteView(APIView):
         if vendor:
             return Response({"success": False, "error": "vendor_active", "message": "Cannot delete account with active vendor."}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            auth_response = get_supabase_client().auth.sign_in_with_password({"email": request.user.email, "password": password})
+            auth_response = session_client().auth.sign_in_with_password({"email": request.user.email, "password": password})
             if not auth_response or not auth_response.user:
                 return Response({"success": False, "error": "invalid_password", "message": "Invalid password."}, status=status.HTTP_400_BAD_REQUEST)
         except Exception:
@@ -313,6 +309,8 @@ class AccountDeleteView(APIView):
             user.username = user.email
             user.is_active = False
             user.save()
+            token = request.headers.get('Authorization', '').split(' ')[-1]
+            token_cache.revoke_token(token, token_expiry(token))
             get_supabase_client().auth.admin.delete_user(str(user.id))
         except Exception as e:
             return Response({"success": False, "error": "deletion_failed", "message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class VendorsConfig(AppConfig):
     name = 'vendors'
+
+    def ready(self):
+        from besmart_backend.cache import invalidate_on_save
+        from .models import Vendor
+
+        invalidate_on_save(Vendor, 'product_lists')
@@ -1,5 +1,6 @@
 from rest_framework import generics, permissions, status, views, viewsets
 from rest_framework.response import Response
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Sum, Count
 from django.utils import timezone
@@ -18,6 +19,7 @@ from .serializers import (
     VendorListSerializer, VendorDetailSerializer
 )
 from drf_spectacular.utils import extend_schema, OpenApiParameter
+from besmart_backend.cache import cached_view
 
 # ============ Customer-facing Vendor APIs (Phase 2) ============
 
@@ -80,9 +82,12 @@ class VendorProductsView(generics.ListAPIView):
     def get_queryset(self):
         vendor_id = self.kwargs.get('id')
         get_object_or_404(Vendor, id=vendor_id, status='approved', is_active=True)
-        return Product.objects.filter(vendor_id=vendor_id, status='active', approval_status='approved')
+        return ProductListSerializer.rows(
+            Product.objects.filter(vendor_id=vendor_id, status='active', approval_status='approved')
+        )
 
     @extend_schema(summary="List vendor products")
+    @cached_view('product_lists', timeout=settings.PRODUCT_LIST_CACHE_TTL)
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
@@ -98,7 +103,10 @@ class VendorReviewsListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         vendor_id = self.kwargs.get('id')
         get_object_or_404(Vendor, id=vendor_id, status='approved', is_active=True)
-        return VendorReview.objects.filter(vendor_id=vendor_id).order_by('-created_at')
+        return (
+            VendorReview.objects.filter(vendor_id=vendor_id)
+            .select_related('user__profile').order_by('-created_at')
+        )
 
     def perform_create(self, serializer):
         vendor = get_object_or_404(Vendor, id=self.kwargs['id'], status='approved', is_active=True)